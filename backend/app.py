@@ -8,15 +8,45 @@ from fastapi.responses import FileResponse
 import uvicorn
 import os
 from contextlib import asynccontextmanager
+import asyncio
+from config import settings
 from routers import wbs, export, features, ai, pdf, competitors
+from services.gemini_client import GeminiClientRegistry
+from services.ai_service import AIService
+from services.pdf_service import PDFService
+from services.competitor_service import CompetitorService
+from services.feature_analysis_service import FeatureAnalysisService
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     print("🚀 WBS Generator starting...")
+    
+    # One Gemini client shared by every router (see dependencies.py)
+    gemini = GeminiClientRegistry.from_settings()
+    gemini.start()
+    app.state.gemini = gemini
+    app.state.ai_service = AIService(gemini)
+    app.state.pdf_service = PDFService(app.state.ai_service)
+    app.state.competitor_service = CompetitorService(gemini)
+    app.state.feature_analyzer = FeatureAnalysisService(app.state.ai_service)
+    
+    # Warm the connection pool in the background so startup isn't blocked
+    prewarm_task = asyncio.create_task(gemini.prewarm()) if settings.GEMINI_PREWARM else None
+    
+    # Keep temp/exports bounded (age + LRU size budget)
+    janitor_task = asyncio.create_task(export.export_cache.run_janitor())
+    
     yield
+    
     # Shutdown
     print("🛑 WBS Generator shutting down...")
+    if prewarm_task and not prewarm_task.done():
+        prewarm_task.cancel()
+    janitor_task.cancel()
+    export.export_jobs.shutdown()
+    await gemini.aclose()
+    wbs.wbs_renderer.shutdown()
 
 app = FastAPI(
     title="WBS Generator API",
@@ -0,0 +1,127 @@
+"""
+Circuit Breaker Check - Regression check for half-open probe handling
+Opens the breaker with 503s, then lets the half-open probe end without an
+outcome (non-retryable 4xx, cassette miss, a cancelled stream) through
+generate_text and stream_text, and asserts the breaker can still recover.
+
+Usage (from backend/):
+    python -m benchmarks.circuit_breaker_check
+"""
+import argparse
+import asyncio
+import time
+from services.cassette import CassetteMissError, InjectedAPIError
+from services.circuit_breaker import CircuitBreaker, CLOSED, HALF_OPEN, OPEN
+from services.gemini_client import GeminiClientRegistry
+from services.rate_limiter import AdaptiveRateLimiter
+
+COOLDOWN = 0.05
+
+
+class ScriptedTransport:
+    """Raises the scripted error, hangs while hang is set, and otherwise answers 'ok'"""
+
+    def __init__(self):
+        self.error = None
+        self.hang = False
+
+    async def _next(self):
+        if self.hang:
+            await asyncio.sleep(60)
+        if self.error is not None:
+            raise self.error
+        return "ok"
+
+    async def generate(self, model, prompt):
+        return await self._next()
+
+    async def stream(self, model, prompt):
+        yield await self._next()
+
+    def close(self):
+        pass
+
+
+def build_registry(transport) -> GeminiClientRegistry:
+    return GeminiClientRegistry(
+        api_key="",
+        model_name="check-model",
+        limiter=AdaptiveRateLimiter(
+            requests_per_minute=100_000,
+            tokens_per_minute=10**9,
+            backoff_base=0.001,
+            backoff_max=0.001
+        ),
+        max_retries=0,
+        hedging_enabled=False,
+        breaker=CircuitBreaker(min_calls=2, failure_rate_threshold=0.5, cooldown_seconds=COOLDOWN),
+        transport=transport
+    )
+
+
+async def call(registry: GeminiClientRegistry, streaming: bool, prompt: str):
+    if streaming:
+        return "".join([chunk async for chunk in registry.stream_text(prompt)])
+    return await registry.generate_text(prompt)
+
+
+async def open_breaker(registry: GeminiClientRegistry, transport: ScriptedTransport, streaming: bool) -> None:
+    transport.error = InjectedAPIError(503, "UNAVAILABLE")
+    for i in range(2):
+        try:
+            await call(registry, streaming, f"outage {i}")
+        except InjectedAPIError:
+            pass
+    assert registry.breaker.state == OPEN, registry.breaker.stats()
+    time.sleep(COOLDOWN * 2)
+
+
+async def check(name: str, streaming: bool, probe_error) -> None:
+    transport = ScriptedTransport()
+    registry = build_registry(transport)
+    await open_breaker(registry, transport, streaming)
+
+    # The probe ends without recording an outcome
+    if probe_error is asyncio.CancelledError:
+        transport.error, transport.hang = None, True
+        task = asyncio.ensure_future(call(registry, streaming, "probe"))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        transport.hang = False
+    else:
+        transport.error = probe_error
+        try:
+            await call(registry, streaming, "probe")
+            raise AssertionError("probe should have failed")
+        except type(probe_error):
+            pass
+
+    breaker = registry.breaker
+    assert breaker.state == HALF_OPEN and not breaker._probe_in_flight, f"{name}: probe slot leaked"
+    assert registry.available, f"{name}: breaker stuck unavailable"
+
+    # The next call becomes the probe and closes the breaker
+    transport.error = None
+    assert await call(registry, streaming, "recovery") == "ok"
+    assert breaker.state == CLOSED, f"{name}: breaker did not close"
+    print(f"  ✅ {name}")
+
+
+async def main(args):
+    for streaming in (False, True):
+        path = "stream_text" if streaming else "generate_text"
+        await check(f"{path}: probe fails with 400", streaming, InjectedAPIError(400, "INVALID_ARGUMENT"))
+        await check(f"{path}: probe misses the cassette", streaming, CassetteMissError("no recording"))
+        if streaming:
+            # generate_text callers are shielded by single-flight, so only a stream consumer can cancel a probe
+            await check(f"{path}: probe is cancelled", streaming, asyncio.CancelledError)
+    print("Circuit breaker probe handling OK")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    asyncio.run(main(parser.parse_args()))
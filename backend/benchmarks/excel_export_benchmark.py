@@ -0,0 +1,106 @@
+"""
+Excel Export Benchmark - Regular vs write-only openpyxl workbook
+Times the previous generator (regular Workbook, new style objects per cell,
+saved to disk) against ExcelGenerator.write_excel (write-only workbook,
+named styles, in-memory spooled buffer). Each run happens in a fresh
+subprocess so peak RSS can be read from getrusage; the reported figure is
+the peak growth over the process baseline after the tasks were built.
+
+Usage (from backend/):
+    python -m benchmarks.excel_export_benchmark --tasks 10000 100000
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from openpyxl import Workbook
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from benchmarks.task_table_benchmark import synthetic_features
+from services.excel_generator import ExcelGenerator
+from services.wbs_engine import WBSEngine
+
+
+def legacy_generate_excel(path, project_name, tasks):
+    """The generator before write-only mode (schedule columns omitted)"""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "WBS"
+    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+    header_font = Font(bold=True, color="FFFFFF", size=12)
+    border = Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin'))
+    for col, header in enumerate(["ID", "Task Name", "Description", "Type", "Hours", "Level", "Dependencies"], 1):
+        cell = ws.cell(row=1, column=col, value=header)
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = Alignment(horizontal="center", vertical="center")
+        cell.border = border
+    for row_idx, task in enumerate(tasks, 2):
+        if task.get("task_type") == "Dev":
+            fill = PatternFill(start_color="E7E6FD", end_color="E7E6FD", fill_type="solid")
+        else:
+            fill = PatternFill(start_color="FFF2CC", end_color="FFF2CC", fill_type="solid")
+        data = [task.get("id", ""), task.get("name", ""), task.get("description", ""), task.get("task_type", ""),
+                task.get("duration_hours", 0), task.get("level", 1), ", ".join(task.get("dependencies", []))]
+        for col, value in enumerate(data, 1):
+            cell = ws.cell(row=row_idx, column=col, value=value)
+            cell.border = border
+            cell.alignment = Alignment(vertical="center", wrap_text=True)
+            if col in [4, 5]:
+                cell.fill = fill
+                cell.alignment = Alignment(horizontal="center", vertical="center")
+    summary_row = len(tasks) + 3
+    ws.cell(row=summary_row, column=1, value="Summary").font = Font(bold=True, size=14)
+    ws.cell(row=summary_row + 1, column=2, value=len(tasks))
+    ws.cell(row=summary_row + 2, column=2, value=sum(task.get("duration_hours", 0) for task in tasks))
+    wb.save(path)
+
+
+def run_one(engine_name, count, seed):
+    """Child process: build tasks, export once, print 'seconds peak_rss_bytes size'"""
+    tasks = WBSEngine().build_task_table(synthetic_features(count, seed)).to_dicts()
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    if engine_name == "legacy":
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "wbs.xlsx")
+            legacy_generate_excel(path, "Benchmark", tasks)
+            size = os.path.getsize(path)
+    else:
+        with tempfile.SpooledTemporaryFile(max_size=64 * 1024 * 1024) as output:
+            ExcelGenerator().write_excel(output, "Benchmark", tasks)
+            size = output.tell()
+    elapsed = time.perf_counter() - started
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline
+    print(elapsed, peak * 1024, size)  # ru_maxrss is in KiB on Linux
+
+
+def main(args):
+    for count in args.tasks:
+        print(f"📊 ~{count:,} tasks")
+        results = {}
+        for engine_name in ("legacy", "write-only"):
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.excel_export_benchmark", "--run", engine_name,
+                 "--tasks", str(count), "--seed", str(args.seed)],
+                check=True, capture_output=True, text=True
+            ).stdout.split()
+            elapsed, peak, size = float(output[-3]), int(output[-2]), int(output[-1])
+            results[engine_name] = (elapsed, peak)
+            print(f"  {engine_name:<11} {elapsed:8.2f} s  peak RSS +{peak / 2**20:7.1f} MiB  file {size / 2**20:.1f} MiB")
+        (old_time, old_peak), (new_time, new_peak) = results.values()
+        print(f"  Speedup {old_time / new_time:.2f}x, peak RSS growth {new_peak / max(old_peak, 1):.0%} of legacy")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, nargs="*", default=[10_000, 100_000])
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--run", choices=["legacy", "write-only"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run:
+        run_one(args.run, args.tasks[0], args.seed)
+    else:
+        main(args)
@@ -0,0 +1,63 @@
+"""
+Export Stream Benchmark - Time-to-first-byte and peak memory of CSV/NDJSON exports
+Compares the old buffered CSV (whole file in a StringIO, then getvalue())
+with the chunked generators behind /api/export/csv and /api/export/ndjson.
+Peak memory is traced while the body is consumed, excluding the input tasks.
+
+Usage (from backend/):
+    python -m benchmarks.export_stream_benchmark --tasks 10000 100000
+"""
+import argparse
+import csv
+import io
+import time
+import tracemalloc
+from benchmarks.task_table_benchmark import synthetic_features
+from models.schemas import WBSTask
+from routers.export import _csv_chunks, _ndjson_chunks
+from services.wbs_engine import WBSEngine
+
+
+def buffered_csv(tasks, schedule):
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(['ID', 'Task Name', 'Description', 'Type', 'Hours', 'Level', 'Dependencies'])
+    for task in tasks:
+        writer.writerow([task.id, task.name, task.description, task.task_type,
+                         task.duration_hours, task.level, ', '.join(task.dependencies)])
+    yield output.getvalue().encode("utf-8")
+
+
+def consume(chunks):
+    """(seconds to first chunk, total seconds, bytes, peak traced bytes)"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    first = None
+    size = 0
+    for chunk in chunks:
+        if first is None:
+            first = time.perf_counter() - started
+        size += len(chunk)
+    total = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return first, total, size, peak
+
+
+def main(args):
+    engine = WBSEngine()
+    for count in args.tasks:
+        tasks = [WBSTask(**task) for task in engine.build_task_table(synthetic_features(count, args.seed)).to_dicts()]
+        print(f"📊 {len(tasks):,} tasks")
+        for label, make in (("buffered CSV", buffered_csv), ("streamed CSV", _csv_chunks),
+                            ("streamed NDJSON", _ndjson_chunks)):
+            first, total, size, peak = consume(make(tasks, None))
+            print(f"  {label:<16} first byte {first * 1000:8.1f} ms  total {total * 1000:8.1f} ms  "
+                  f"peak {peak / 2**20:6.1f} MiB  body {size / 2**20:6.1f} MiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, nargs="*", default=[10_000, 100_000])
+    parser.add_argument("--seed", type=int, default=7)
+    main(parser.parse_args())
@@ -0,0 +1,147 @@
+"""
+Keyword Matcher Benchmark - Legacy substring scans vs the compiled matcher
+Classifies synthetic features with the old per-list `any(k in text)` scans and
+with FeatureAnalysisService's single-pass matcher, and reports throughput.
+Also checks that the two agree apart from the intended fixes: every legacy
+hit where the keyword starts a word (acronyms: is the whole word) must still
+be found. Exits non-zero on any lost hit.
+
+Usage (from backend/):
+    python -m benchmarks.keyword_matcher_benchmark --features 100000
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from services.feature_analysis_service import KEYWORD_CATEGORIES, keyword_matcher
+from services.keyword_matcher import MIN_PREFIX_LENGTH
+
+WORDS = [
+    "user", "account", "report", "maintain", "build", "settings", "profile", "team",
+    "notification", "billing", "invoice", "search", "filter", "audit", "role", "access",
+    "workflow", "approval", "calendar", "sync", "history", "status", "integration", "email"
+]
+
+
+# Hand-written feature texts with the inflections real specifications use
+CORPUS = [
+    "User data is persisted to disk and saved between sessions",
+    "Entity modeling and schema migrations for the billing module",
+    "Optimized route planning using a custom algorithm",
+    "Realtime notifications pushed over websockets",
+    "Maintain user settings and profile preferences",
+    "Build a reporting dashboard with charts and graphs",
+    "AI assistant that answers support questions",
+    "Storing audit history and querying past events",
+    "Advanced, distributed job scheduler with retries",
+    "Simple CSV export and PDF download of invoices",
+    "Interactive forms with modal dialogs and navigation menus",
+    "Proof of concept for machine learning based recommendations",
+    "Collections of documents stored in a NoSQL database",
+    "Scalable architecture review and performance testing",
+    "Basic email templates for user onboarding",
+]
+INFLECTIONS = ("s", "ed", "ing", "er")
+
+
+def inflect(keyword, rng):
+    """A keyword as a spec might write it: hyphen dropped or a suffix added"""
+    if "-" in keyword and rng.random() < 0.5:
+        return keyword.replace("-", "")
+    return keyword + rng.choice(INFLECTIONS) if rng.random() < 0.5 else keyword
+
+
+def synthetic_features(count, keyword_rate, seed):
+    rng = random.Random(seed)
+    keywords = [k for keywords in KEYWORD_CATEGORIES.values() for k in keywords]
+    features = [{"id": f"c{i}", "name": text.split(" ")[0], "description": text} for i, text in enumerate(CORPUS)]
+    for i in range(count):
+        name = " ".join(
+            inflect(rng.choice(keywords), rng) if rng.random() < keyword_rate else rng.choice(WORDS)
+            for _ in range(3)
+        ).title()
+        desc = " ".join(
+            inflect(rng.choice(keywords), rng) if rng.random() < keyword_rate else rng.choice(WORDS)
+            for _ in range(rng.randint(8, 40))
+        )
+        features.append({"id": f"f{i}", "name": name, "description": desc})
+    return features
+
+
+def legacy_classify(feature):
+    """The previous implementation: one substring scan per keyword list"""
+    name = feature.get('name', '').lower()
+    desc = feature.get('description', '').lower()
+    text = f"{name} {desc}"
+    return {
+        category for category, keywords in KEYWORD_CATEGORIES.items()
+        if any(keyword in text for keyword in keywords)
+    }
+
+
+# The legacy hits the compiled matcher must keep: keyword at the start of a word,
+# and acronyms only as whole words (dropping "ai" in "maintain" is intended)
+WORD_START_PATTERNS = {
+    category: [
+        re.compile(r"\b" + re.escape(k) + (r"(?:s|es)?\b" if len(k) < MIN_PREFIX_LENGTH else ""))
+        for k in keywords
+    ]
+    for category, keywords in KEYWORD_CATEGORIES.items()
+}
+
+
+def word_start_classify(feature):
+    text = f"{feature.get('name', '')} {feature.get('description', '')}".lower()
+    return {
+        category for category, patterns in WORD_START_PATTERNS.items()
+        if any(pattern.search(text) for pattern in patterns)
+    }
+
+
+def compiled_classify(feature):
+    return keyword_matcher.match(f"{feature.get('name', '')} {feature.get('description', '')}")
+
+
+def run(label, classify, features, repeat):
+    elapsed = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        results = [classify(feature) for feature in features]
+        elapsed = min(elapsed, time.perf_counter() - started)
+    print(f"{label:<10} {elapsed * 1000:9.1f} ms  {len(features) / elapsed:12,.0f} features/s")
+    return results
+
+
+def main(args):
+    features = synthetic_features(args.features, args.keyword_rate, args.seed)
+    print(f"📊 Classifying {len(features):,} synthetic features (best of {args.repeat})")
+    legacy = run("legacy", legacy_classify, features, args.repeat)
+    compiled = run("compiled", compiled_classify, features, args.repeat)
+
+    # Differences come from word-aware matching ("ai" no longer hits "maintain") and inflections
+    differing = sum(1 for a, b in zip(legacy, compiled) if a != b)
+    print(f"Features classified differently: {differing:,} ({differing / len(features):.1%})")
+
+    lost = [
+        (feature, word_start_classify(feature) - hits)
+        for feature, hits in zip(features, compiled)
+        if not word_start_classify(feature) <= hits
+    ]
+    gained = sum(1 for a, b in zip(legacy, compiled) if b - a)
+    print(f"Features gaining hits from inflections (e.g. 'optimized', 'realtime'): {gained:,}")
+    if lost:
+        for feature, categories in lost[:10]:
+            print(f"  ❌ lost {sorted(categories)}: {feature['description'][:80]}")
+        print(f"{len(lost):,} features lost a legacy keyword hit")
+        sys.exit(1)
+    print("✅ Every legacy hit at a word start is still matched")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--features", type=int, default=100_000)
+    parser.add_argument("--keyword-rate", type=float, default=0.05, help="share of words drawn from the keyword tables")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    main(parser.parse_args())
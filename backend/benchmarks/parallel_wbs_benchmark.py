@@ -0,0 +1,52 @@
+"""
+Parallel WBS Benchmark - Serial vs sharded multi-process WBS generation
+Renders the WBSResponse JSON for synthetic pre-analyzed features serially
+(TaskTable.to_json) and with ParallelWBSRenderer for each --workers count,
+and checks the sharded output is byte-identical to the serial one.
+
+Usage (from backend/):
+    python -m benchmarks.parallel_wbs_benchmark --tasks 1000000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import time
+from benchmarks.task_table_benchmark import synthetic_features
+from services.parallel_wbs import ParallelWBSRenderer
+from services.wbs_engine import WBSEngine
+
+
+def best_of(repeat, func):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main(args):
+    engine = WBSEngine()
+    features = synthetic_features(args.tasks, args.seed)
+    print(f"📊 {len(features):,} features, ~{args.tasks:,} tasks, {os.cpu_count()} CPU cores (best of {args.repeat})")
+
+    serial_time, expected = best_of(args.repeat, lambda: engine.build_task_table(features).to_json("Benchmark"))
+    print(f"Serial            {serial_time * 1000:9.1f} ms")
+
+    for workers in args.workers:
+        renderer = ParallelWBSRenderer(engine, workers=workers)
+        try:
+            renderer.render_sharded("Benchmark", features[:10])  # Start the worker processes
+            elapsed, body = best_of(args.repeat, lambda: renderer.render_sharded("Benchmark", features))
+        finally:
+            renderer.shutdown()
+        status = "identical" if body == expected else "MISMATCH"
+        print(f"{workers:>2} workers        {elapsed * 1000:9.1f} ms  {serial_time / elapsed:5.2f}x  {status}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, nargs="*", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    main(parser.parse_args())
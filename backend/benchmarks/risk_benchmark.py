@@ -0,0 +1,35 @@
+"""
+Risk Benchmark - Monte Carlo schedule-risk simulation time
+Times RiskSimulator.simulate on a synthetic task DAG.
+
+Usage (from backend/):
+    python -m benchmarks.risk_benchmark --tasks 3000 --simulations 10000
+"""
+import argparse
+import time
+from benchmarks.scheduler_benchmark import synthetic_tasks
+from services.risk_simulator import RiskSimulator
+
+
+def main(args):
+    tasks = synthetic_tasks(args.tasks, args.max_deps, args.seed)
+    simulator = RiskSimulator()
+
+    started = time.perf_counter()
+    risk = simulator.simulate(tasks, simulations=args.simulations, seed=args.seed)
+    elapsed = time.perf_counter() - started
+
+    print(f"📊 {len(tasks):,} tasks x {args.simulations:,} simulations in {elapsed * 1000:.1f} ms")
+    print(f"Deterministic: {risk['deterministic_duration']} h")
+    print("Percentiles:   " + ", ".join(f"{k.upper()} {v} h" for k, v in risk["percentiles"].items()))
+    critical = sum(1 for task in risk["tasks"] if task["criticality"] >= 0.5)
+    print(f"Tasks critical in >= 50% of runs: {critical:,}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=3000)
+    parser.add_argument("--simulations", type=int, default=10000)
+    parser.add_argument("--max-deps", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=7)
+    main(parser.parse_args())
@@ -0,0 +1,90 @@
+"""
+Task Table Benchmark - Memory and time of WBS generation + serialization, dict rows vs columnar TaskTable
+Generates a WBS for synthetic pre-analyzed features (about --tasks tasks) and
+serializes it the old way (list of dicts -> WBSResponse -> JSON) and the new
+way (TaskTable -> JSON). Peak memory is measured in a separate pass with
+tracemalloc so it does not distort the timings.
+
+Usage (from backend/):
+    python -m benchmarks.task_table_benchmark --tasks 100000
+"""
+import argparse
+import asyncio
+import random
+import time
+import tracemalloc
+from models.schemas import WBSResponse
+from services.wbs_engine import WBSEngine
+
+
+def synthetic_features(task_count, seed):
+    """Pre-analyzed features with a realistic mix of optional phases (about 8 tasks each)"""
+    rng = random.Random(seed)
+    features = []
+    tasks = 0
+    while tasks < task_count:
+        i = len(features) + 1
+        dev_hours = rng.choice([4.0, 8.0, 12.0])
+        analysis = {
+            "needs_rnd": rng.random() < 0.3,
+            "needs_ui": rng.random() < 0.6,
+            "needs_db": rng.random() < 0.4,
+            "dev_hours": dev_hours,
+            "rnd_hours": 3.0,
+            "ui_hours": 2.5,
+            "db_hours": 2.0,
+            "unit_test_hours": round(dev_hours * 0.2, 1),
+            "qa_hours": 2.0
+        }
+        features.append({"id": f"F{i}", "name": f"Feature {i} ({rng.choice(['search', 'billing', 'reports'])})",
+                         "execution_order": i, "analysis": analysis})
+        dev_tasks = 2 if dev_hours <= 4 else 4 if dev_hours <= 8 else 6
+        tasks += dev_tasks + 2 + analysis["needs_rnd"] + analysis["needs_ui"] + analysis["needs_db"]
+    return features
+
+
+def legacy(engine, features):
+    wbs = asyncio.run(engine.generate_wbs("Benchmark", features))
+    return WBSResponse(**wbs).model_dump_json()
+
+
+def columnar(engine, features):
+    return engine.build_task_table(features).to_json("Benchmark")
+
+
+def measure(func, engine, features, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = func(engine, features)
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    func(engine, features)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak, len(body)
+
+
+def main(args):
+    engine = WBSEngine()
+    features = synthetic_features(args.tasks, args.seed)
+    table = engine.build_task_table(features)
+    print(f"📊 {len(features):,} features -> {len(table):,} tasks (best of {args.repeat})")
+
+    results = {}
+    for label, func in (("dict + WBSResponse", legacy), ("TaskTable", columnar)):
+        elapsed, peak, size = measure(func, engine, features, args.repeat)
+        results[label] = (elapsed, peak)
+        print(f"{label:<20} {elapsed * 1000:9.1f} ms  peak {peak / 2**20:8.1f} MiB  body {size / 2**20:.1f} MiB")
+
+    (old_time, old_peak), (new_time, new_peak) = results.values()
+    print(f"Speedup: {old_time / new_time:.2f}x, peak memory {new_peak / old_peak:.0%} of legacy")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    main(parser.parse_args())
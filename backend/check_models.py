@@ -1,12 +1,14 @@
-import os
-from google import genai
-from dotenv import load_dotenv
+import asyncio
+from services.gemini_client import GeminiClientRegistry
 
-load_dotenv()
-api_key = os.getenv("GEMINI_API_KEY")
+async def main():
+    gemini = GeminiClientRegistry.from_settings()
+    try:
+        print("START_LIST")
+        async for m in await gemini.client.aio.models.list():
+            print(f"MODEL: {m.name}")
+        print("END_LIST")
+    finally:
+        await gemini.aclose()
 
-client = genai.Client(api_key=api_key)
-print("START_LIST")
-for m in client.models.list():
-    print(f"MODEL: {m.name}")
-print("END_LIST")
+asyncio.run(main())
@@ -2,6 +2,8 @@
 Configuration management for WBS Generator
 """
 import os
+import tempfile
+from typing import Dict, Optional
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
 
@@ -15,6 +17,97 @@ class Settings(BaseSettings):
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
     GEMINI_MODEL: str = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
     
+    # Shared Gemini client connection pool
+    GEMINI_MAX_CONNECTIONS: int = 20
+    GEMINI_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    GEMINI_KEEPALIVE_EXPIRY: float = 60.0
+    GEMINI_PREWARM: bool = True
+    
+    # Process-wide Gemini rate limiting and retry backoff
+    GEMINI_RPM: int = 60
+    GEMINI_TPM: int = 1_000_000
+    GEMINI_MAX_CONCURRENCY: int = 8
+    GEMINI_MIN_CONCURRENCY: int = 1
+    GEMINI_MAX_RETRIES: int = 4
+    GEMINI_BACKOFF_BASE: float = 1.0
+    GEMINI_BACKOFF_MAX: float = 30.0
+    
+    # Per-operation deadlines (seconds) and p95 request hedging
+    GEMINI_TIMEOUT_SECONDS: float = 60.0
+    GEMINI_OPERATION_TIMEOUTS: Dict[str, float] = {
+        "analysis": 30.0,
+        "analysis_batch": 45.0,
+        "ordering": 30.0,
+        "test": 15.0
+    }
+    GEMINI_HEDGING_ENABLED: bool = True
+    GEMINI_HEDGE_MIN_SAMPLES: int = 20
+    GEMINI_HEDGE_PERCENTILE: float = 0.95
+    
+    # Shared circuit breaker (falls back to local results while open)
+    GEMINI_BREAKER_FAILURE_RATE: float = 0.5
+    GEMINI_BREAKER_MIN_CALLS: int = 5
+    GEMINI_BREAKER_WINDOW_SECONDS: float = 60.0
+    GEMINI_BREAKER_COOLDOWN_SECONDS: float = 30.0
+    
+    # Transport: "live", "record" (live + save to cassette) or "replay" (offline from cassette)
+    GEMINI_TRANSPORT: str = "live"
+    GEMINI_CASSETTE_PATH: str = "temp/cassettes/gemini.json"
+    GEMINI_REPLAY_LATENCY_MS: float = 0.0
+    GEMINI_REPLAY_LATENCY_DISTRIBUTION: str = "lognormal"  # fixed | uniform | lognormal
+    GEMINI_REPLAY_ERROR_RATES: Dict[str, float] = {}  # e.g. {"429": 0.05, "503": 0.01, "malformed": 0.02}
+    GEMINI_REPLAY_SEED: Optional[int] = None
+    
+    # Gemini response cache (persists across restarts)
+    AI_CACHE_ENABLED: bool = True
+    AI_CACHE_PATH: str = os.path.join(tempfile.gettempdir(), "wbs_generator", "gemini_cache.sqlite3")
+    AI_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    AI_CACHE_MAX_ENTRIES: int = 5000
+    
+    # Feature analysis memo (hours + AI verdict per feature content, shared across projects)
+    ANALYSIS_MEMO_ENABLED: bool = True
+    ANALYSIS_MEMO_PATH: str = os.path.join(tempfile.gettempdir(), "wbs_generator", "analysis_memo.sqlite3")
+    ANALYSIS_MEMO_TTL_SECONDS: int = 30 * 24 * 3600
+    ANALYSIS_MEMO_MAX_ENTRIES: int = 50000
+    
+    # Batched feature analysis (features packed per Gemini prompt)
+    AI_BATCH_MAX_FEATURES: int = 15
+    AI_BATCH_MAX_CHARS: int = 6000
+    AI_BATCH_MAX_RETRIES: int = 1
+    
+    # Map-reduce extraction for long specifications (characters per chunk)
+    AI_CHUNK_MAX_CHARS: int = 12000
+    
+    # Monte Carlo schedule risk (simulation cells per batch bound memory: tasks x runs)
+    RISK_SIMULATIONS: int = 10000
+    RISK_MAX_CELLS: int = 4_000_000
+    RISK_SEED: Optional[int] = None
+    
+    # Sharded WBS generation (process pool; 0 workers = one per CPU core)
+    WBS_PARALLEL_THRESHOLD: int = 2000  # Features
+    WBS_PARALLEL_WORKERS: int = 0
+    
+    # Rollup indexes kept in memory for /api/wbs/rollup queries
+    ROLLUP_INDEX_MAX_ENTRIES: int = 64
+    
+    # Streamed CSV / NDJSON exports (rows encoded per chunk)
+    EXPORT_STREAM_CHUNK_ROWS: int = 500
+    
+    # Excel exports are built in memory up to this size, then spill to a temp file
+    EXCEL_SPOOL_MAX_BYTES: int = 16 * 1024 * 1024
+    
+    # Content-addressed export cache (janitor evicts by age, then LRU down to the size budget)
+    EXPORT_CACHE_ENABLED: bool = True
+    EXPORT_CACHE_DIR: str = "temp/exports"
+    EXPORT_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    EXPORT_CACHE_MAX_AGE_SECONDS: int = 24 * 3600
+    EXPORT_CACHE_SWEEP_SECONDS: int = 600
+    
+    # Background export jobs (process pool; finished jobs are forgotten after the TTL)
+    EXPORT_JOB_WORKERS: int = 2
+    EXPORT_JOB_MAX_ACTIVE: int = 16
+    EXPORT_JOB_TTL_SECONDS: int = 3600
+    
     # File paths
     UPLOAD_DIR: str = "temp/uploads"
     EXPORT_DIR: str = "temp/exports"
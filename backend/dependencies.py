@@ -0,0 +1,25 @@
+"""
+FastAPI dependencies - Shared service instances created in the app lifespan
+"""
+from fastapi import Request
+from services.gemini_client import GeminiClientRegistry
+from services.ai_service import AIService
+from services.pdf_service import PDFService
+from services.competitor_service import CompetitorService
+from services.feature_analysis_service import FeatureAnalysisService
+
+
+def get_gemini(request: Request) -> GeminiClientRegistry:
+    return request.app.state.gemini
+
+def get_ai_service(request: Request) -> AIService:
+    return request.app.state.ai_service
+
+def get_pdf_service(request: Request) -> PDFService:
+    return request.app.state.pdf_service
+
+def get_competitor_service(request: Request) -> CompetitorService:
+    return request.app.state.competitor_service
+
+def get_feature_analyzer(request: Request) -> FeatureAnalysisService:
+    return request.app.state.feature_analyzer
@@ -39,6 +39,8 @@ class Feature(BaseModel):
     confidence: Optional[float] = 0.8
     execution_order: Optional[int] = None  # Sequential order: 1, 2, 3...
     reasoning: Optional[str] = None  # AI's explanation for ordering
+    dependencies: Optional[List[str]] = None  # IDs (or names) of features that must be finished first
+    dependencies_inferred: bool = False  # Extracted by AI: unresolvable dependencies are dropped, not rejected
     analysis: Optional[FeatureAnalysis] = None  # NEW: Intelligent task analysis
 
 class FlowGenerateRequest(BaseModel):
@@ -49,6 +51,7 @@ class FlowGenerateRequest(BaseModel):
 class WBSGenerateRequest(BaseModel):
     project_name: str
     features: List[Feature]
+    stable_ids: bool = False  # "{feature_id}-{kind}" task IDs instead of "T{n}"
 
 class FeatureListResponse(BaseModel):
     project_name: str
@@ -73,6 +76,116 @@ class WBSResponse(BaseModel):
     total_tasks: int
     total_hours: float
 
+class WBSRegenerateRequest(BaseModel):
+    project_name: str
+    tasks: List[WBSTask]  # Previous WBS
+    added: List[Feature] = Field(default_factory=list)
+    changed: List[Feature] = Field(default_factory=list)  # Same feature ID, new content
+    removed: List[str] = Field(default_factory=list)  # Feature IDs
+
+class WBSPatchResponse(BaseModel):
+    project_name: str
+    added: List[WBSTask]
+    updated: List[WBSTask]  # Existing task IDs with new content or dependencies
+    removed: List[str]  # Task IDs
+    total_tasks: int
+    total_hours: float
+
+# ============ SCHEDULE MODELS ============
+
+class ScheduleRequest(BaseModel):
+    project_name: Optional[str] = None
+    tasks: List[WBSTask]
+
+class ScheduledTask(BaseModel):
+    id: str
+    earliest_start: float
+    earliest_finish: float
+    latest_start: float
+    latest_finish: float
+    slack: float
+    critical: bool
+
+class ScheduleResponse(BaseModel):
+    project_name: Optional[str] = None
+    tasks: List[ScheduledTask]
+    project_duration: float  # Hours from start to finish with unlimited parallelism
+    total_work_hours: float  # Sum of all task hours
+    critical_path: List[str]
+
+class ResourceScheduleRequest(BaseModel):
+    project_name: Optional[str] = None
+    tasks: List[WBSTask]
+    team_size: Optional[int] = Field(None, ge=1)  # Generalists fill seats not covered by role_capacity
+    role_capacity: Dict[str, int] = Field(default_factory=dict)  # Dev | QA | UI/UX | DB | R&D -> people
+
+class AssignedTask(BaseModel):
+    id: str
+    assignee: str
+    start: float
+    finish: float
+
+class TimelineEntry(BaseModel):
+    id: str
+    start: float
+    finish: float
+
+class PersonTimeline(BaseModel):
+    person: str
+    role: str  # Dev | QA | UI/UX | DB | R&D | Any
+    tasks: List[TimelineEntry]
+    busy_hours: float
+    utilization: float
+
+class ResourceScheduleResponse(BaseModel):
+    project_name: Optional[str] = None
+    tasks: List[AssignedTask]
+    timelines: List[PersonTimeline]
+    team_size: int
+    makespan: float  # Hours until the last task finishes with this team
+    critical_path_length: float  # Lower bound with unlimited people
+    total_work_hours: float
+
+class RiskRequest(BaseModel):
+    project_name: Optional[str] = None
+    tasks: List[WBSTask]
+    simulations: Optional[int] = Field(None, ge=100, le=200000)  # Defaults to settings.RISK_SIMULATIONS
+    seed: Optional[int] = None  # Fix for reproducible results
+    feature_complexity: Dict[str, str] = Field(default_factory=dict)  # parent_id -> simple | medium | complex
+
+class TaskCriticality(BaseModel):
+    id: str
+    criticality: float  # Share of simulations in which the task was on the critical path
+
+class RiskResponse(BaseModel):
+    project_name: Optional[str] = None
+    simulations: int
+    deterministic_duration: float  # CPM duration with point estimates
+    mean_duration: float
+    std_duration: float
+    percentiles: Dict[str, float]  # p50 / p80 / p95 completion time in hours
+    on_time_probability: float  # Chance of finishing within the deterministic duration
+    tasks: List[TaskCriticality]
+
+class RollupRequest(BaseModel):
+    project_name: Optional[str] = None
+    tasks: List[WBSTask]
+
+class NodeRollup(BaseModel):
+    node_id: Optional[str] = None  # Task or parent (feature) ID; None = whole project
+    hours_by_type: Dict[str, float]
+    total_hours: float
+    task_count: int
+
+class RollupResponse(BaseModel):
+    index_id: str  # Handle for node queries and updates
+    project_name: Optional[str] = None
+    project: NodeRollup
+    children: List[NodeRollup]  # Top-level nodes (features)
+
+class RollupUpdateRequest(BaseModel):
+    duration_hours: float = Field(..., ge=0)
+
 # ============ EXPORT MODELS ============
 
 class ExportRequest(BaseModel):
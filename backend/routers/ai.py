@@ -1,13 +1,15 @@
 """
 AI Router - Gemini API Testing
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from services.ai_service import AIService
+from services.gemini_client import GeminiClientRegistry
+from services.feature_analysis_service import FeatureAnalysisService
+from dependencies import get_ai_service, get_gemini, get_feature_analyzer
 from pydantic import BaseModel
 from typing import Dict, Any
 
 router = APIRouter()
-ai_service = AIService()
 
 class ModelTestResponse(BaseModel):
     model: str
@@ -16,7 +18,7 @@ class ModelTestResponse(BaseModel):
     details: Dict[str, Any]
 
 @router.post("/test-gemini", response_model=ModelTestResponse)
-async def test_gemini():
+async def test_gemini(ai_service: AIService = Depends(get_ai_service)):
     """Test Gemini API connection"""
     try:
         result = await ai_service.test_gemini_connection()
@@ -42,3 +44,36 @@ async def list_models():
         "gemini": [settings.GEMINI_MODEL] if settings.GEMINI_API_KEY else [],
         "active_model": settings.GEMINI_MODEL if settings.GEMINI_API_KEY else None
     }
+
+@router.get("/cache/stats")
+async def cache_stats(ai_service: AIService = Depends(get_ai_service)):
+    """Gemini response cache hit/miss counters"""
+    if not ai_service.cache:
+        return {"enabled": False}
+    return {"enabled": True, **ai_service.cache.stats()}
+
+@router.delete("/cache")
+async def clear_cache(ai_service: AIService = Depends(get_ai_service)):
+    """Drop all cached Gemini responses"""
+    if ai_service.cache:
+        ai_service.cache.clear()
+    return {"cleared": ai_service.cache is not None}
+
+@router.get("/analysis-memo/stats")
+async def analysis_memo_stats(feature_analyzer: FeatureAnalysisService = Depends(get_feature_analyzer)):
+    """Feature analysis memo hit/miss counters"""
+    if not feature_analyzer.memo:
+        return {"enabled": False}
+    return {"enabled": True, **feature_analyzer.memo.stats()}
+
+@router.delete("/analysis-memo")
+async def clear_analysis_memo(feature_analyzer: FeatureAnalysisService = Depends(get_feature_analyzer)):
+    """Forget all memoized feature analyses"""
+    if feature_analyzer.memo:
+        feature_analyzer.memo.clear()
+    return {"cleared": feature_analyzer.memo is not None}
+
+@router.get("/metrics")
+async def ai_metrics(gemini: GeminiClientRegistry = Depends(get_gemini)):
+    """Shared Gemini traffic counters (coalesced calls, ...)"""
+    return gemini.metrics()
@@ -1,13 +1,13 @@
 """
 Competitor Router - Handle competitor research and feature suggestions
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import List, Dict
 from services.competitor_service import CompetitorService
+from dependencies import get_competitor_service
 
 router = APIRouter()
-competitor_service = CompetitorService()
 
 class ResearchRequest(BaseModel):
     project_name: str
@@ -27,7 +27,10 @@ class FeatureGenerationResponse(BaseModel):
     features: List[Dict]
 
 @router.post("/research", response_model=ResearchResponse)
-async def research_competitors(request: ResearchRequest):
+async def research_competitors(
+    request: ResearchRequest,
+    competitor_service: CompetitorService = Depends(get_competitor_service)
+):
     """
     Research competitors and get enhancement suggestions
     """
@@ -45,7 +48,10 @@ async def research_competitors(request: ResearchRequest):
         raise HTTPException(status_code=500, detail=f"Research failed: {str(e)}")
 
 @router.post("/generate-features", response_model=FeatureGenerationResponse)
-async def generate_features(request: FeatureGenerationRequest):
+async def generate_features(
+    request: FeatureGenerationRequest,
+    competitor_service: CompetitorService = Depends(get_competitor_service)
+):
     """
     Generate initial feature list based on research
     """
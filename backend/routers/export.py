@@ -1,80 +1,316 @@
 """
-Export Router - Excel, CSV, JSON exports
+Export Router - Excel, CSV, NDJSON, JSON exports
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List
+from typing import BinaryIO, Dict, Iterator, List, Optional
+from urllib.parse import quote
+from config import settings
 from services.excel_generator import ExcelGenerator
+from services.export_cache import ExportCache
+from services.export_jobs import ExportJobManager
+from services.scheduler import CPMScheduler
 from models.schemas import WBSTask
 import io
 import json
 import csv
+import tempfile
 
 router = APIRouter()
 excel_gen = ExcelGenerator()
+scheduler = CPMScheduler()
+export_cache = ExportCache()
+export_jobs = ExportJobManager(export_cache)
+
+EXCEL_CHUNK_BYTES = 64 * 1024
+ETAG_INLINE_ROWS = 1000  # Larger exports are hashed in a worker thread
+EXCEL_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+SCHEDULE_HEADERS = ['Earliest Start', 'Earliest Finish', 'Latest Start', 'Latest Finish', 'Slack', 'Critical']
 
 class ExportRequest(BaseModel):
     project_name: str
     tasks: List[WBSTask]
+    include_schedule: bool = False  # Add CPM columns (ES/EF/LS/LF/slack/critical)
+
+class ExportJobStatus(BaseModel):
+    job_id: str
+    status: str  # queued | running | cancelling | done | failed | cancelled
+    progress: float  # 0..1, rows written / total rows
+    rows_written: int
+    total_rows: int
+    error: Optional[str] = None
+    created_at: float
+    expires_at: Optional[float] = None  # Finished jobs are forgotten after EXPORT_JOB_TTL_SECONDS
+
+async def _schedule(request: ExportRequest, tasks: List[Dict]) -> Optional[Dict]:
+    """CPM schedule for the export (computed in a worker thread), or None when not requested"""
+    if not request.include_schedule:
+        return None
+    try:
+        schedule = await run_in_threadpool(scheduler.schedule, tasks)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Cannot schedule WBS: {str(e)}")
+    return schedule
+
+def _schedule_row(entry: Dict) -> List:
+    return [
+        entry["earliest_start"],
+        entry["earliest_finish"],
+        entry["latest_start"],
+        entry["latest_finish"],
+        entry["slack"],
+        "Yes" if entry["critical"] else "No"
+    ]
+
+def _attachment(filename: str) -> str:
+    """Content-Disposition value, RFC 5987-encoded when the name is not plain ASCII"""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+def _export_key(export_format: str, request: ExportRequest, tasks: List[Dict]) -> str:
+    return export_cache.key(export_format, request.project_name, tasks, include_schedule=request.include_schedule)
+
+async def _etag(export_format: str, request: ExportRequest, tasks: List[Dict]) -> str:
+    """Strong ETag: the export's content-addressed cache key (large task lists are hashed off the event loop)"""
+    if len(tasks) > ETAG_INLINE_ROWS:
+        key = await run_in_threadpool(_export_key, export_format, request, tasks)
+    else:
+        key = _export_key(export_format, request, tasks)
+    return f'"{key}"'
+
+def _precondition_failed(http_request: Request, etag: str) -> Optional[Response]:
+    """
+    412 when the client's If-None-Match explicitly names this export (these are
+    POST endpoints, so a matching tag fails the precondition rather than 304).
+    "*" is ignored: nothing is stored server-side for it to match.
+    """
+    header = http_request.headers.get("if-none-match")
+    if not header:
+        return None
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    if etag in candidates:
+        return Response(status_code=412, headers={"ETag": etag})
+    return None
+
+def _file_chunks(file: BinaryIO) -> Iterator[bytes]:
+    """Read a file object in chunks, closing it when done (or when the client goes away)"""
+    try:
+        while chunk := file.read(EXCEL_CHUNK_BYTES):
+            yield chunk
+    finally:
+        file.close()
+
+def _render_excel(project_name: str, tasks: List[Dict], schedule: Optional[Dict]) -> BinaryIO:
+    """Workbook in a spooled buffer: memory up to EXCEL_SPOOL_MAX_BYTES, then a temp file"""
+    output = tempfile.SpooledTemporaryFile(max_size=settings.EXCEL_SPOOL_MAX_BYTES)
+    try:
+        excel_gen.write_excel(output, project_name, tasks, schedule)
+    except Exception:
+        output.close()
+        raise
+    output.seek(0)
+    return output
 
 @router.post("/excel")
-async def export_to_excel(request: ExportRequest):
-    """Export WBS to Excel format"""
+async def export_to_excel(request: ExportRequest, http_request: Request):
+    """Export WBS to Excel format (built in a worker thread; identical re-exports come from the cache)"""
+    tasks = [task.dict() for task in request.tasks]
+    etag = await _etag("xlsx", request, tasks)
+    precondition_failed = _precondition_failed(http_request, etag)
+    if precondition_failed:
+        return precondition_failed
+    
+    filename = f"{request.project_name}_WBS.xlsx"
+    key = etag.strip('"')
+    if settings.EXPORT_CACHE_ENABLED:
+        cached = export_cache.get(key, ".xlsx")
+        if cached:
+            print(f"📦 Export cache hit: {filename}")
+            return FileResponse(cached, filename=filename, media_type=EXCEL_MEDIA_TYPE, headers={"ETag": etag})
+    
+    schedule = await _schedule(request, tasks)
     try:
-        file_path = excel_gen.generate_excel(
-            project_name=request.project_name,
-            tasks=[task.dict() for task in request.tasks]
-        )
-        return FileResponse(
-            path=file_path,
-            filename=f"{request.project_name}_WBS.xlsx",
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
+        if settings.EXPORT_CACHE_ENABLED:
+            path = await run_in_threadpool(
+                export_cache.put, key, ".xlsx",
+                lambda output: excel_gen.write_excel(output, request.project_name, tasks, schedule)
+            )
+            return FileResponse(path, filename=filename, media_type=EXCEL_MEDIA_TYPE, headers={"ETag": etag})
+        output = await run_in_threadpool(_render_excel, request.project_name, tasks, schedule)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Excel export failed: {str(e)}")
+    
+    # Each render embeds fresh workbook timestamps: same content, different bytes, so the tag is weak
+    size = output.seek(0, io.SEEK_END)
+    output.seek(0)
+    return StreamingResponse(
+        _file_chunks(output),
+        media_type=EXCEL_MEDIA_TYPE,
+        headers={
+            "Content-Disposition": _attachment(filename),
+            "Content-Length": str(size),
+            "ETag": "W/" + etag
+        }
+    )
+
+def _csv_chunks(tasks: List[WBSTask], schedule: Optional[Dict]) -> Iterator[bytes]:
+    """CSV rows encoded in chunks of EXPORT_STREAM_CHUNK_ROWS; only one chunk is ever buffered"""
+    chunk_rows = settings.EXPORT_STREAM_CHUNK_ROWS
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    
+    # Header
+    headers = ['ID', 'Task Name', 'Description', 'Type', 'Hours', 'Level', 'Dependencies']
+    writer.writerow(headers + SCHEDULE_HEADERS if schedule else headers)
+    
+    # Data
+    for i, task in enumerate(tasks, 1):
+        row = [
+            task.id,
+            task.name,
+            task.description,
+            task.task_type,
+            task.duration_hours,
+            task.level,
+            ', '.join(task.dependencies)
+        ]
+        if schedule:
+            row += _schedule_row(schedule["tasks"][i - 1])
+        writer.writerow(row)
+        if i % chunk_rows == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+def _ndjson_chunks(tasks: List[WBSTask], schedule: Optional[Dict]) -> Iterator[bytes]:
+    """One JSON object per line (task fields plus its CPM entry when scheduled), chunked like the CSV"""
+    chunk_rows = settings.EXPORT_STREAM_CHUNK_ROWS
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    lines = []
+    for i, task in enumerate(tasks):
+        line = task.model_dump_json()
+        if schedule:
+            entry = {k: v for k, v in schedule["tasks"][i].items() if k != "id"}
+            line = line[:-1] + ',"schedule":' + encode(entry) + "}"
+        lines.append(line)
+        if len(lines) == chunk_rows:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+    
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
 
 @router.post("/csv")
-async def export_to_csv(request: ExportRequest):
-    """Export WBS to CSV format"""
-    try:
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Header
-        writer.writerow(['ID', 'Task Name', 'Description', 'Type', 'Hours', 'Level', 'Dependencies'])
-        
-        # Data
-        for task in request.tasks:
-            writer.writerow([
-                task.id,
-                task.name,
-                task.description,
-                task.task_type,
-                task.duration_hours,
-                task.level,
-                ', '.join(task.dependencies)
-            ])
-        
-        output.seek(0)
-        return StreamingResponse(
-            iter([output.getvalue()]),
-            media_type="text/csv",
-            headers={"Content-Disposition": f"attachment; filename={request.project_name}_WBS.csv"}
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"CSV export failed: {str(e)}")
+async def export_to_csv(request: ExportRequest, http_request: Request):
+    """Export WBS to CSV format (streamed row by row)"""
+    tasks = [task.dict() for task in request.tasks]
+    etag = await _etag("csv", request, tasks)
+    precondition_failed = _precondition_failed(http_request, etag)
+    if precondition_failed:
+        return precondition_failed
+    schedule = await _schedule(request, tasks)
+    return StreamingResponse(
+        _csv_chunks(request.tasks, schedule),
+        media_type="text/csv",
+        headers={"Content-Disposition": _attachment(f"{request.project_name}_WBS.csv"), "ETag": etag}
+    )
+
+@router.post("/ndjson")
+async def export_to_ndjson(request: ExportRequest, http_request: Request):
+    """Export WBS as newline-delimited JSON (one task per line, streamed)"""
+    tasks = [task.dict() for task in request.tasks]
+    etag = await _etag("ndjson", request, tasks)
+    precondition_failed = _precondition_failed(http_request, etag)
+    if precondition_failed:
+        return precondition_failed
+    schedule = await _schedule(request, tasks)
+    return StreamingResponse(
+        _ndjson_chunks(request.tasks, schedule),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": _attachment(f"{request.project_name}_WBS.ndjson"), "ETag": etag}
+    )
 
 @router.post("/json")
-async def export_to_json(request: ExportRequest):
+async def export_to_json(request: ExportRequest, http_request: Request, response: Response):
     """Export WBS to JSON format"""
+    tasks = [task.dict() for task in request.tasks]
+    etag = await _etag("json", request, tasks)
+    precondition_failed = _precondition_failed(http_request, etag)
+    if precondition_failed:
+        return precondition_failed
+    response.headers["ETag"] = etag
+    schedule = await _schedule(request, tasks)
     try:
         data = {
             "project_name": request.project_name,
-            "tasks": [task.dict() for task in request.tasks],
+            "tasks": tasks,
             "total_tasks": len(request.tasks),
             "total_hours": sum(task.duration_hours for task in request.tasks)
         }
+        if schedule:
+            data["schedule"] = schedule
         return data
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"JSON export failed: {str(e)}")
+
+@router.post("/jobs", response_model=ExportJobStatus, status_code=202)
+async def submit_export_job(request: ExportRequest):
+    """Start a background Excel export for large WBS files; poll the job, then download it"""
+    tasks = [task.dict() for task in request.tasks]
+    key = (await _etag("xlsx", request, tasks)).strip('"')
+    try:
+        return export_jobs.submit(
+            request.project_name, tasks, request.include_schedule, key, f"{request.project_name}_WBS.xlsx"
+        )
+    except RuntimeError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+@router.get("/jobs/{job_id}", response_model=ExportJobStatus)
+async def export_job_status(job_id: str):
+    """Status and progress of a background export"""
+    job = export_jobs.status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Export job not found or expired")
+    return job
+
+@router.get("/jobs/{job_id}/download")
+async def download_export_job(job_id: str):
+    """Download a finished background export"""
+    job = export_jobs.status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Export job not found or expired")
+    if job["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"Export job is {job['status']}")
+    result = export_jobs.result(job_id)
+    if result is None:
+        raise HTTPException(status_code=410, detail="Export file expired; submit the export again")
+    return FileResponse(
+        result["path"], filename=result["filename"], media_type=EXCEL_MEDIA_TYPE,
+        headers={"ETag": result["etag"]}
+    )
+
+@router.delete("/jobs/{job_id}", response_model=ExportJobStatus)
+async def cancel_export_job(job_id: str):
+    """Cancel a queued or running background export"""
+    job = export_jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Export job not found or expired")
+    return job
+
+@router.get("/cache/stats")
+async def export_cache_stats():
+    """Files and bytes held by the export cache"""
+    return await run_in_threadpool(export_cache.stats)
+
+@router.post("/cache/sweep")
+async def sweep_export_cache():
+    """Run the export cache janitor now"""
+    return await run_in_threadpool(export_cache.sweep)
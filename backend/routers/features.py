@@ -2,20 +2,19 @@
 Features Router - Extract, generate, validate features
 """
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List
 from services.ai_service import AIService
 from services.pdf_service import PDFService
+from dependencies import get_ai_service, get_pdf_service
 from models.schemas import FeatureListResponse, ProjectRequest, CompetitorAnalysisResponse, FlowGenerateRequest
 import tempfile
+import json
 import os
 
 router = APIRouter()
 
-# Dependencies
-ai_service = AIService()
-pdf_service = PDFService()
-
 class FeatureRequest(BaseModel):
     project_name: str
     description: str
@@ -25,7 +24,7 @@ class PDFExtractRequest(BaseModel):
 
 # 1. Generate features from project description
 @router.post("/generate", response_model=FeatureListResponse)
-async def generate_features(request: FeatureRequest):
+async def generate_features(request: FeatureRequest, ai_service: AIService = Depends(get_ai_service)):
     """Generate features from project description using AI"""
     try:
         features = await ai_service.extract_features_from_text(
@@ -39,11 +38,36 @@ async def generate_features(request: FeatureRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Feature generation failed: {str(e)}")
 
+def _sse(event: str, data) -> str:
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+# 1b. Stream generated features over Server-Sent Events
+@router.post("/generate/stream")
+async def generate_features_stream(request: FeatureRequest, ai_service: AIService = Depends(get_ai_service)):
+    """Stream features as Gemini generates them (one `feature` event per object, then `done`)"""
+    async def events():
+        count = 0
+        try:
+            async for feature in ai_service.stream_features_from_text(
+                f"Project: {request.project_name}\nDescription: {request.description}"
+            ):
+                count += 1
+                yield _sse("feature", feature)
+            yield _sse("done", {"project_name": request.project_name, "total_features": count})
+        except Exception as e:
+            yield _sse("error", {"detail": f"Feature generation failed: {str(e)}"})
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
 # 2. Extract features from PDF
 @router.post("/extract-pdf", response_model=FeatureListResponse)
 async def extract_features_from_pdf(
     pdf_file: UploadFile = File(...),
-    project_name: str = "Untitled Project"
+    project_name: str = "Untitled Project",
+    pdf_service: PDFService = Depends(get_pdf_service)
 ):
     """Extract features from uploaded PDF specification"""
     try:
@@ -86,9 +110,40 @@ async def extract_features_from_pdf(
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"PDF extraction failed: {str(e)}")
 
+# 2b. Stream features extracted from PDF over Server-Sent Events
+@router.post("/extract-pdf/stream")
+async def extract_features_from_pdf_stream(
+    pdf_file: UploadFile = File(...),
+    project_name: str = "Untitled Project",
+    pdf_service: PDFService = Depends(get_pdf_service)
+):
+    """Stream features from an uploaded PDF as soon as each one is extracted"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
+        content = await pdf_file.read()
+        tmp_file.write(content)
+        tmp_path = tmp_file.name
+    
+    async def events():
+        count = 0
+        try:
+            async for feature in pdf_service.stream_uploaded_pdf(tmp_path, project_name):
+                count += 1
+                yield _sse("feature", feature)
+            yield _sse("done", {"project_name": project_name, "total_features": count})
+        except Exception as e:
+            print(f"[PDF] STREAM ERROR: {str(e)}")
+            yield _sse("error", {"detail": f"PDF extraction failed: {str(e)}"})
+        finally:
+            try:
+                os.unlink(tmp_path)
+            except:
+                pass
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
 # 3. Competitor analysis
 @router.post("/competitors", response_model=CompetitorAnalysisResponse)
-async def analyze_competitors(request: FeatureRequest):
+async def analyze_competitors(request: FeatureRequest, ai_service: AIService = Depends(get_ai_service)):
     """Analyze competitors and suggest enhancements"""
     try:
         analysis = await ai_service.analyze_competitors(
@@ -101,7 +156,11 @@ async def analyze_competitors(request: FeatureRequest):
 
 # 4. Generate Execution Flow (Dependencies)
 @router.post("/flow", response_model=FeatureListResponse)
-async def generate_flow(request: FlowGenerateRequest):
+async def generate_flow(
+    request: FlowGenerateRequest,
+    ai_service: AIService = Depends(get_ai_service),
+    pdf_service: PDFService = Depends(get_pdf_service)
+):
     """Generate execution flow/dependencies for features"""
     try:
         print(f"[FLOW] Received request for project: {request.project_name}")
@@ -111,9 +170,11 @@ async def generate_flow(request: FlowGenerateRequest):
         features_dicts = [f.model_dump() for f in request.features]
         print(f"[FLOW] Successfully converted {len(features_dicts)} features to dicts")
         
-        updated_features = await ai_service.extract_workflow_from_text(
+        workflow = await ai_service.extract_workflow_from_text(
             "\n".join([f"{f.name}: {f.description}" for f in request.features])
         )
+        # Map the AI's order/deps keys onto the Feature schema (execution_order, dependencies)
+        updated_features = [pdf_service._normalize_feature(f, i) for i, f in enumerate(workflow)]
         print(f"[FLOW] AI service returned {len(updated_features)} features")
         
         response = FeatureListResponse(
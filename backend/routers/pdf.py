@@ -1,15 +1,15 @@
 """
 PDF Router - Handle PDF upload and feature extraction
 """
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
 from pydantic import BaseModel
 from typing import List, Dict
 from services.pdf_service import PDFService
+from dependencies import get_pdf_service
 import os
 import uuid
 
 router = APIRouter()
-pdf_service = PDFService()
 
 class PDFExtractionResponse(BaseModel):
     success: bool
@@ -20,7 +20,8 @@ class PDFExtractionResponse(BaseModel):
 @router.post("/upload", response_model=PDFExtractionResponse)
 async def upload_and_extract_pdf(
     file: UploadFile = File(...),
-    project_name: str = "Unnamed Project"
+    project_name: str = "Unnamed Project",
+    pdf_service: PDFService = Depends(get_pdf_service)
 ):
     """
     Upload PDF and extract features
@@ -1,20 +1,37 @@
 """
 WBS Router - Work Breakdown Structure Generation
 """
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Optional
 from services.wbs_engine import WBSEngine
-from services.ai_service import AIService
 from services.feature_analysis_service import FeatureAnalysisService
-from models.schemas import WBSResponse, WBSTask, WBSGenerateRequest
+from services.scheduler import CPMScheduler, ResourceScheduler
+from services.risk_simulator import RiskSimulator
+from services.incremental_wbs import IncrementalWBSBuilder
+from services.parallel_wbs import ParallelWBSRenderer
+from services.rollup_index import RollupIndex, RollupStore
+from dependencies import get_feature_analyzer
+from models.schemas import (
+    WBSResponse, WBSTask, WBSGenerateRequest, WBSRegenerateRequest, WBSPatchResponse,
+    ScheduleRequest, ScheduleResponse, ResourceScheduleRequest, ResourceScheduleResponse, RiskRequest, RiskResponse,
+    RollupRequest, RollupResponse, NodeRollup, RollupUpdateRequest
+)
 
 router = APIRouter()
 wbs_engine = WBSEngine()
-ai_service = AIService()
-feature_analyzer = FeatureAnalysisService(ai_service)
+scheduler = CPMScheduler()
+resource_scheduler = ResourceScheduler(scheduler)
+risk_simulator = RiskSimulator(scheduler)
+incremental_builder = IncrementalWBSBuilder(wbs_engine, scheduler)
+wbs_renderer = ParallelWBSRenderer(wbs_engine)
+rollups = RollupStore()
 
 @router.post("/generate", response_model=WBSResponse)
-async def generate_wbs(request: WBSGenerateRequest):
+async def generate_wbs(
+    request: WBSGenerateRequest,
+    feature_analyzer: FeatureAnalysisService = Depends(get_feature_analyzer)
+):
     """Generate WBS from features using intelligent conditional task breakdown"""
     try:
         # Convert features to list of dicts
@@ -42,36 +59,100 @@ async def generate_wbs(request: WBSGenerateRequest):
         
         # Generate WBS with analyzed features
         print(f"🏗️ Generating WBS for {len(analyzed_features)} features...")
-        wbs_data = await wbs_engine.generate_wbs(
-            project_name=request.project_name,
-            features=analyzed_features
-        )
-        
-        print(f"✅ Generated {wbs_data['total_tasks']} tasks, {wbs_data['total_hours']} hours")
+        # Serialized straight from the columnar task table (skips per-task model validation);
+        # large feature sets are sharded across worker processes
+        body = await wbs_renderer.render(request.project_name, analyzed_features, request.stable_ids)
         
-        # Manually validate before returning to catch the 500 error cause
-        try:
-            return WBSResponse(**wbs_data)
-        except Exception as ve:
-            print(f"❌ VALIDATION ERROR: {ve}")
-            print(f"   WBS Data: {wbs_data}")
-            raise HTTPException(status_code=500, detail=f"Data validation failed: {str(ve)}")
+        print(f"✅ Generated WBS ({len(body) / 1024:.0f} KB)")
+        return Response(body, media_type="application/json")
         
+    except HTTPException:
+        raise
+    except ValueError as e:
+        # Invalid feature dependency graph (cycle, unknown or duplicate feature)
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"WBS generation failed: {str(e)}")
 
+@router.post("/regenerate", response_model=WBSPatchResponse)
+async def regenerate_wbs(
+    request: WBSRegenerateRequest,
+    feature_analyzer: FeatureAnalysisService = Depends(get_feature_analyzer)
+):
+    """Apply a feature diff to a previous WBS; only affected feature subtrees are rebuilt"""
+    features = [f.dict() for f in request.added + request.changed]
+    pending = [i for i, f in enumerate(features) if not f.get('analysis')]
+    if pending:
+        print(f"⚙️ Analyzing {len(pending)} added/changed features...")
+        analyzed = await feature_analyzer.analyze_features_batch([features[i] for i in pending])
+        for i, feature in zip(pending, analyzed):
+            features[i] = feature
+    
+    added = features[:len(request.added)]
+    changed = features[len(request.added):]
+    try:
+        patch = incremental_builder.regenerate(
+            [task.dict() for task in request.tasks],
+            added=added,
+            changed=changed,
+            removed=request.removed
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    print(f"♻️ WBS patch: +{len(patch['added'])} ~{len(patch['updated'])} -{len(patch['removed'])} tasks")
+    return {"project_name": request.project_name, **patch}
+
 @router.post("/validate", response_model=dict)
-async def validate_wbs(tasks: List[WBSTask]):
-    """Validate WBS structure and hours"""
+async def validate_wbs(tasks: List[WBSTask], feature_ids: Optional[List[str]] = Query(None)):
+    """Validate WBS structure, dependency graph (cycles, missing/unreachable tasks) and hours"""
     try:
         task_dicts = [task.dict() for task in tasks]
-        validation = wbs_engine.validate_wbs(task_dicts)
+        validation = wbs_engine.validate_wbs(task_dicts, feature_ids=feature_ids)
         return validation
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/schedule", response_model=ScheduleResponse)
+async def schedule_wbs(request: ScheduleRequest):
+    """Critical-path schedule: earliest/latest start and finish, slack and critical path"""
+    try:
+        schedule = await run_in_threadpool(scheduler.schedule, [task.dict() for task in request.tasks])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"project_name": request.project_name, **schedule}
+
+@router.post("/schedule/team", response_model=ResourceScheduleResponse)
+async def schedule_wbs_for_team(request: ResourceScheduleRequest):
+    """Resource-leveled schedule: per-person timelines and makespan for a given team"""
+    try:
+        schedule = await run_in_threadpool(
+            resource_scheduler.schedule,
+            [task.dict() for task in request.tasks],
+            team_size=request.team_size,
+            role_capacity=request.role_capacity
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"project_name": request.project_name, **schedule}
+
+@router.post("/risk", response_model=RiskResponse)
+async def simulate_wbs_risk(request: RiskRequest):
+    """Monte Carlo schedule risk: P50/P80/P95 completion times and task criticality indices"""
+    try:
+        risk = await run_in_threadpool(
+            risk_simulator.simulate,
+            [task.dict() for task in request.tasks],
+            simulations=request.simulations,
+            seed=request.seed,
+            feature_complexity=request.feature_complexity
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"project_name": request.project_name, **risk}
+
 @router.get("/stats/{project_name}", response_model=dict)
 async def get_wbs_stats(project_name: str):
     """Get WBS statistics for a project"""
@@ -82,4 +163,50 @@ async def get_wbs_stats(project_name: str):
         "total_hours": 0,
         "dev_hours": 0,
         "rnd_hours": 0
-    }
\ No newline at end of file
+    }
+
+@router.post("/rollup", response_model=RollupResponse)
+async def build_rollup(request: RollupRequest):
+    """Index the WBS hierarchy once; returns project and per-feature hours by type"""
+    try:
+        index = await run_in_threadpool(RollupIndex, [task.dict() for task in request.tasks])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "index_id": rollups.add(index),
+        "project_name": request.project_name,
+        "project": index.rollup(),
+        "children": index.child_rollups()
+    }
+
+def _rollup_index(index_id: str) -> RollupIndex:
+    index = rollups.get(index_id)
+    if index is None:
+        raise HTTPException(status_code=404, detail="Rollup index not found or expired")
+    return index
+
+@router.get("/rollup/{index_id}", response_model=NodeRollup)
+async def query_rollup(index_id: str, node_id: Optional[str] = Query(None)):
+    """Hours under a node (task or feature ID; whole project when omitted) by type"""
+    try:
+        return _rollup_index(index_id).rollup(node_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown node: {node_id}")
+
+@router.get("/rollup/{index_id}/children", response_model=List[NodeRollup])
+async def query_rollup_children(index_id: str, node_id: Optional[str] = Query(None)):
+    """Subtotals for each direct child of a node"""
+    try:
+        return _rollup_index(index_id).child_rollups(node_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown node: {node_id}")
+
+@router.patch("/rollup/{index_id}/tasks/{task_id}", response_model=NodeRollup)
+async def update_rollup(index_id: str, task_id: str, request: RollupUpdateRequest):
+    """Change one task's hours; returns the updated project totals"""
+    index = _rollup_index(index_id)
+    try:
+        index.set_hours(task_id, request.duration_hours)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown task: {task_id}")
+    return index.rollup()
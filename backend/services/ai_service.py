@@ -2,25 +2,33 @@
 AI Service - Gemini API Integration
 Handles all AI-powered feature extraction using Google's Gemini
 """
+import asyncio
 import json
-from typing import List, Dict
-from google import genai
+import re
+from typing import AsyncIterator, Callable, List, Dict, Optional
+from services.gemini_client import GeminiClientRegistry
+from services.circuit_breaker import CircuitOpenError
+from services.response_cache import get_response_cache, prompt_key
+from services.json_stream import IncrementalJSONArrayParser
+from services.text_chunker import split_into_chunks
 from config import settings
 
 class AIService:
-    def __init__(self):
-        self.gemini_key = settings.GEMINI_API_KEY
-        self.model_name = settings.GEMINI_MODEL
-        
-        # Configure Gemini API client
-        if self.gemini_key:
-            self.client = genai.Client(api_key=self.gemini_key)
-        else:
-            self.client = None
+    def __init__(self, gemini: GeminiClientRegistry):
+        # Shared Gemini client (one connection pool for the whole app)
+        self.gemini = gemini
+        self.gemini_key = gemini.api_key
+        self.model_name = gemini.model_name
+        
+        # Shared on-disk cache of raw Gemini responses
+        self.cache = get_response_cache()
     
-    async def extract_features_from_text(self, text: str) -> List[Dict]:
-        """Extract features from project description using Gemini AI"""
-        prompt = f"""
+    @property
+    def client(self):
+        return self.gemini.client
+    
+    def _features_prompt(self, text: str) -> str:
+        return f"""
         PROJECT: {text}
         
         TASK: List 15-20 core features for this software project.
@@ -33,10 +41,14 @@ class AIService:
         RETURN JSON:
         [{{"id": "f1", "name": "Feature Name", "description": "Brief description"}}]
         """
+    
+    async def extract_features_from_text(self, text: str) -> List[Dict]:
+        """Extract features from project description using Gemini AI"""
+        prompt = self._features_prompt(text)
         
         try:
-            if self.client:
-                features = await self._call_gemini(prompt)
+            if self.gemini.configured:
+                features = await self._call_gemini(prompt, operation="features")
                 if features:
                     return features
         except Exception as e:
@@ -45,22 +57,162 @@ class AIService:
         # Fallback to mock data
         return self._generate_mock_features(text)
     
-    async def extract_workflow_from_text(self, text: str):
-        prompt = f"""
+    async def stream_features_from_text(self, text: str) -> AsyncIterator[Dict]:
+        """Yield features one at a time as Gemini streams them (mock data if nothing arrives)"""
+        emitted = 0
+        async for feature in self._stream_json_array(self._features_prompt(text), operation="features_stream"):
+            emitted += 1
+            yield feature
+        
+        if not emitted:
+            for feature in self._generate_mock_features(text):
+                yield feature
+    
+    def _workflow_prompt(self, text: str) -> str:
+        return f"""
         Analyze this Product Specification PDF text. 
         
-        TEXT: {text[:15000]}
+        TEXT: {text}
         
         TASK:
         1. Locate the 'Key Product Features' section.
         2. Extract EVERY individual feature mentioned. I am expecting approximately 17 features.
         3. For each, provide the exact 'name' used in the PDF and a clear 'description'.
         4. Arrange them in technical 'execution_order' (e.g., Core Engine -> UI -> Integrations).
+        5. In 'deps', list the exact names of features that must be built before it (empty if it can start independently).
         
         FORMAT: Return ONLY a valid JSON array.
         """
-        # Use your existing _call_gemini method to get the ordered JSON
-        return await self._call_gemini(prompt)
+    
+    def _chunk_prompt(self, chunk: str, index: int, total: int) -> str:
+        return f"""
+        This is part {index + 1} of {total} of a Product Specification PDF.
+        
+        TEXT: {chunk}
+        
+        TASK:
+        1. Extract EVERY individual product feature described in this part (none if there are no features).
+        2. For each, provide the exact 'name' used in the PDF and a clear 'description'.
+        
+        FORMAT: Return ONLY a valid JSON array: [{{"name": "...", "description": "..."}}]
+        """
+    
+    async def extract_workflow_from_text(self, text: str):
+        """
+        Extract ordered features from specification text.
+        Short text goes to Gemini in one prompt; long text is map-reduced:
+        chunks are extracted concurrently (under the shared rate limiter),
+        merged/deduplicated, then ordered with one cheap names-only pass.
+        """
+        chunks = split_into_chunks(text, settings.AI_CHUNK_MAX_CHARS)
+        if len(chunks) <= 1:
+            # Use your existing _call_gemini method to get the ordered JSON
+            return await self._call_gemini(self._workflow_prompt(text), operation="workflow")
+        
+        print(f"📄 Map-reduce extraction over {len(chunks)} chunks")
+        chunk_results = await asyncio.gather(
+            *(
+                self._call_gemini(self._chunk_prompt(chunk, i, len(chunks)), operation="workflow_chunk")
+                for i, chunk in enumerate(chunks)
+            )
+        )
+        merged = self._merge_features([f for result in chunk_results for f in result])
+        return await self._order_features(merged)
+    
+    async def stream_workflow_from_text(self, text: str) -> AsyncIterator[Dict]:
+        """Streaming variant of extract_workflow_from_text"""
+        chunks = split_into_chunks(text, settings.AI_CHUNK_MAX_CHARS)
+        if len(chunks) <= 1:
+            async for feature in self._stream_json_array(self._workflow_prompt(text), operation="workflow_stream"):
+                yield feature
+            return
+        
+        # Long documents: emit each chunk's new features as soon as that chunk finishes.
+        # Chunk-local IDs repeat across chunks, so features are renumbered f1, f2, ...
+        # in emission order (as _merge_features does) and their deps follow the new IDs.
+        seen = {}  # feature key -> assigned ID
+        pending = [
+            asyncio.ensure_future(
+                self._call_gemini(self._chunk_prompt(chunk, i, len(chunks)), operation="workflow_chunk")
+            )
+            for i, chunk in enumerate(chunks)
+        ]
+        try:
+            for next_done in asyncio.as_completed(pending):
+                local_ids = {}
+                fresh = []
+                for feature in await next_done:
+                    key = self._feature_key(feature)
+                    if not key:
+                        continue
+                    if key not in seen:
+                        seen[key] = f"f{len(seen) + 1}"
+                        fresh.append((feature, seen[key]))
+                    local_ids[str(feature.get('id'))] = seen[key]
+                
+                for feature, feature_id in fresh:
+                    feature = {**feature, "id": feature_id}
+                    deps = feature.get('deps', feature.get('dependencies'))
+                    if isinstance(deps, list):
+                        feature['deps'] = [local_ids.get(str(dep), dep) for dep in deps]
+                    yield feature
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    @staticmethod
+    def _feature_key(feature: Dict) -> str:
+        """Normalized feature name used to deduplicate features across chunks"""
+        name = feature.get('name', '') if isinstance(feature, dict) else ''
+        return re.sub(r'[^a-z0-9]+', ' ', str(name).lower()).strip()
+    
+    def _merge_features(self, features: List[Dict]) -> List[Dict]:
+        """Deduplicate by normalized name (keeping the richest description), in document order"""
+        merged = {}
+        for feature in features:
+            key = self._feature_key(feature)
+            if not key:
+                continue
+            existing = merged.get(key)
+            if existing is None:
+                merged[key] = {"name": feature.get('name'), "description": feature.get('description', '')}
+            elif len(feature.get('description', '') or '') > len(existing['description'] or ''):
+                existing['description'] = feature.get('description', '')
+        
+        return [{**feature, "id": f"f{i+1}"} for i, feature in enumerate(merged.values())]
+    
+    async def _order_features(self, features: List[Dict]) -> List[Dict]:
+        """Cheap final pass: ask Gemini for a technical execution order using names only"""
+        if len(features) < 2:
+            return features
+        
+        listing = "\n".join(f"{i}. {f['name']}" for i, f in enumerate(features))
+        prompt = f"""
+        Arrange these software features in technical execution order (e.g., Core Engine -> UI -> Integrations).
+        
+        FEATURES:
+        {listing}
+        
+        For each feature, "deps" lists the numbers of features that must be built before it
+        (empty when it can start independently).
+        
+        Return ONLY a valid JSON array with one entry per feature: [{{"i": 0, "order": 1, "deps": []}}]
+        """
+        
+        ranks = {}
+        deps = {}
+        for entry in await self._call_gemini(prompt, operation="ordering"):
+            if isinstance(entry, dict) and isinstance(entry.get('i'), int) and isinstance(entry.get('order'), (int, float)):
+                ranks.setdefault(entry['i'], entry['order'])
+                if isinstance(entry.get('deps'), list):
+                    deps.setdefault(entry['i'], [
+                        features[j]['id'] for j in entry['deps']
+                        if isinstance(j, int) and 0 <= j < len(features) and j != entry['i']
+                    ])
+        
+        # Features the model skipped keep their document position after the ranked ones
+        positions = sorted(range(len(features)), key=lambda i: (i not in ranks, ranks.get(i, 0), i))
+        return [{**features[i], "order": rank, "deps": deps.get(i, [])} for rank, i in enumerate(positions, 1)]
     
     async def analyze_feature_requirements(self, feature: Dict) -> Dict:
         """
@@ -107,7 +259,7 @@ Return ONLY valid JSON (no markdown, no explanations):
 """
         
         try:
-            result = await self._call_gemini(prompt)
+            result = await self._call_gemini(prompt, operation="analysis")
             if result and isinstance(result, list) and len(result) > 0:
                 return result[0]
             elif result and isinstance(result, dict):
@@ -117,39 +269,87 @@ Return ONLY valid JSON (no markdown, no explanations):
         
         return None
 
-    async def _call_gemini(self, prompt: str) -> List[Dict]:
-        """Call Gemini API using proper async support with client.aio"""
-        if not self.client:
+    async def _call_gemini(
+        self,
+        prompt: str,
+        operation: str = "default",
+        accept: Optional[Callable[[List[Dict]], bool]] = None
+    ) -> List[Dict]:
+        """
+        Call Gemini API using proper async support with client.aio.
+        With accept, only answers it approves are cached (and a cached answer
+        it rejects is evicted and asked again), so a retry is not served the
+        same bad answer.
+        """
+        if not self.gemini.configured:
             return []
         
-        max_retries = 3
-        base_delay = 2  # seconds
+        # Serve repeat prompts from the response cache
+        cache_key = prompt_key(self.model_name, prompt)
+        if self.cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                parsed = self._parse_ai_response(cached)
+                if accept is None or accept(parsed):
+                    return parsed
+                self.cache.delete(cache_key)
         
-        for attempt in range(max_retries):
-            try:
-                # IMPORTANT: Use self.client.aio for true async support
-                response = await self.client.aio.models.generate_content(
-                    model="gemini-2.5-flash",
-                    contents=prompt
-                )
-                
-                if response.text:
-                    return self._parse_ai_response(response.text)
-                
-                return []
-                
-            except Exception as e:
-                # Check for overload/unavailable/quota errors
-                error_str = str(e)
-                if "503" in error_str or "429" in error_str or "RESOURCE_EXHAUSTED" in error_str:
-                    print(f"⚠️  Gemini API quota/limit reached. Using keyword-based fallback analysis.")
-                    # Don't retry on quota errors, immediately return empty to trigger fallback
-                    return []
-                
-                print(f"Gemini error (attempt {attempt+1}/{max_retries}): {e}")
-                if attempt == max_retries - 1:
-                    return []
-        return []
+        # Skip the network entirely while the circuit is open
+        if not self.gemini.available:
+            return []
+        
+        try:
+            # Shared client: coalesced, rate-limited and retried with backoff
+            response_text = await self.gemini.generate_text(prompt, model=self.model_name, operation=operation)
+        except CircuitOpenError:
+            return []
+        except Exception as e:
+            print(f"⚠️  Gemini call failed after retries: {e}. Using fallback.")
+            return []
+        
+        if not response_text:
+            return []
+        
+        parsed = self._parse_ai_response(response_text)
+        # Only cache responses that parsed into usable (and, with accept, approved) JSON
+        if parsed and self.cache and (accept is None or accept(parsed)):
+            self.cache.set(cache_key, response_text)
+        return parsed
+    
+    async def _stream_json_array(self, prompt: str, operation: str = "stream") -> AsyncIterator[Dict]:
+        """Stream a JSON-array response, yielding each object as soon as it is complete"""
+        if not self.gemini.configured:
+            return
+        
+        cache_key = prompt_key(self.model_name, prompt)
+        if self.cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                for feature in self._parse_ai_response(cached):
+                    yield feature
+                return
+        
+        if not self.gemini.available:
+            return
+        
+        parser = IncrementalJSONArrayParser()
+        chunks = []
+        count = 0
+        try:
+            async for chunk in self.gemini.stream_text(prompt, model=self.model_name, operation=operation):
+                chunks.append(chunk)
+                for element in parser.feed(chunk):
+                    if isinstance(element, dict):
+                        count += 1
+                        element.setdefault('id', f"f{count}")
+                        yield element
+        except Exception as e:
+            print(f"⚠️  Gemini stream failed: {e}")
+            return
+        
+        # Cache only complete arrays so a replay never returns a truncated list
+        if count and parser.finished and self.cache:
+            self.cache.set(cache_key, "".join(chunks))
     
     def _parse_ai_response(self, response: str) -> List[Dict]:
         """Robust parsing to prevent 500 errors from bad AI formatting"""
@@ -245,15 +445,14 @@ Return ONLY valid JSON (no markdown, no explanations):
         """
         
         try:
-            if self.client:
-                # Use proper async client
-                response = await self.client.aio.models.generate_content(
-                    model=self.model_name,
-                    contents=prompt
+            if self.gemini.available:
+                # Use proper async client (coalesced with identical in-flight requests)
+                response_text = await self.gemini.generate_text(
+                    prompt, model=self.model_name, operation="competitors"
                 )
-                if response.text:
+                if response_text:
                     # Robust parsing for JSON object
-                    text = response.text.strip()
+                    text = response_text.strip()
                     
                     # Try to find JSON object in response
                     start = text.find('{')
@@ -282,16 +481,16 @@ Return ONLY valid JSON (no markdown, no explanations):
     
     async def test_gemini_connection(self) -> Dict:
         """Test Gemini API connection"""
-        if not self.gemini_key:
+        if not self.gemini.configured:
             raise Exception("Gemini API key not configured")
         
         try:
-            # Simple test prompt using async client
-            response = await self.client.aio.models.generate_content(
-                model=self.model_name,
-                contents="Say 'Hello'"
+            # Simple test prompt through the shared transport (bypasses cache and coalescing)
+            response_text = await asyncio.wait_for(
+                self.gemini.transport.generate(self.model_name, "Say 'Hello'"),
+                timeout=self.gemini.timeout_for("test")
             )
-            if response.text:
+            if response_text:
                 return {
                     "status": "connected",
                     "model": self.model_name,
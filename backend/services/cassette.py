@@ -0,0 +1,186 @@
+"""
+Gemini Transports - Live, record and replay backends for GeminiClientRegistry
+Replay serves recorded prompt->response pairs with configurable latency and
+injected failures, so the AI paths can be load-tested offline.
+"""
+import asyncio
+import json
+import os
+import random
+import threading
+from typing import AsyncIterator, Dict, Optional
+from services.response_cache import prompt_key
+
+
+class InjectedAPIError(Exception):
+    """Synthetic upstream error raised by ReplayTransport (mirrors genai APIError.code)"""
+
+    def __init__(self, code: int, status: str, retry_delay: Optional[float] = None):
+        self.code = code
+        self.status = status
+        message = f"{code} {status}. Injected by replay transport"
+        if retry_delay is not None:
+            message += f" {{'retryDelay': '{retry_delay}s'}}"
+        super().__init__(message)
+
+
+class CassetteMissError(Exception):
+    """No recording exists for the requested prompt"""
+    code = 404
+
+
+class Cassette:
+    """JSON file of recorded interactions keyed by model + normalized prompt"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.interactions: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.interactions = json.load(f)
+
+    def get(self, model: str, prompt: str) -> Optional[str]:
+        interaction = self.interactions.get(prompt_key(model, prompt))
+        return interaction["response"] if interaction else None
+
+    def record(self, model: str, prompt: str, response: str) -> None:
+        with self._lock:
+            self.interactions[prompt_key(model, prompt)] = {
+                "model": model,
+                "prompt": prompt,
+                "response": response
+            }
+
+    def save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.interactions, f, indent=1)
+            os.replace(tmp_path, self.path)
+
+
+class LiveTransport:
+    """Talks to Gemini through the shared genai.Client"""
+
+    def __init__(self, client):
+        self.client = client
+
+    async def generate(self, model: str, prompt: str) -> Optional[str]:
+        response = await self.client.aio.models.generate_content(
+            model=model,
+            contents=prompt
+        )
+        return response.text
+
+    async def stream(self, model: str, prompt: str) -> AsyncIterator[str]:
+        stream = await self.client.aio.models.generate_content_stream(
+            model=model,
+            contents=prompt
+        )
+        async for chunk in stream:
+            if chunk.text:
+                yield chunk.text
+
+    def close(self) -> None:
+        pass
+
+
+class RecordingTransport:
+    """Passes calls through to another transport and records every successful response"""
+
+    def __init__(self, inner, cassette: Cassette):
+        self.inner = inner
+        self.cassette = cassette
+
+    async def generate(self, model: str, prompt: str) -> Optional[str]:
+        text = await self.inner.generate(model, prompt)
+        if text:
+            self.cassette.record(model, prompt, text)
+        return text
+
+    async def stream(self, model: str, prompt: str) -> AsyncIterator[str]:
+        chunks = []
+        async for chunk in self.inner.stream(model, prompt):
+            chunks.append(chunk)
+            yield chunk
+        if chunks:
+            self.cassette.record(model, prompt, "".join(chunks))
+
+    def close(self) -> None:
+        self.cassette.save()
+
+
+class ReplayTransport:
+    """
+    Serves responses from a cassette without network access.
+    - latency: "fixed", "uniform" (0..2x) or "lognormal" around latency_ms
+    - error_rates: probability per call of "429", "503" or "malformed" (truncated JSON)
+    """
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        latency_ms: float = 0.0,
+        latency_distribution: str = "lognormal",
+        latency_sigma: float = 0.5,
+        error_rates: Optional[Dict[str, float]] = None,
+        seed: Optional[int] = None,
+        stream_chunk_chars: int = 200
+    ):
+        self.cassette = cassette
+        self.latency_ms = latency_ms
+        self.latency_distribution = latency_distribution
+        self.latency_sigma = latency_sigma
+        self.error_rates = error_rates or {}
+        self.stream_chunk_chars = stream_chunk_chars
+        self._random = random.Random(seed)
+
+    def _latency(self) -> float:
+        if self.latency_ms <= 0:
+            return 0.0
+        seconds = self.latency_ms / 1000.0
+        if self.latency_distribution == "fixed":
+            return seconds
+        if self.latency_distribution == "uniform":
+            return self._random.uniform(0, 2 * seconds)
+        # lognormal with the configured median: realistic long tail for hedging experiments
+        return self._random.lognormvariate(0, self.latency_sigma) * seconds
+
+    def _response(self, model: str, prompt: str) -> str:
+        """Look up the recording and apply error injection"""
+        roll = self._random.random()
+        threshold = 0.0
+        for kind in ("429", "503", "malformed"):
+            threshold += self.error_rates.get(kind, 0.0)
+            if roll < threshold:
+                if kind == "429":
+                    raise InjectedAPIError(429, "RESOURCE_EXHAUSTED", retry_delay=1)
+                if kind == "503":
+                    raise InjectedAPIError(503, "UNAVAILABLE")
+                text = self.cassette.get(model, prompt) or ""
+                return text[:len(text) // 2]
+
+        text = self.cassette.get(model, prompt)
+        if text is None:
+            raise CassetteMissError(f"No cassette recording for prompt key {prompt_key(model, prompt)[:12]}")
+        return text
+
+    async def generate(self, model: str, prompt: str) -> Optional[str]:
+        await asyncio.sleep(self._latency())
+        return self._response(model, prompt)
+
+    async def stream(self, model: str, prompt: str) -> AsyncIterator[str]:
+        await asyncio.sleep(self._latency())
+        text = self._response(model, prompt)
+        chunk_delay = self._latency() / max(1, len(text) // self.stream_chunk_chars)
+        for i in range(0, len(text), self.stream_chunk_chars):
+            if i:
+                await asyncio.sleep(chunk_delay)
+            yield text[i:i + self.stream_chunk_chars]
+
+    def close(self) -> None:
+        pass
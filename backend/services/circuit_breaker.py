@@ -0,0 +1,114 @@
+"""
+Circuit Breaker - Shared closed/open/half-open breaker for Gemini traffic
+Short-circuits to local fallbacks while the upstream is failing
+"""
+import time
+from collections import deque
+from typing import Dict
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling Gemini while the breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Opens when the failure rate over a sliding window crosses a threshold,
+    stays open for a cooldown, then lets a single probe request through.
+    """
+
+    def __init__(
+        self,
+        failure_rate_threshold: float = 0.5,
+        min_calls: int = 5,
+        window_seconds: float = 60.0,
+        cooldown_seconds: float = 30.0
+    ):
+        self.failure_rate_threshold = failure_rate_threshold
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.cooldown_seconds = cooldown_seconds
+
+        self.state = CLOSED
+        self._outcomes = deque()  # (timestamp, succeeded)
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+        self.opened = 0
+        self.short_circuited = 0
+
+    def available(self) -> bool:
+        """Side-effect-free check: would a request be let through right now?"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            return time.monotonic() - self._opened_at >= self.cooldown_seconds
+        return not self._probe_in_flight
+
+    def allow_request(self) -> bool:
+        """Admit a request; after the cooldown the first caller becomes the half-open probe"""
+        if self.state == OPEN and time.monotonic() - self._opened_at >= self.cooldown_seconds:
+            self.state = HALF_OPEN
+            self._probe_in_flight = False
+
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+
+        self.short_circuited += 1
+        return False
+
+    def record_success(self) -> None:
+        if self.state == HALF_OPEN:
+            print("✅ Gemini circuit closed (probe succeeded)")
+            self.state = CLOSED
+            self._outcomes.clear()
+            self._probe_in_flight = False
+            return
+        self._record(True)
+
+    def record_failure(self) -> None:
+        if self.state == HALF_OPEN:
+            self._open()
+            return
+        if self.state == OPEN:
+            return
+
+        self._record(False)
+        failures = sum(1 for _, ok in self._outcomes if not ok)
+        if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate_threshold:
+            self._open()
+
+    def release_probe(self) -> None:
+        """Give up the half-open probe slot (e.g. the probe was cancelled)"""
+        self._probe_in_flight = False
+
+    def _record(self, succeeded: bool) -> None:
+        now = time.monotonic()
+        self._outcomes.append((now, succeeded))
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+
+    def _open(self) -> None:
+        print(f"🔌 Gemini circuit opened for {self.cooldown_seconds}s; using local fallbacks")
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+        self._outcomes.clear()
+        self.opened += 1
+
+    def stats(self) -> Dict:
+        failures = sum(1 for _, ok in self._outcomes if not ok)
+        return {
+            "state": self.state,
+            "window_calls": len(self._outcomes),
+            "window_failures": failures,
+            "opened": self.opened,
+            "short_circuited": self.short_circuited
+        }
@@ -2,24 +2,24 @@
 Competitor Research Service - Uses Gemini to research competitors and suggest features
 """
 from typing import List, Dict
-from google import genai
-from config import settings
+from services.gemini_client import GeminiClientRegistry
 import json
 
 class CompetitorService:
-    def __init__(self):
-        if settings.GEMINI_API_KEY:
-            self.client = genai.Client(api_key=settings.GEMINI_API_KEY)
-            self.model_name = settings.GEMINI_MODEL
-        else:
-            self.client = None
-            self.model_name = None
+    def __init__(self, gemini: GeminiClientRegistry):
+        # Shared Gemini client (one connection pool for the whole app)
+        self.gemini = gemini
+        self.model_name = gemini.model_name
+    
+    @property
+    def client(self):
+        return self.gemini.client
     
     async def research_competitors(self, project_name: str, description: str) -> Dict:
         """
         Research 3 competitors and extract their features
         """
-        if not self.client:
+        if not self.gemini.available:
             return self._generate_mock_research(project_name)
         
         prompt = f"""
@@ -53,12 +53,9 @@ class CompetitorService:
         """
         
         try:
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt
-            )
-            if response.text:
-                result = self._parse_research_response(response.text)
+            response_text = await self.gemini.generate_text(prompt, model=self.model_name, operation="research")
+            if response_text:
+                result = self._parse_research_response(response_text)
                 if result:
                     return result
         except Exception as e:
@@ -74,7 +71,7 @@ class CompetitorService:
         """
         Generate initial feature list based on competitors and enhancements
         """
-        if not self.client:
+        if not self.gemini.available:
             return self._generate_default_features(enhancements)
         
         # Combine competitor features
@@ -107,12 +104,9 @@ class CompetitorService:
         """
         
         try:
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt
-            )
-            if response.text:
-                features = self._parse_features_response(response.text)
+            response_text = await self.gemini.generate_text(prompt, model=self.model_name, operation="feature_list")
+            if response_text:
+                features = self._parse_features_response(response_text)
                 if features:
                     return features
         except Exception as e:
@@ -1,103 +1,149 @@
 """
 Excel Generator - Creates formatted Excel files for WBS export
+Rows are streamed through an openpyxl write-only workbook using a handful
+of named styles registered once per workbook, into a file or any binary
+buffer (e.g. a spooled temp file served straight from memory).
 """
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from typing import List, Dict
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+from typing import BinaryIO, Callable, List, Dict, Optional
 import os
 from datetime import datetime
 
+HEADERS = ["ID", "Task Name", "Description", "Type", "Hours", "Level", "Dependencies"]
+SCHEDULE_HEADERS = ["Earliest Start", "Earliest Finish", "Latest Start", "Latest Finish", "Slack", "Critical"]
+COLUMN_WIDTHS = {'A': 10, 'B': 40, 'C': 50, 'D': 10, 'E': 10, 'F': 8, 'G': 20}
+SCHEDULE_COLUMN_WIDTH = 14
+PROGRESS_ROWS = 1000  # write_excel reports progress every this many rows
+
+
+def _named_styles() -> List[NamedStyle]:
+    """Fresh style objects per workbook (named styles bind to the workbook they are added to)"""
+    border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    center = Alignment(horizontal="center", vertical="center")
+
+    def fill(color):
+        return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+    return [
+        NamedStyle("wbs_header", font=Font(bold=True, color="FFFFFF", size=12), fill=fill("4472C4"),
+                   alignment=center, border=border),
+        NamedStyle("wbs_cell", alignment=Alignment(vertical="center", wrap_text=True), border=border),
+        # Task Type color coding (Type and Hours columns)
+        NamedStyle("wbs_dev", fill=fill("E7E6FD"), alignment=center, border=border),
+        NamedStyle("wbs_other", fill=fill("FFF2CC"), alignment=center, border=border),
+        NamedStyle("wbs_schedule", alignment=center, border=border),
+        NamedStyle("wbs_critical", font=Font(bold=True, color="C00000"), alignment=center, border=border),
+        NamedStyle("wbs_summary_title", font=Font(bold=True, size=14)),
+        NamedStyle("wbs_summary_label", font=Font(bold=True)),
+    ]
+
+
 class ExcelGenerator:
     def __init__(self):
         self.export_dir = "temp/exports"
         os.makedirs(self.export_dir, exist_ok=True)
-    
-    def generate_excel(self, project_name: str, tasks: List[Dict]) -> str:
-        """Generate Excel file from WBS tasks"""
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "WBS"
-        
-        # Header styling
-        header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF", size=12)
-        border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        
-        # Headers
-        headers = ["ID", "Task Name", "Description", "Type", "Hours", "Level", "Dependencies"]
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col, value=header)
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-            cell.border = border
-        
-        # Data rows
-        for row_idx, task in enumerate(tasks, 2):
-            # Task Type color coding
-            if task.get("task_type") == "Dev":
-                fill = PatternFill(start_color="E7E6FD", end_color="E7E6FD", fill_type="solid")
-            else:  # R&D
-                fill = PatternFill(start_color="FFF2CC", end_color="FFF2CC", fill_type="solid")
-            
-            # Write data
-            data = [
-                task.get("id", ""),
-                task.get("name", ""),
-                task.get("description", ""),
-                task.get("task_type", ""),
-                task.get("duration_hours", 0),
-                task.get("level", 1),
-                ", ".join(task.get("dependencies", []))
-            ]
-            
-            for col, value in enumerate(data, 1):
-                cell = ws.cell(row=row_idx, column=col, value=value)
-                cell.border = border
-                cell.alignment = Alignment(vertical="center", wrap_text=True)
-                if col in [4, 5]:  # Type and Hours columns
-                    cell.fill = fill
-                    cell.alignment = Alignment(horizontal="center", vertical="center")
-        
-        # Column widths
-        ws.column_dimensions['A'].width = 10
-        ws.column_dimensions['B'].width = 40
-        ws.column_dimensions['C'].width = 50
-        ws.column_dimensions['D'].width = 10
-        ws.column_dimensions['E'].width = 10
-        ws.column_dimensions['F'].width = 8
-        ws.column_dimensions['G'].width = 20
-        
-        # Summary section
-        summary_row = len(tasks) + 3
-        ws.cell(row=summary_row, column=1, value="Summary").font = Font(bold=True, size=14)
-        
-        total_hours = sum(task.get("duration_hours", 0) for task in tasks)
-        dev_hours = sum(task.get("duration_hours", 0) for task in tasks if task.get("task_type") == "Dev")
-        rnd_hours = sum(task.get("duration_hours", 0) for task in tasks if task.get("task_type") == "R&D")
-        
-        ws.cell(row=summary_row+1, column=1, value="Total Tasks:").font = Font(bold=True)
-        ws.cell(row=summary_row+1, column=2, value=len(tasks))
-        
-        ws.cell(row=summary_row+2, column=1, value="Total Hours:").font = Font(bold=True)
-        ws.cell(row=summary_row+2, column=2, value=total_hours)
-        
-        ws.cell(row=summary_row+3, column=1, value="Dev Hours:").font = Font(bold=True)
-        ws.cell(row=summary_row+3, column=2, value=dev_hours)
-        
-        ws.cell(row=summary_row+4, column=1, value="R&D Hours:").font = Font(bold=True)
-        ws.cell(row=summary_row+4, column=2, value=rnd_hours)
-        
-        # Save file
+
+    def generate_excel(self, project_name: str, tasks: List[Dict], schedule: Optional[Dict] = None) -> str:
+        """Generate Excel file from WBS tasks (plus CPM columns when a schedule is given)"""
         safe_name = project_name.replace(" ", "_").replace("/", "_")
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"{safe_name}_WBS_{timestamp}.xlsx"
         filepath = os.path.join(self.export_dir, filename)
-        
-        wb.save(filepath)
+
+        with open(filepath, "wb") as output:
+            self.write_excel(output, project_name, tasks, schedule)
         return filepath
+
+    def write_excel(self, output: BinaryIO, project_name: str, tasks: List[Dict],
+                    schedule: Optional[Dict] = None, progress: Optional[Callable[[int], None]] = None) -> None:
+        """
+        Write the WBS workbook to a binary file object (must be seekable).
+        progress(rows_written) is called every PROGRESS_ROWS rows; it may raise to abort.
+        """
+        wb = Workbook(write_only=True)
+        for style in _named_styles():
+            wb.add_named_style(style)
+        ws = wb.create_sheet("WBS")
+
+        # Column widths must be set before the first row in write-only mode
+        for column, width in COLUMN_WIDTHS.items():
+            ws.column_dimensions[column].width = width
+        if schedule:
+            for column in ['H', 'I', 'J', 'K', 'L', 'M']:
+                ws.column_dimensions[column].width = SCHEDULE_COLUMN_WIDTH
+
+        def cell(value, style):
+            c = WriteOnlyCell(ws, value=value)
+            c.style = style
+            return c
+
+        # Headers
+        ws.append([cell(header, "wbs_header") for header in HEADERS + (SCHEDULE_HEADERS if schedule else [])])
+
+        # Data rows (summary totals are accumulated on the way)
+        total_hours = dev_hours = rnd_hours = 0
+        try:
+            for i, task in enumerate(tasks):
+                task_type = task.get("task_type", "")
+                hours = task.get("duration_hours", 0)
+                total_hours += hours
+                if task_type == "Dev":
+                    dev_hours += hours
+                elif task_type == "R&D":
+                    rnd_hours += hours
+
+                type_style = "wbs_dev" if task_type == "Dev" else "wbs_other"
+                row = [
+                    cell(task.get("id", ""), "wbs_cell"),
+                    cell(task.get("name", ""), "wbs_cell"),
+                    cell(task.get("description", ""), "wbs_cell"),
+                    cell(task_type, type_style),
+                    cell(hours, type_style),
+                    cell(task.get("level", 1), "wbs_cell"),
+                    cell(", ".join(task.get("dependencies", [])), "wbs_cell")
+                ]
+                if schedule:
+                    entry = schedule["tasks"][i]
+                    style = "wbs_critical" if entry["critical"] else "wbs_schedule"
+                    row += [
+                        cell(entry["earliest_start"], style),
+                        cell(entry["earliest_finish"], style),
+                        cell(entry["latest_start"], style),
+                        cell(entry["latest_finish"], style),
+                        cell(entry["slack"], style),
+                        cell("Yes" if entry["critical"] else "No", style)
+                    ]
+                ws.append(row)
+                if progress and (i + 1) % PROGRESS_ROWS == 0:
+                    progress(i + 1)
+        except BaseException:
+            # Finish and delete the sheet's temp file; an abandoned write-only writer would leak it
+            ws.close()
+            ws._writer.cleanup()
+            raise
+
+        # Summary section (one blank row after the data)
+        ws.append([])
+        ws.append([cell("Summary", "wbs_summary_title")])
+        summary = [
+            ("Total Tasks:", len(tasks)),
+            ("Total Hours:", total_hours),
+            ("Dev Hours:", dev_hours),
+            ("R&D Hours:", rnd_hours)
+        ]
+        if schedule:
+            summary += [
+                ("Project Duration (h):", schedule["project_duration"]),
+                ("Critical Path:", " → ".join(schedule["critical_path"]))
+            ]
+        for label, value in summary:
+            ws.append([cell(label, "wbs_summary_label"), value])
+
+        wb.save(output)
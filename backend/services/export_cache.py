@@ -0,0 +1,136 @@
+"""
+Export Cache - Content-addressed export files with a bounded temp directory
+Exports are keyed by a hash of (format, project name, options, canonical
+task list), so an identical re-export is served from disk and the key
+doubles as the HTTP ETag. A background janitor evicts files past the
+maximum age, then least-recently-used files until the size budget holds.
+"""
+from typing import BinaryIO, Callable, Dict, List, Optional
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import time
+from fastapi.concurrency import run_in_threadpool
+from config import settings
+
+# Bump when export formatting changes so stale files are never served
+EXPORT_CACHE_VERSION = "1"
+_TEMP_PREFIX = ".tmp-"
+_KEY_BATCH_TASKS = 512  # Tasks encoded per hash update (part of the key format)
+
+
+class ExportCache:
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None,
+                 max_age_seconds: Optional[int] = None):
+        self.directory = directory or settings.EXPORT_CACHE_DIR
+        self.max_bytes = max_bytes or settings.EXPORT_CACHE_MAX_BYTES
+        self.max_age_seconds = max_age_seconds or settings.EXPORT_CACHE_MAX_AGE_SECONDS
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def key(export_format: str, project_name: str, tasks: List[Dict], **options) -> str:
+        """
+        sha256 over everything that affects the exported bytes: a canonical JSON
+        header, then the tasks as canonical JSON in fixed-size batches, hashed
+        incrementally so the full payload is never held in memory
+        """
+        encode = json.JSONEncoder(sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode
+        digest = hashlib.sha256(encode(
+            {"v": EXPORT_CACHE_VERSION, "format": export_format, "project_name": project_name, "options": options}
+        ).encode("utf-8"))
+        for start in range(0, len(tasks), _KEY_BATCH_TASKS):
+            digest.update(b"\n")
+            digest.update(encode(tasks[start:start + _KEY_BATCH_TASKS]).encode("utf-8"))
+        return digest.hexdigest()
+
+    def path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, key + suffix)
+
+    def get(self, key: str, suffix: str) -> Optional[str]:
+        """Path of a cached export, refreshing its mtime (the janitor's LRU clock), or None"""
+        path = self.path(key, suffix)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, suffix: str, write: Callable[[BinaryIO], None]) -> str:
+        """Write an export through a temp file and atomically move it into place"""
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=_TEMP_PREFIX, suffix=suffix)
+        try:
+            with os.fdopen(fd, "wb") as output:
+                write(output)
+            os.replace(temp_path, self.path(key, suffix))
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        return self.path(key, suffix)
+
+    def _entries(self) -> List[os.DirEntry]:
+        with os.scandir(self.directory) as entries:
+            return [entry for entry in entries if entry.is_file(follow_symlinks=False)]
+
+    def sweep(self) -> Dict:
+        """Remove expired files, then the least recently used ones until under max_bytes"""
+        now = time.time()
+        removed = freed = 0
+        live = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat(follow_symlinks=False)
+            except FileNotFoundError:
+                continue
+            in_progress = entry.name.startswith(_TEMP_PREFIX)
+            if now - stat.st_mtime > self.max_age_seconds:
+                if self._remove(entry.path):
+                    removed += 1
+                    freed += stat.st_size
+            elif not in_progress:
+                live.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in live)
+        live.sort()
+        for _, size, path in live:
+            if total <= self.max_bytes:
+                break
+            if self._remove(path):
+                removed += 1
+                freed += size
+            total -= size
+
+        if removed:
+            print(f"🧹 Export cache: removed {removed} files ({freed / 2**20:.1f} MiB), {total / 2**20:.1f} MiB kept")
+        return {"removed": removed, "freed_bytes": freed, "total_bytes": total}
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def stats(self) -> Dict:
+        entries = [entry for entry in self._entries() if not entry.name.startswith(_TEMP_PREFIX)]
+        return {
+            "files": len(entries),
+            "total_bytes": sum(entry.stat(follow_symlinks=False).st_size for entry in entries),
+            "max_bytes": self.max_bytes,
+            "max_age_seconds": self.max_age_seconds
+        }
+
+    async def run_janitor(self, interval: Optional[int] = None) -> None:
+        """Sweep on startup and then every interval seconds (run as a background task)"""
+        interval = interval or settings.EXPORT_CACHE_SWEEP_SECONDS
+        while True:
+            try:
+                await run_in_threadpool(self.sweep)
+            except Exception as e:
+                print(f"Export cache sweep failed: {e}")
+            await asyncio.sleep(interval)
@@ -0,0 +1,203 @@
+"""
+Export Jobs - Background Excel exports on a bounded process pool
+Submitting returns a job ID immediately; workers write into the export
+cache and report progress (rows written) through a manager dict, which
+also carries cooperative cancellation. Finished jobs expire after a TTL.
+"""
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from multiprocessing import Manager
+from typing import Dict, List, Optional
+import threading
+import time
+import uuid
+from config import settings
+from services.excel_generator import ExcelGenerator
+from services.export_cache import ExportCache
+from services.scheduler import CPMScheduler
+
+QUEUED, RUNNING, CANCELLING = "queued", "running", "cancelling"
+DONE, FAILED, CANCELLED = "done", "failed", "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def _run_export_job(job_id: str, project_name: str, tasks: List[Dict], include_schedule: bool,
+                    cache_dir: str, key: str, progress, cancelled) -> str:
+    """Worker process: schedule (optionally) and write the workbook into the cache"""
+    def report(rows: int) -> None:
+        if cancelled.get(job_id):
+            raise ExportCancelled()
+        progress[job_id] = rows
+
+    report(0)
+    schedule = CPMScheduler().schedule(tasks) if include_schedule else None
+    cache = ExportCache(cache_dir)
+    path = cache.put(key, ".xlsx", lambda output: ExcelGenerator().write_excel(
+        output, project_name, tasks, schedule, progress=report
+    ))
+    progress[job_id] = len(tasks)
+    return path
+
+
+class ExportJobManager:
+    """Job records are plain dicts guarded by a lock; the pool and manager start on first use"""
+
+    def __init__(self, cache: ExportCache, workers: Optional[int] = None, max_active: Optional[int] = None,
+                 ttl_seconds: Optional[int] = None):
+        self.cache = cache
+        self.workers = workers or settings.EXPORT_JOB_WORKERS
+        self.max_active = max_active or settings.EXPORT_JOB_MAX_ACTIVE
+        self.ttl_seconds = ttl_seconds or settings.EXPORT_JOB_TTL_SECONDS
+        self._jobs: Dict[str, Dict] = {}
+        self._futures: Dict[str, object] = {}
+        self._lock = threading.RLock()  # Cancelling a queued future runs _finish synchronously
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._progress = None
+        self._cancelled = None
+
+    def _start(self) -> None:
+        if self._pool is None:
+            self._manager = Manager()
+            self._progress = self._manager.dict()
+            self._cancelled = self._manager.dict()
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            for job_id in list(self._futures):
+                self._cancelled[job_id] = True
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._manager.shutdown()
+            self._pool = None
+
+    def submit(self, project_name: str, tasks: List[Dict], include_schedule: bool, key: str,
+               filename: str) -> Dict:
+        """Queue an export; raises RuntimeError when too many jobs are already active"""
+        self.purge_expired()
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "status": QUEUED,
+            "total_rows": len(tasks),
+            "created_at": time.time(),
+            "finished_at": None,
+            "error": None,
+            "path": None,
+            "filename": filename,
+            "key": key
+        }
+
+        # Already exported: the job is born finished
+        cached = self.cache.get(key, ".xlsx")
+        if cached:
+            job.update(status=DONE, path=cached, finished_at=time.time())
+            with self._lock:
+                self._jobs[job_id] = job
+            return self._view(job)
+
+        with self._lock:
+            active = sum(1 for j in self._jobs.values() if j["status"] not in FINISHED)
+            if active >= self.max_active:
+                raise RuntimeError(f"Too many export jobs in progress ({active}); try again later")
+            self._start()
+            self._jobs[job_id] = job
+            self._progress[job_id] = -1  # Becomes 0 when a worker picks the job up
+            future = self._pool.submit(
+                _run_export_job, job_id, project_name, tasks, include_schedule,
+                self.cache.directory, key, self._progress, self._cancelled
+            )
+            self._futures[job_id] = future
+        future.add_done_callback(lambda f: self._finish(job_id, f))
+        print(f"📤 Export job {job_id[:8]} queued ({len(tasks)} tasks)")
+        return self._view(job)
+
+    def _finish(self, job_id: str, future) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            self._futures.pop(job_id, None)
+            if job is None:
+                return
+            job["finished_at"] = job["finished_at"] or time.time()
+            try:
+                path = future.result()
+                # A job already reported cancelled stays cancelled, even if a worker raced past the flag
+                if job["status"] != CANCELLED:
+                    job["path"] = path
+                    job["status"] = DONE
+            except (CancelledError, ExportCancelled):
+                job["status"] = CANCELLED
+            except Exception as e:
+                job["status"] = FAILED
+                job["error"] = str(e)
+            try:
+                self._progress.pop(job_id, None)
+                self._cancelled.pop(job_id, None)
+            except Exception:
+                pass  # Manager already shut down
+        print(f"📤 Export job {job_id[:8]} {job['status']}")
+
+    def status(self, job_id: str) -> Optional[Dict]:
+        self.purge_expired()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._view(job) if job else None
+
+    def cancel(self, job_id: str) -> Optional[Dict]:
+        """
+        Cancel a job. One no worker has started is cancelled at once; a running
+        one is "cancelling" until it stops at its next progress report.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            future = self._futures.get(job_id)
+            if future is not None and not future.cancel():
+                # The pool may already have moved the call to its queue; the flag stops it at its first report
+                self._cancelled[job_id] = True
+                if self._progress.get(job_id, -1) < 0:
+                    job.update(status=CANCELLED, finished_at=time.time())
+                else:
+                    job["status"] = CANCELLING
+            return self._view(job)
+
+    def result(self, job_id: str) -> Optional[Dict]:
+        """Path, filename and ETag of a finished export; None if not done or evicted by the cache janitor"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] != DONE:
+                return None
+            key, filename = job["key"], job["filename"]
+        path = self.cache.get(key, ".xlsx")
+        return {"path": path, "filename": filename, "etag": f'"{key}"'} if path else None
+
+    def purge_expired(self) -> None:
+        now = time.time()
+        with self._lock:
+            for job_id in [
+                job_id for job_id, job in self._jobs.items()
+                if job["finished_at"] is not None and now - job["finished_at"] > self.ttl_seconds
+            ]:
+                del self._jobs[job_id]
+
+    def _view(self, job: Dict) -> Dict:
+        """Public job status (progress read live from the workers; a queued job a worker picked up shows as running)"""
+        status = job["status"]
+        rows = job["total_rows"] if status == DONE else (self._progress or {}).get(job["job_id"], 0)
+        if status == QUEUED and rows >= 0 and job["job_id"] in self._futures:
+            status = RUNNING
+        rows = max(rows, 0)
+        return {
+            "job_id": job["job_id"],
+            "status": status,
+            "progress": round(rows / job["total_rows"], 3) if job["total_rows"] else 1.0,
+            "rows_written": rows,
+            "total_rows": job["total_rows"],
+            "error": job["error"],
+            "created_at": job["created_at"],
+            "expires_at": job["finished_at"] + self.ttl_seconds if job["finished_at"] else None
+        }
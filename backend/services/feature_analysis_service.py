@@ -2,74 +2,144 @@
 Feature Analysis Service - Intelligent Task Requirement Detection
 Uses AI to determine which pre-development phases are needed for each feature
 """
-from typing import Dict, List
+from typing import Dict, List, Optional, Set
+import hashlib
+import json
 import re
 from services.ai_service import AIService
+from services.keyword_matcher import KeywordMatcher
+from services.response_cache import get_analysis_memo
+from config import settings
 
 
 import asyncio
 
+# Bump when the keyword tables or hour rules change so stale memo entries stop matching
+ANALYSIS_VERSION = "2"
+
+# Keyword tables, compiled once into a single word-aware matcher shared by every request
+KEYWORD_CATEGORIES = {
+    # R&D indicators
+    'rnd': [
+        'research', 'algorithm', 'machine learning', 'ai', 'optimization',
+        'real-time', 'websocket', 'blockchain', 'performance', 'scalability',
+        'architecture', 'proof of concept', 'poc', 'feasibility', 'complex'
+    ],
+    # UI indicators
+    'ui': [
+        'ui', 'ux', 'interface', 'dashboard', 'form', 'page', 'screen',
+        'button', 'display', 'view', 'visualization', 'chart', 'graph',
+        'modal', 'dialog', 'menu', 'navigation', 'user-facing', 'frontend'
+    ],
+    # DB indicators
+    'db': [
+        'database', 'schema', 'table', 'model', 'migration', 'data structure',
+        'entity', 'relationship', 'store', 'persist', 'save', 'crud',
+        'collection', 'document', 'sql', 'nosql', 'query'
+    ],
+    # Complexity assessment
+    'complex': ['complex', 'advanced', 'sophisticated', 'real-time', 'distributed', 'scalable'],
+    'simple': ['simple', 'basic', 'straightforward', 'easy', 'quick', 'export', 'utility'],
+    # Ambiguity screening (which features are worth an AI call)
+    'amb_simple': ['export', 'import', 'csv', 'json', 'pdf', 'print', 'download', 'upload'],
+    'amb_ui': ['dashboard', 'form', 'page', 'screen', 'button', 'menu'],
+    'amb_complex': ['algorithm', 'optimization', 'real-time', 'machine learning', 'ai', 'distributed']
+}
+
+keyword_matcher = KeywordMatcher(KEYWORD_CATEGORIES)
+
+
+def feature_key(feature: Dict) -> str:
+    """Content address for a feature: sha256 of its normalized name + description"""
+    name = " ".join(feature.get('name', '').lower().split())
+    desc = " ".join(feature.get('description', '').lower().split())
+    return hashlib.sha256(f"{ANALYSIS_VERSION}\x00{name}\x00{desc}".encode("utf-8")).hexdigest()
+
+
 class FeatureAnalysisService:
     """Analyzes features to determine conditional task requirements"""
     
     def __init__(self, ai_service: AIService):
         self.ai = ai_service
-        self.semaphore = asyncio.Semaphore(5)  # Limit concurrent AI calls
+        # Concurrency is bounded by the process-wide Gemini rate limiter
+        self.memo = get_analysis_memo()
         
     async def analyze_feature(self, feature: Dict) -> Dict:
         """
         Analyze a feature to determine required phases and hours.
         Uses keyword-first approach with AI only for ambiguous cases.
         """
+        key = feature_key(feature)
+        memoized = self._memo_get(key)
+        if memoized:
+            return memoized
+        
         # ALWAYS use keyword analysis first (fast and reliable)
-        keyword_analysis = self._keyword_analyze_feature(feature)
+        hits = self._match_keywords(feature)
+        keyword_analysis = self._keyword_analyze_feature(feature, hits)
         
         # Only use AI if the feature is truly ambiguous
         # (This reduces API calls by ~80%)
-        needs_ai = self._is_ambiguous(feature, keyword_analysis)
-        
-        if needs_ai and self.ai.client:
-            async with self.semaphore:
-                try:
-                    ai_analysis = await self._ai_analyze_feature(feature)
-                    if ai_analysis:
-                        # Merge AI insights with keyword analysis
-                        keyword_analysis.update(ai_analysis)
-                except Exception as e:
-                    # Silently fall back to keyword analysis
-                    pass
+        needs_ai = self._is_ambiguous(feature, keyword_analysis, hits)
+        
+        ai_analysis = None
+        if needs_ai and self.ai.gemini.configured:
+            try:
+                ai_analysis = await self._ai_analyze_feature(feature)
+                if ai_analysis:
+                    # Merge AI insights with keyword analysis
+                    keyword_analysis.update(ai_analysis)
+            except Exception as e:
+                # Silently fall back to keyword analysis
+                pass
         
         # Calculate hours based on analysis
-        return self._calculate_hours(keyword_analysis)
+        analysis = self._calculate_hours(keyword_analysis)
+        if not needs_ai or ai_analysis:
+            self._memo_set(key, analysis, ai_analysis)
+        return analysis
+    
+    def _match_keywords(self, feature: Dict) -> Set[str]:
+        """Single pass of the compiled matcher over name + description"""
+        return keyword_matcher.match(f"{feature.get('name', '')} {feature.get('description', '')}")
     
-    def _is_ambiguous(self, feature: Dict, keyword_analysis: Dict) -> bool:
+    def _is_ambiguous(self, feature: Dict, keyword_analysis: Dict, hits: Optional[Set[str]] = None) -> bool:
         """Determine if a feature needs AI analysis (only ~20% of features)"""
-        name = feature.get('name', '').lower()
-        desc = feature.get('description', '').lower()
-        text = f"{name} {desc}"
+        if hits is None:
+            hits = self._match_keywords(feature)
         
         # Skip AI for clearly simple features
-        simple_indicators = ['export', 'import', 'csv', 'json', 'pdf', 'print', 'download', 'upload']
-        if any(indicator in text for indicator in simple_indicators):
+        if 'amb_simple' in hits:
             return False
         
         # Skip AI for clearly UI features
-        ui_indicators = ['dashboard', 'form', 'page', 'screen', 'button', 'menu']
-        if any(indicator in text for indicator in ui_indicators) and len(desc) < 100:
+        if 'amb_ui' in hits and len(feature.get('description', '')) < 100:
             return False
         
         # Only use AI for genuinely complex/ambiguous cases
-        complex_indicators = ['algorithm', 'optimization', 'real-time', 'machine learning', 'ai', 'distributed']
-        return any(indicator in text for indicator in complex_indicators)
+        return 'amb_complex' in hits
     
     async def analyze_features_batch(self, features: List[Dict]) -> List[Dict]:
-        """Analyze multiple features (mostly using keyword analysis)"""
-        tasks = []
-        for feature in features:
-            tasks.append(self.analyze_feature(feature))
-            
-        # Run all analysis tasks concurrently
-        results = await asyncio.gather(*tasks)
+        """
+        Analyze multiple features (mostly using keyword analysis).
+        Ambiguous features are packed into batched AI prompts, so the number
+        of Gemini round-trips depends on the number of batches, not features.
+        Features seen before (same normalized name + description) come from the memo.
+        """
+        keys = [feature_key(feature) for feature in features]
+        results: List[Optional[Dict]] = [self._memo_get(key) for key in keys]
+        
+        # Analyze each distinct unmemoized feature once
+        pending: Dict[str, Dict] = {}
+        for key, feature, result in zip(keys, features, results):
+            if result is None:
+                pending.setdefault(key, feature)
+        
+        if pending:
+            reused = sum(1 for result in results if result is not None)
+            print(f"🧠 Analysis memo: {reused} reused, {len(pending)} to analyze")
+            analyzed = await self._analyze_pending(pending)
+            results = [result or analyzed[key] for key, result in zip(keys, results)]
         
         # Merge analysis back into feature objects
         analyzed_features = []
@@ -79,6 +149,57 @@ class FeatureAnalysisService:
             
         return analyzed_features
     
+    async def _analyze_pending(self, features: Dict[str, Dict]) -> Dict[str, Dict]:
+        """Keyword + batched AI analysis of keyed features, memoizing settled results"""
+        keys = list(features)
+        feature_hits = [self._match_keywords(features[key]) for key in keys]
+        keyword_analyses = [
+            self._keyword_analyze_feature(features[key], hits)
+            for key, hits in zip(keys, feature_hits)
+        ]
+        
+        ambiguous = {}
+        for i, (key, keyword_analysis) in enumerate(zip(keys, keyword_analyses)):
+            if self._is_ambiguous(features[key], keyword_analysis, feature_hits[i]):
+                ambiguous[f"k{i}"] = features[key]
+        
+        ai_analyses = {}
+        if ambiguous and self.ai.gemini.configured:
+            ai_analyses = await self._ai_analyze_features(ambiguous)
+            for batch_key, ai_analysis in ai_analyses.items():
+                # Merge AI insights with keyword analysis
+                keyword_analyses[int(batch_key[1:])].update(ai_analysis)
+        
+        analyzed = {}
+        for i, (key, keyword_analysis) in enumerate(zip(keys, keyword_analyses)):
+            analysis = self._calculate_hours(keyword_analysis)
+            analyzed[key] = analysis
+            # Keyword fallbacks for ambiguous features are not memoized, so the AI gets another chance
+            batch_key = f"k{i}"
+            if batch_key not in ambiguous or batch_key in ai_analyses:
+                self._memo_set(key, analysis, ai_analyses.get(batch_key))
+        return analyzed
+    
+    def _memo_get(self, key: str) -> Optional[Dict]:
+        """Memoized hours for a feature key, or None"""
+        if not self.memo:
+            return None
+        try:
+            cached = self.memo.get(key)
+            return json.loads(cached)["analysis"] if cached else None
+        except Exception as e:
+            print(f"Analysis memo read failed: {e}")
+            return None
+    
+    def _memo_set(self, key: str, analysis: Dict, ai_verdict: Optional[Dict]) -> None:
+        """Store the computed hours together with the AI verdict they were based on"""
+        if not self.memo:
+            return
+        try:
+            self.memo.set(key, json.dumps({"analysis": analysis, "ai_verdict": ai_verdict}))
+        except Exception as e:
+            print(f"Analysis memo write failed: {e}")
+    
     async def _ai_analyze_feature(self, feature: Dict) -> Dict:
         """Use AI to analyze feature requirements"""
         feature_name = feature.get('name', '')
@@ -119,7 +240,7 @@ Return ONLY valid JSON (no markdown, no explanations):
 """
         
         try:
-            result = await self.ai._call_gemini(prompt)
+            result = await self.ai._call_gemini(prompt, operation="analysis")
             if result and isinstance(result, list) and len(result) > 0:
                 return result[0]
             elif result and isinstance(result, dict):
@@ -129,46 +250,139 @@ Return ONLY valid JSON (no markdown, no explanations):
         
         return None
     
-    def _keyword_analyze_feature(self, feature: Dict) -> Dict:
-        """Fallback: Keyword-based analysis when AI is unavailable"""
-        name = feature.get('name', '').lower()
-        desc = feature.get('description', '').lower()
-        text = f"{name} {desc}"
-        
-        # R&D indicators
-        rnd_keywords = [
-            'research', 'algorithm', 'machine learning', 'ai', 'optimization',
-            'real-time', 'websocket', 'blockchain', 'performance', 'scalability',
-            'architecture', 'proof of concept', 'poc', 'feasibility', 'complex'
-        ]
-        needs_rnd = any(keyword in text for keyword in rnd_keywords)
+    async def _ai_analyze_features(self, features: Dict[str, Dict]) -> Dict[str, Dict]:
+        """
+        Analyze keyed features with batched prompts.
+        Features whose entries come back missing or malformed are retried
+        (in fresh batches) up to AI_BATCH_MAX_RETRIES times.
+        """
+        results = {}
+        pending = dict(features)
         
-        # UI indicators
-        ui_keywords = [
-            'ui', 'ux', 'interface', 'dashboard', 'form', 'page', 'screen',
-            'button', 'display', 'view', 'visualization', 'chart', 'graph',
-            'modal', 'dialog', 'menu', 'navigation', 'user-facing', 'frontend'
-        ]
-        needs_ui = any(keyword in text for keyword in ui_keywords)
+        for attempt in range(settings.AI_BATCH_MAX_RETRIES + 1):
+            if not pending:
+                break
+            if attempt > 0:
+                print(f"🔁 Retrying AI analysis for {len(pending)} features")
+            
+            batches = self._plan_batches(pending)
+            batch_results = await asyncio.gather(
+                *(self._run_analysis_batch(batch) for batch in batches)
+            )
+            for batch_result in batch_results:
+                results.update(batch_result)
+            pending = {key: f for key, f in pending.items() if key not in results}
         
-        # DB indicators
-        db_keywords = [
-            'database', 'schema', 'table', 'model', 'migration', 'data structure',
-            'entity', 'relationship', 'store', 'persist', 'save', 'crud',
-            'collection', 'document', 'sql', 'nosql', 'query'
-        ]
-        needs_db = any(keyword in text for keyword in db_keywords)
+        return results
+    
+    def _plan_batches(self, features: Dict[str, Dict]) -> List[Dict[str, Dict]]:
+        """Split keyed features into batches bounded by prompt size and feature count"""
+        batches = []
+        current = {}
+        current_chars = 0
         
-        # Complexity assessment
-        complexity_indicators = {
-            'complex': ['complex', 'advanced', 'sophisticated', 'real-time', 'distributed', 'scalable'],
-            'simple': ['simple', 'basic', 'straightforward', 'easy', 'quick', 'export', 'utility']
-        }
+        for key, feature in features.items():
+            size = len(feature.get('name', '')) + len(feature.get('description', '')) + 40
+            if current and (
+                current_chars + size > settings.AI_BATCH_MAX_CHARS
+                or len(current) >= settings.AI_BATCH_MAX_FEATURES
+            ):
+                batches.append(current)
+                current = {}
+                current_chars = 0
+            current[key] = feature
+            current_chars += size
+        
+        if current:
+            batches.append(current)
+        return batches
+    
+    async def _run_analysis_batch(self, batch: Dict[str, Dict]) -> Dict[str, Dict]:
+        """Send one batched prompt and return only the well-formed entries by key"""
+        prompt = self._build_batch_prompt(batch)
+        
+        def complete(result: List[Dict]) -> bool:
+            # Cache the answer only when every feature in the batch got a valid entry
+            valid = {str(entry.get('key', '')) for entry in self._valid_entries(result)}
+            return all(key in valid for key in batch)
+        
+        try:
+            result = await self.ai._call_gemini(prompt, operation="analysis_batch", accept=complete)
+        except Exception as e:
+            print(f"AI batch analysis failed: {e}")
+            return {}
+        
+        analyses = {}
+        for entry in self._valid_entries(result):
+            key = str(entry.get('key', ''))
+            if key in batch:
+                analyses[key] = {
+                    'needs_rnd': entry['needs_rnd'],
+                    'needs_ui': entry['needs_ui'],
+                    'needs_db': entry['needs_db'],
+                    'dev_complexity': entry['dev_complexity'],
+                    'reasoning': entry.get('reasoning', 'AI analysis')
+                }
+        return analyses
+    
+    def _build_batch_prompt(self, batch: Dict[str, Dict]) -> str:
+        """Pack several features into one analysis prompt"""
+        feature_lines = "\n".join(
+            f"- key: {key}\n  Feature: {f.get('name', '')}\n  Description: {f.get('description', '')}"
+            for key, f in batch.items()
+        )
+        
+        return f"""
+Analyze each of these software features to determine what work phases are needed.
+
+Features:
+{feature_lines}
+
+For EACH feature determine:
+1. **needs_rnd**: TRUE if new technology, unclear implementation, complex algorithms or proof-of-concept needed
+2. **needs_ui**: TRUE if it has user-facing screens, dashboards, forms or visualizations
+3. **needs_db**: TRUE if it needs new tables/collections, schema changes or migrations
+4. **dev_complexity**: "simple" (1-2 days), "medium" (3-5 days) or "complex" (1-2 weeks)
+
+Return ONLY a valid JSON array with one object per feature, echoing its key (no markdown, no explanations):
+[
+    {{
+        "key": "k0",
+        "needs_rnd": true/false,
+        "needs_ui": true/false,
+        "needs_db": true/false,
+        "dev_complexity": "simple/medium/complex",
+        "reasoning": "brief explanation of decisions"
+    }}
+]
+"""
+    
+    def _valid_entries(self, result: Optional[List]) -> List[Dict]:
+        """Well-formed analysis entries of a batch answer"""
+        return [entry for entry in result or [] if isinstance(entry, dict) and self._is_valid_ai_analysis(entry)]
+    
+    def _is_valid_ai_analysis(self, entry: Dict) -> bool:
+        """Check that an AI analysis entry has every field with the right type"""
+        return (
+            isinstance(entry.get('needs_rnd'), bool)
+            and isinstance(entry.get('needs_ui'), bool)
+            and isinstance(entry.get('needs_db'), bool)
+            and entry.get('dev_complexity') in ('simple', 'medium', 'complex')
+        )
+    
+    def _keyword_analyze_feature(self, feature: Dict, hits: Optional[Set[str]] = None) -> Dict:
+        """Fallback: Keyword-based analysis when AI is unavailable"""
+        if hits is None:
+            hits = self._match_keywords(feature)
+        
+        needs_rnd = 'rnd' in hits
+        needs_ui = 'ui' in hits
+        needs_db = 'db' in hits
         
         dev_complexity = 'medium'  # Default
-        if any(keyword in text for keyword in complexity_indicators['complex']):
+        if 'complex' in hits:
             dev_complexity = 'complex'
-        elif any(keyword in text for keyword in complexity_indicators['simple']):
+        elif 'simple' in hits:
             dev_complexity = 'simple'
         
         return {
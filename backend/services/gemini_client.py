@@ -0,0 +1,387 @@
+"""
+Gemini Client Registry - One shared, lifespan-managed Gemini client
+Owns the HTTP connection pool used by every AI-backed service, and the
+transport (live, record or replay) every call goes through
+"""
+from typing import AsyncIterator, Dict, Optional
+import asyncio
+import time
+import httpx
+from google import genai
+from google.genai import types
+from config import settings
+from services.response_cache import prompt_key
+from services.single_flight import SingleFlight
+from services.rate_limiter import AdaptiveRateLimiter, is_throttle_error, retry_after_seconds
+from services.latency_tracker import LatencyTracker
+from services.circuit_breaker import CircuitBreaker, CircuitOpenError, OPEN, HALF_OPEN
+from services.cassette import Cassette, LiveTransport, RecordingTransport, ReplayTransport
+
+
+class GeminiClientRegistry:
+    """Creates a single genai.Client with a tunable keep-alive pool and closes it on shutdown"""
+
+    def __init__(
+        self,
+        api_key: str,
+        model_name: str,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 60.0,
+        limiter: Optional[AdaptiveRateLimiter] = None,
+        max_retries: int = 4,
+        default_timeout: float = 60.0,
+        operation_timeouts: Optional[Dict[str, float]] = None,
+        hedging_enabled: bool = True,
+        latency: Optional[LatencyTracker] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        transport=None,
+        record_path: Optional[str] = None
+    ):
+        self.api_key = api_key
+        self.model_name = model_name
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self._client: Optional[genai.Client] = None
+        
+        # A pre-built transport (e.g. replay) replaces the live client entirely;
+        # with record_path the live transport also records to a cassette
+        self._transport = transport
+        self._owns_transport = transport is None
+        self.record_path = record_path
+        
+        # Identical concurrent prompts share one upstream call
+        self.single_flight = SingleFlight()
+        
+        # Process-wide quota/concurrency control shared by every service
+        self.limiter = limiter or AdaptiveRateLimiter(requests_per_minute=60, tokens_per_minute=1_000_000)
+        self.max_retries = max_retries
+        
+        # Per-operation deadlines and p95-based request hedging
+        self.default_timeout = default_timeout
+        self.operation_timeouts = operation_timeouts or {}
+        self.hedging_enabled = hedging_enabled
+        self.latency = latency or LatencyTracker()
+        
+        # Shared breaker: during an outage services go straight to their fallbacks
+        self.breaker = breaker or CircuitBreaker()
+
+    @classmethod
+    def from_settings(cls) -> "GeminiClientRegistry":
+        transport = None
+        if settings.GEMINI_TRANSPORT == "replay":
+            transport = ReplayTransport(
+                Cassette(settings.GEMINI_CASSETTE_PATH),
+                latency_ms=settings.GEMINI_REPLAY_LATENCY_MS,
+                latency_distribution=settings.GEMINI_REPLAY_LATENCY_DISTRIBUTION,
+                error_rates=settings.GEMINI_REPLAY_ERROR_RATES,
+                seed=settings.GEMINI_REPLAY_SEED
+            )
+        
+        return cls(
+            api_key=settings.GEMINI_API_KEY,
+            model_name=settings.GEMINI_MODEL,
+            max_connections=settings.GEMINI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.GEMINI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.GEMINI_KEEPALIVE_EXPIRY,
+            limiter=AdaptiveRateLimiter(
+                requests_per_minute=settings.GEMINI_RPM,
+                tokens_per_minute=settings.GEMINI_TPM,
+                max_concurrency=settings.GEMINI_MAX_CONCURRENCY,
+                min_concurrency=settings.GEMINI_MIN_CONCURRENCY,
+                backoff_base=settings.GEMINI_BACKOFF_BASE,
+                backoff_max=settings.GEMINI_BACKOFF_MAX
+            ),
+            max_retries=settings.GEMINI_MAX_RETRIES,
+            default_timeout=settings.GEMINI_TIMEOUT_SECONDS,
+            operation_timeouts=settings.GEMINI_OPERATION_TIMEOUTS,
+            hedging_enabled=settings.GEMINI_HEDGING_ENABLED,
+            latency=LatencyTracker(
+                min_samples=settings.GEMINI_HEDGE_MIN_SAMPLES,
+                percentile=settings.GEMINI_HEDGE_PERCENTILE
+            ),
+            breaker=CircuitBreaker(
+                failure_rate_threshold=settings.GEMINI_BREAKER_FAILURE_RATE,
+                min_calls=settings.GEMINI_BREAKER_MIN_CALLS,
+                window_seconds=settings.GEMINI_BREAKER_WINDOW_SECONDS,
+                cooldown_seconds=settings.GEMINI_BREAKER_COOLDOWN_SECONDS
+            ),
+            transport=transport,
+            record_path=settings.GEMINI_CASSETTE_PATH if settings.GEMINI_TRANSPORT == "record" else None
+        )
+
+    @property
+    def client(self) -> Optional[genai.Client]:
+        """The shared client, created on first use (None without an API key or when replaying)"""
+        if self._client is None and self._transport is None and self.api_key:
+            self.start()
+        return self._client
+
+    @property
+    def transport(self):
+        """Backend every call goes through (None when nothing is configured)"""
+        if self._transport is None and self.api_key:
+            self.start()
+        return self._transport
+
+    @property
+    def configured(self) -> bool:
+        return self.transport is not None
+
+    def start(self) -> None:
+        """Build the shared client, its connection pools and the live transport"""
+        if self._transport is not None or not self.api_key:
+            return
+
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+        self._client = genai.Client(
+            api_key=self.api_key,
+            http_options=types.HttpOptions(
+                client_args={"limits": limits},
+                async_client_args={"limits": limits}
+            )
+        )
+        self._transport = LiveTransport(self._client)
+        if self.record_path:
+            self._transport = RecordingTransport(self._transport, Cassette(self.record_path))
+
+    @property
+    def available(self) -> bool:
+        """True when a Gemini call could be made now (transport configured and circuit not open)"""
+        return self.configured and self.breaker.available()
+
+    async def generate_text(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        operation: str = "default"
+    ) -> Optional[str]:
+        """
+        Generate a response for prompt, coalescing identical in-flight requests.
+        The whole call (retries included) runs under the operation's deadline;
+        raises asyncio.TimeoutError when it expires.
+        """
+        if not self.configured:
+            return None
+        model = model or self.model_name
+        return await self.single_flight.do(
+            prompt_key(model, prompt),
+            lambda: self._generate_with_deadline(model, prompt, operation)
+        )
+
+    def timeout_for(self, operation: str) -> float:
+        return self.operation_timeouts.get(operation, self.default_timeout)
+
+    async def _generate_with_deadline(self, model: str, prompt: str, operation: str) -> Optional[str]:
+        if not self.breaker.allow_request():
+            raise CircuitOpenError("Gemini circuit is open")
+        probe = self.breaker.state == HALF_OPEN
+        
+        self.latency.count(operation, "calls")
+        try:
+            # Cancellation on expiry unwinds limiter.acquire(), releasing its slot
+            return await asyncio.wait_for(
+                self._generate_text(model, prompt, operation),
+                timeout=self.timeout_for(operation)
+            )
+        except asyncio.TimeoutError:
+            self.latency.count(operation, "timeouts")
+            self.breaker.record_failure()
+            print(f"⏱️  Gemini {operation} call exceeded {self.timeout_for(operation)}s deadline")
+            raise
+        finally:
+            self._release_probe(probe)
+
+    def _release_probe(self, probe: bool) -> None:
+        """
+        Free the half-open probe slot if this call was the probe and ended without
+        recording an outcome (cancelled, or a non-retryable 4xx / cassette miss)
+        """
+        if probe and self.breaker.state == HALF_OPEN:
+            self.breaker.release_probe()
+
+    async def _generate_text(self, model: str, prompt: str, operation: str) -> Optional[str]:
+        """Rate-limited call with jittered exponential backoff; raises after the last retry"""
+        tokens = self.limiter.estimate_tokens(prompt)
+        
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await self._hedged_attempt(model, prompt, tokens, operation)
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                print(f"Gemini error (attempt {attempt+1}/{self.max_retries+1}), retrying in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+        
+        return None
+
+    async def _hedged_attempt(self, model: str, prompt: str, tokens: int, operation: str) -> Optional[str]:
+        """
+        One attempt; if it is still running after the operation's p95 latency,
+        send a duplicate and take whichever answers first.
+        """
+        hedge_delay = self.latency.hedge_delay(operation) if self.hedging_enabled else None
+        if hedge_delay is None:
+            return await self._attempt(model, prompt, tokens, operation)
+        
+        acquired = asyncio.Event()
+        primary = asyncio.ensure_future(self._attempt(model, prompt, tokens, operation, acquired))
+        hedge = None
+        # The hedge clock starts once the primary holds a limiter slot, so queueing never triggers hedges
+        waiter = asyncio.ensure_future(acquired.wait())
+        try:
+            await asyncio.wait({primary, waiter}, return_when=asyncio.FIRST_COMPLETED)
+            waiter.cancel()
+            if not primary.done():
+                await asyncio.wait({primary}, timeout=hedge_delay)
+            # Only hedge with spare capacity; a saturated limiter would just queue the duplicate
+            if primary.done() or not self.limiter.has_capacity():
+                return await primary
+            
+            self.latency.count(operation, "hedges")
+            hedge = asyncio.ensure_future(self._attempt(model, prompt, tokens, operation))
+            pending = {primary, hedge}
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        if future is hedge:
+                            self.latency.count(operation, "hedge_wins")
+                        return future.result()
+                    error = future.exception()
+            raise error
+        finally:
+            # The loser (or both, on cancellation) releases its limiter slot; the waiter must not outlive us
+            for future in (primary, hedge, waiter):
+                if future is not None and not future.done():
+                    future.cancel()
+
+    async def _attempt(
+        self,
+        model: str,
+        prompt: str,
+        tokens: int,
+        operation: str,
+        acquired: Optional[asyncio.Event] = None
+    ) -> Optional[str]:
+        async with self.limiter.acquire(tokens):
+            if acquired is not None:
+                acquired.set()
+            started = time.monotonic()
+            text = await self.transport.generate(model, prompt)
+        self.latency.record(operation, time.monotonic() - started)
+        self.limiter.on_success()
+        self.breaker.record_success()
+        return text
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        """Backoff before the next attempt; re-raises errors that should not be retried"""
+        # Client errors other than 429 won't succeed on retry
+        code = getattr(error, "code", None)
+        if isinstance(code, int) and 400 <= code < 500 and code != 429:
+            raise error
+        
+        self.breaker.record_failure()
+        retry_after = None
+        if is_throttle_error(error):
+            retry_after = retry_after_seconds(error)
+            self.limiter.on_throttle(retry_after)
+        
+        # Stop retrying as soon as the shared breaker trips
+        if attempt == self.max_retries or self.breaker.state == OPEN:
+            raise error
+        return self.limiter.backoff_delay(attempt, retry_after)
+
+    async def stream_text(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        operation: str = "stream"
+    ) -> AsyncIterator[str]:
+        """
+        Stream response text chunks. Throttled attempts are retried with backoff
+        only until the first chunk arrives; the limiter slot is held for the whole stream.
+        Every chunk must arrive before the operation's deadline.
+        """
+        if not self.configured:
+            return
+        if not self.breaker.allow_request():
+            raise CircuitOpenError("Gemini circuit is open")
+        model = model or self.model_name
+        tokens = self.limiter.estimate_tokens(prompt)
+        self.latency.count(operation, "calls")
+        deadline = time.monotonic() + self.timeout_for(operation)
+        probe = self.breaker.state == HALF_OPEN
+        
+        try:
+            for attempt in range(self.max_retries + 1):
+                emitted = False
+                try:
+                    async with self.limiter.acquire(tokens):
+                        started = time.monotonic()
+                        iterator = self.transport.stream(model, prompt).__aiter__()
+                        while True:
+                            try:
+                                chunk = await asyncio.wait_for(
+                                    iterator.__anext__(),
+                                    timeout=max(0.0, deadline - time.monotonic())
+                                )
+                            except StopAsyncIteration:
+                                break
+                            emitted = True
+                            yield chunk
+                    self.latency.record(operation, time.monotonic() - started)
+                    self.limiter.on_success()
+                    self.breaker.record_success()
+                    return
+                except asyncio.TimeoutError:
+                    self.latency.count(operation, "timeouts")
+                    self.breaker.record_failure()
+                    raise
+                except Exception as e:
+                    if emitted:
+                        self.breaker.record_failure()
+                        raise
+                    delay = self._retry_delay(e, attempt)
+                    print(f"Gemini stream error (attempt {attempt+1}/{self.max_retries+1}), retrying in {delay:.1f}s: {e}")
+                    await asyncio.sleep(delay)
+        finally:
+            self._release_probe(probe)
+
+    def metrics(self) -> Dict:
+        """Counters for the shared Gemini traffic"""
+        return {
+            "model": self.model_name,
+            "single_flight": self.single_flight.stats(),
+            "rate_limiter": self.limiter.stats(),
+            "operations": self.latency.stats(),
+            "circuit_breaker": self.breaker.stats()
+        }
+
+    async def prewarm(self) -> None:
+        """Open a pooled TLS connection ahead of the first real request"""
+        if not self.client:
+            return
+        try:
+            await self.client.aio.models.get(model=self.model_name)
+        except Exception as e:
+            print(f"Gemini prewarm failed: {e}")
+
+    async def aclose(self) -> None:
+        """Flush any recording and close both the async and sync connection pools"""
+        if self._transport is not None:
+            self._transport.close()
+            if self._owns_transport:
+                self._transport = None
+        if self._client is None:
+            return
+        client, self._client = self._client, None
+        try:
+            await client.aio.aclose()
+        finally:
+            client.close()
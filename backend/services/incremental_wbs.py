@@ -0,0 +1,163 @@
+"""
+Incremental WBS - Regenerate only the features that changed
+Takes a previous WBS plus a feature diff (added / changed / removed),
+rebuilds just the affected feature subtrees with stable task IDs, re-links
+the dependencies that crossed their boundaries and returns a patch.
+"""
+from typing import Dict, List, Optional
+from services.task_table import TaskTable
+from services.scheduler import CPMScheduler
+from services.wbs_engine import WBSEngine, TASK_TEMPLATES, normalize_feature_name
+
+
+def _field(feature, name, default=None):
+    return feature.get(name, default) if hasattr(feature, 'get') else getattr(feature, name, default)
+
+
+class IncrementalWBSBuilder:
+    """
+    Features are identified by the tasks' parent_id. Unchanged features keep
+    their tasks verbatim (including manual edits); only dependencies that
+    pointed into a removed or regenerated feature are rewritten.
+    """
+
+    def __init__(self, engine: Optional[WBSEngine] = None, cpm: Optional[CPMScheduler] = None):
+        self.engine = engine or WBSEngine()
+        self.cpm = cpm or CPMScheduler()
+
+    def regenerate(
+        self,
+        tasks: List[Dict],
+        added: List[Dict] = (),
+        changed: List[Dict] = (),
+        removed: List[str] = ()
+    ) -> Dict:
+        """
+        Apply a feature diff to a previous WBS.
+        Returns {"added": [tasks], "updated": [tasks], "removed": [task IDs], "total_tasks", "total_hours"}.
+        Raises ValueError for unknown/duplicate features or a resulting dependency cycle.
+        """
+        # Previous WBS grouped by feature, in generation (topological) order
+        by_feature: Dict[Optional[str], List[Dict]] = {}
+        owner: Dict[str, Optional[str]] = {}
+        for task in tasks:
+            by_feature.setdefault(task.get("parent_id"), []).append(task)
+            owner[task["id"]] = task.get("parent_id")
+
+        # Dependencies that enter each feature from outside it
+        entry_deps = {
+            feature_id: list(dict.fromkeys(
+                dep for task in group for dep in task.get("dependencies") or () if owner.get(dep) != feature_id
+            ))
+            for feature_id, group in by_feature.items()
+        }
+
+        removed = list(dict.fromkeys(removed))
+        changed_ids = [_field(f, 'id') for f in changed]
+        added_ids = [_field(f, 'id') for f in added]
+        for feature_id in removed + changed_ids:
+            if feature_id not in by_feature:
+                raise ValueError(f"Feature {feature_id} is not in the previous WBS")
+        if len(set(changed_ids)) != len(changed_ids) or set(changed_ids) & set(removed):
+            raise ValueError("Each feature may appear only once in the diff")
+        for feature_id in added_ids:
+            if not feature_id or feature_id in by_feature or added_ids.count(feature_id) > 1:
+                raise ValueError(f"Added feature needs a new, unique id (got {feature_id!r})")
+
+        # Rebuild changed and added features with stable IDs, unlinked for now
+        table = TaskTable(TASK_TEMPLATES, stable_ids=True)
+        bounds = {}
+        for idx, feature in enumerate(list(changed) + list(added), 1):
+            first = len(table)
+            self.engine.add_feature_tasks(table, feature, idx, [])
+            bounds[_field(feature, 'id')] = (first, len(table))
+        rebuilt = table.to_dicts()
+        new_groups = {feature_id: rebuilt[start:end] for feature_id, (start, end) in bounds.items()}
+        last_task = {feature_id: group[-1]["id"] for feature_id, group in by_feature.items()}
+        last_task.update({feature_id: group[-1]["id"] for feature_id, group in new_groups.items()})
+        new_ids = {task["id"] for task in rebuilt}
+
+        # A dependency on a removed feature is bridged to that feature's own prerequisites;
+        # one on a task that vanished from a regenerated feature moves to its new last task
+        removed_set = set(removed)
+        bridges: Dict[str, List[str]] = {}
+
+        def relink(dep: str) -> List[str]:
+            feature_id = owner.get(dep)
+            if feature_id in removed_set:
+                if feature_id not in bridges:
+                    bridges[feature_id] = []  # Guards against cyclic input
+                    bridges[feature_id] = [t for d in entry_deps[feature_id] for t in relink(d)]
+                return bridges[feature_id]
+            if feature_id in new_groups and dep not in new_ids:
+                return [last_task[feature_id]]
+            return [dep]
+
+        def relinked(deps) -> List[str]:
+            return list(dict.fromkeys(t for dep in deps for t in relink(dep)))
+
+        # Names are only known for features in the diff; the previous WBS has just their IDs
+        names: Dict[str, str] = {}
+        for feature in list(changed) + list(added):
+            names.setdefault(normalize_feature_name(_field(feature, 'name', '')), _field(feature, 'id'))
+
+        def declared(feature) -> Optional[List[str]]:
+            """Last tasks of a feature's declared prerequisites (same rules as WBSEngine._resolve_feature_graph)"""
+            deps = _field(feature, 'dependencies')
+            if deps is None:
+                return None
+            feature_id, feature_name = _field(feature, 'id'), _field(feature, 'name')
+            resolved = []
+            for dep in deps:
+                target = dep if dep in last_task or dep in removed_set else names.get(normalize_feature_name(dep))
+                if target is None:
+                    problem = (f"unknown feature '{dep}' (features outside added/changed "
+                               f"can only be referenced by ID here)")
+                elif target in removed_set:
+                    problem = f"removed feature '{dep}'"
+                elif target == feature_id:
+                    problem = "itself"
+                else:
+                    resolved.append(last_task[target])
+                    continue
+                if not _field(feature, 'dependencies_inferred', False):
+                    raise ValueError(f"Feature '{feature_name}' depends on {problem}")
+                print(f"⚠️  Ignoring AI-extracted dependency of '{feature_name}' on {problem}")
+            return list(dict.fromkeys(resolved))
+
+        changed_by_id = dict(zip(changed_ids, changed))
+        result: List[Dict] = []
+        for feature_id, group in by_feature.items():
+            if feature_id in removed_set:
+                continue
+            if feature_id in new_groups:
+                deps = declared(changed_by_id[feature_id])
+                new_groups[feature_id][0]["dependencies"] = (
+                    deps if deps is not None else relinked(entry_deps[feature_id])
+                )
+                result.extend(new_groups[feature_id])
+                continue
+            for task in group:
+                deps = task.get("dependencies") or []
+                fixed = relinked(deps)
+                result.append(task if fixed == deps else {**task, "dependencies": fixed})
+
+        # Added features chain after the current last feature unless they declare dependencies
+        for feature, feature_id in zip(added, added_ids):
+            deps = declared(feature)
+            if deps is None:
+                deps = [result[-1]["id"]] if result else []
+            new_groups[feature_id][0]["dependencies"] = deps
+            result.extend(new_groups[feature_id])
+
+        self.cpm.topological_order(result)
+
+        previous = {task["id"]: task for task in tasks}
+        current_ids = {task["id"] for task in result}
+        return {
+            "added": [task for task in result if task["id"] not in previous],
+            "updated": [task for task in result if task["id"] in previous and task != previous[task["id"]]],
+            "removed": [task["id"] for task in tasks if task["id"] not in current_ids],
+            "total_tasks": len(result),
+            "total_hours": round(sum(task.get("duration_hours") or 0 for task in result), 1)
+        }
@@ -0,0 +1,113 @@
+"""
+JSON Stream - Incremental parser for streamed JSON arrays
+Emits each top-level array element as soon as its closing bracket arrives
+"""
+import json
+from typing import Any, List
+
+_MALFORMED = object()
+
+
+class IncrementalJSONArrayParser:
+    """
+    Feed text chunks of a (possibly markdown-fenced) JSON array and get back
+    the elements completed so far. Each character is scanned exactly once.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._started = False
+        self._finished = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._element_start = None
+
+    @property
+    def finished(self) -> bool:
+        return self._finished
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Consume a chunk and return every element completed by it"""
+        if self._finished or not chunk:
+            return []
+
+        self._buffer += chunk
+        elements = []
+        buffer = self._buffer
+        i = self._pos
+
+        while i < len(buffer):
+            ch = buffer[i]
+
+            if not self._started:
+                # Skip prose / markdown fences until the array opens
+                if ch == "[":
+                    self._started = True
+                    self._depth = 1
+                i += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                i += 1
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._element_start is None:
+                    self._element_start = i
+            elif ch in "{[":
+                if self._depth == 1:
+                    self._element_start = i
+                self._depth += 1
+            elif ch in "}]":
+                if self._depth == 1:
+                    # Top-level array closes; flush a trailing scalar element
+                    if self._element_start is not None:
+                        element = self._decode(buffer[self._element_start:i])
+                        if element is not _MALFORMED:
+                            elements.append(element)
+                        self._element_start = None
+                    self._depth = 0
+                    self._finished = True
+                    i += 1
+                    break
+                self._depth -= 1
+                if self._depth == 1 and self._element_start is not None:
+                    element = self._decode(buffer[self._element_start:i + 1])
+                    if element is not _MALFORMED:
+                        elements.append(element)
+                    self._element_start = None
+            elif ch == ",":
+                # Scalar element (string/number) ends at the separator
+                if self._depth == 1 and self._element_start is not None:
+                    element = self._decode(buffer[self._element_start:i])
+                    if element is not _MALFORMED:
+                        elements.append(element)
+                    self._element_start = None
+            elif self._depth == 1 and self._element_start is None and not ch.isspace():
+                self._element_start = i
+            i += 1
+
+        # Drop consumed text so the buffer only holds the open element
+        keep_from = self._element_start if self._element_start is not None else i
+        self._buffer = buffer[keep_from:]
+        if self._element_start is not None:
+            self._element_start = 0
+        self._pos = i - keep_from
+        return elements
+
+    @staticmethod
+    def _decode(text: str) -> Any:
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            # Skip a malformed element rather than failing the whole stream
+            return _MALFORMED
@@ -0,0 +1,114 @@
+"""
+Keyword Matcher - Compiled single-pass, word-aware keyword classifier
+All keyword tables are merged into one vocabulary, so a single tokenization
+of the text yields every category hit at once.
+"""
+import re
+from typing import Dict, Iterable, List, Set, Tuple
+
+_WORD = re.compile(r"\w+")
+
+# Keywords shorter than this are acronyms ("ai", "ui", "sql"): whole word plus s/es only
+MIN_PREFIX_LENGTH = 4
+
+# Suffix rewrites giving the stem that inflected forms share ("optimization" -> "optimiz" + "ed")
+_STEM_RULES = (("ization", "iz"), ("ation", "at"), ("ion", ""), ("e", ""), ("y", "i"))
+_STEM_ENDINGS = ("e", "s", "es", "ed", "er", "ers", "ing", "ings")
+
+# Per-word results are memoized; the memo is dropped when it grows past this
+MAX_MEMO_WORDS = 200_000
+_NO_HITS = (frozenset(), ())
+
+
+def _inflections(keyword: str) -> Set[str]:
+    """Inflected forms that do not start with the keyword itself (saving, optimized, queries)"""
+    for suffix, replacement in _STEM_RULES:
+        if keyword.endswith(suffix):
+            stem = keyword[:-len(suffix)] + replacement
+            if len(stem) >= MIN_PREFIX_LENGTH - 1:
+                return {stem + ending for ending in _STEM_ENDINGS} - {keyword}
+            break
+    return set()
+
+
+class KeywordMatcher:
+    """
+    Maps keyword hits at the start of a word in a text to their categories.
+    - Keywords of MIN_PREFIX_LENGTH+ chars match any word they begin
+      ("persist" -> "persisted", "model" -> "modeling") plus the stem
+      inflections above; shorter ones match the whole word (+s/es), so
+      "ai" no longer hits "maintain"
+    - Multi-word keywords ("machine learning", "real-time"): a phrase regex
+      tolerant of missing separators ("realtime"), only tried when a word of
+      the text begins with the phrase's first word
+    """
+
+    def __init__(self, categories: Dict[str, Iterable[str]]):
+        self.words: Dict[str, Set[str]] = {}
+        self.prefixes: Dict[str, Set[str]] = {}
+        phrases: Dict[Tuple[str, ...], Set[str]] = {}
+
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                tokens = tuple(_WORD.findall(keyword.lower()))
+                if len(tokens) == 1:
+                    word = tokens[0]
+                    if len(word) < MIN_PREFIX_LENGTH:
+                        forms = {word, word + "s", word + "es"}
+                    else:
+                        self.prefixes.setdefault(word, set()).add(category)
+                        forms = _inflections(word)
+                    for form in forms:
+                        self.words.setdefault(form, set()).add(category)
+                elif tokens:
+                    phrases.setdefault(tokens, set()).add(category)
+
+        # Phrases are indexed by their first word, which joins the prefixes as a trigger
+        self.phrases: Dict[str, List[Tuple[re.Pattern, Set[str]]]] = {}
+        for tokens, phrase_categories in phrases.items():
+            pattern = re.compile(r"\b" + r"\W*".join(map(re.escape, tokens)))
+            self.phrases.setdefault(tokens[0], []).append((pattern, phrase_categories))
+            self.prefixes.setdefault(tokens[0], set())
+        self.prefix_lengths = sorted({len(prefix) for prefix in self.prefixes})
+        self._memo: Dict[str, Tuple[frozenset, Tuple[str, ...]]] = {}
+
+    def _word_hits(self, word: str) -> Tuple[frozenset, Tuple[str, ...]]:
+        """(categories, phrase triggers) of one word: exact forms plus every keyword prefix"""
+        categories = set(self.words.get(word, ()))
+        triggers = []
+        for length in self.prefix_lengths:
+            if length > len(word):
+                break
+            prefix = word[:length]
+            prefix_categories = self.prefixes.get(prefix)
+            if prefix_categories is not None:
+                categories |= prefix_categories
+                if prefix in self.phrases:
+                    triggers.append(prefix)
+        if not categories and not triggers:
+            return _NO_HITS
+        return frozenset(categories), tuple(triggers)
+
+    def match(self, text: str) -> Set[str]:
+        """Every category with at least one keyword hit in text"""
+        text = text.lower()
+        memo = self._memo
+
+        hits: Set[str] = set()
+        triggered: Set[str] = set()
+        for word in set(_WORD.findall(text)):
+            result = memo.get(word)
+            if result is None:
+                if len(memo) >= MAX_MEMO_WORDS:
+                    memo.clear()
+                result = memo[word] = self._word_hits(word)
+            if result is not _NO_HITS:
+                hits |= result[0]
+                triggered.update(result[1])
+
+        phrases = self.phrases
+        for first in triggered:
+            for pattern, phrase_categories in phrases[first]:
+                if not phrase_categories <= hits and pattern.search(text):
+                    hits |= phrase_categories
+        return hits
@@ -0,0 +1,52 @@
+"""
+Latency Tracker - Per-operation latency windows and deadline/hedge counters
+Supplies the p95 hedge delay for Gemini calls
+"""
+from collections import defaultdict, deque
+from typing import Dict, Optional
+
+
+class LatencyTracker:
+    """Sliding window of successful call latencies plus counters, keyed by operation"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20, percentile: float = 0.95):
+        self.window = window
+        self.min_samples = min_samples
+        self.percentile = percentile
+        self._latencies: Dict[str, deque] = defaultdict(lambda: deque(maxlen=self.window))
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"calls": 0, "timeouts": 0, "hedges": 0, "hedge_wins": 0}
+        )
+
+    def record(self, operation: str, seconds: float) -> None:
+        self._latencies[operation].append(seconds)
+
+    def count(self, operation: str, counter: str) -> None:
+        self._counters[operation][counter] += 1
+
+    def quantile(self, operation: str, q: float) -> Optional[float]:
+        samples = self._latencies.get(operation)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def hedge_delay(self, operation: str) -> Optional[float]:
+        """Seconds to wait before hedging, or None until enough samples exist"""
+        samples = self._latencies.get(operation)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        return self.quantile(operation, self.percentile)
+
+    def stats(self) -> Dict:
+        operations = set(self._counters) | set(self._latencies)
+        result = {}
+        for operation in sorted(operations):
+            p50 = self.quantile(operation, 0.5)
+            p95 = self.quantile(operation, 0.95)
+            result[operation] = {
+                **self._counters[operation],
+                "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                "p95_ms": round(p95 * 1000, 1) if p95 is not None else None
+            }
+        return result
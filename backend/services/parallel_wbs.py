@@ -0,0 +1,115 @@
+"""
+Parallel WBS - Sharded, multi-process WBS generation for very large feature sets
+Features are split into contiguous shards; every shard's task IDs and
+cross-shard dependencies are fixed up front from per-feature task counts,
+so each worker process builds and encodes its tasks independently and the
+stitched JSON is byte-for-byte what the serial path produces.
+"""
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate, chain
+from typing import List, Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
+from config import settings
+from services.task_table import TaskTable
+from services.wbs_engine import WBSEngine, TASK_TEMPLATES, QA_TEMPLATE
+
+
+def _render_shard(features: List, first_idx: int, base: int, entry_ids: List[List[str]],
+                  stable_ids: bool) -> Tuple[int, object, str]:
+    """Worker: build one shard's tasks (global IDs from base) and encode them"""
+    engine = WBSEngine()
+    table = TaskTable(TASK_TEMPLATES, stable_ids, base)
+    for k, feature in enumerate(features):
+        first = len(table)
+        engine.add_feature_tasks(table, feature, first_idx + k, [])
+        if entry_ids[k]:
+            table.external[first] = entry_ids[k]
+    return len(table), table.hours, table.tasks_json()
+
+
+class ParallelWBSRenderer:
+    """Renders WBSResponse JSON serially in a thread, or across a process pool above the threshold"""
+
+    def __init__(self, engine: Optional[WBSEngine] = None, workers: Optional[int] = None,
+                 threshold: Optional[int] = None):
+        self.engine = engine or WBSEngine()
+        self.workers = workers or settings.WBS_PARALLEL_WORKERS or os.cpu_count() or 1
+        self.threshold = threshold or settings.WBS_PARALLEL_THRESHOLD
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def plan_shards(self, features: List, stable_ids: bool = False, shards: Optional[int] = None) -> List[tuple]:
+        """
+        Split features (in generation order) into _render_shard argument tuples.
+        Task IDs and each feature's entry dependencies are computed here, from
+        the same per-feature task counts the serial path would produce.
+        """
+        sorted_features, feature_prereqs = self.engine.plan_features(features)
+        count = len(sorted_features)
+        sizes = [self.engine.feature_task_count(f, idx) for idx, f in enumerate(sorted_features, 1)]
+        starts = [0, *accumulate(sizes)]
+
+        qa_key = TASK_TEMPLATES[QA_TEMPLATE].key
+        if stable_ids:
+            last_ids = [f"{self.engine.feature_fields(f, idx)[0]}-{qa_key}"
+                        for idx, f in enumerate(sorted_features, 1)]
+        else:
+            last_ids = [f"T{end}" for end in starts[1:]]
+
+        if feature_prereqs is None:
+            entry_ids = [[last_ids[k - 1]] if k else [] for k in range(count)]
+        else:
+            entry_ids = [[last_ids[p] for p in prereqs] for prereqs in feature_prereqs]
+
+        shards = max(1, min(shards or self.workers * 2, count))
+        bounds = [count * s // shards for s in range(shards + 1)]
+        return [
+            (sorted_features[lo:hi], lo + 1, starts[lo], entry_ids[lo:hi], stable_ids)
+            for lo, hi in zip(bounds, bounds[1:]) if hi > lo
+        ]
+
+    def render_sharded(self, project_name: str, features: List, stable_ids: bool = False,
+                       executor=None) -> str:
+        """Blocking sharded render; map runs shards on the process pool (or the given executor)"""
+        plans = self.plan_shards(features, stable_ids)
+        mapper = (executor or self._executor()).map
+        results = list(mapper(_render_shard, *zip(*plans))) if plans else []
+        return self._stitch(project_name, plans, results)
+
+    async def render(self, project_name: str, features: List, stable_ids: bool = False) -> str:
+        """WBSResponse JSON without blocking the event loop"""
+        if self.workers < 2 or len(features) < self.threshold:
+            return await run_in_threadpool(
+                lambda: self.engine.build_task_table(features, stable_ids).to_json(project_name)
+            )
+
+        plans = self.plan_shards(features, stable_ids)
+        loop = asyncio.get_running_loop()
+        pool = self._executor()
+        print(f"🧩 Generating WBS in {len(plans)} shards across {self.workers} processes...")
+        results = await asyncio.gather(*(loop.run_in_executor(pool, _render_shard, *plan) for plan in plans))
+        return self._stitch(project_name, plans, results)
+
+    @staticmethod
+    def _stitch(project_name: str, plans: List[tuple], results: List[Tuple[int, object, str]]) -> str:
+        # Each shard must end exactly where the next one's precomputed ID offset starts
+        for plan, next_plan, (count, _, _) in zip(plans, plans[1:], results):
+            if plan[2] + count != next_plan[2]:
+                raise RuntimeError(f"WBS shard at task offset {plan[2]} produced {count} tasks, "
+                                   f"expected {next_plan[2] - plan[2]}")
+        total_tasks = sum(count for count, _, _ in results)
+        # Same left-to-right float summation as TaskTable.total_hours on the serial table
+        total_hours = sum(chain.from_iterable(hours for _, hours, _ in results))
+        tasks_json = ",".join(body for count, _, body in results if count)
+        return TaskTable.wrap_json(project_name, tasks_json, total_tasks, total_hours)
@@ -3,26 +3,20 @@ PDF Service - Extract text and features from PDF documents
 Uses PyMuPDF for text extraction and Gemini for feature parsing
 """
 import fitz  # PyMuPDF
-from typing import List, Dict
+from typing import AsyncIterator, List, Dict
 import os
-from google import genai
-from config import settings
+import re
 import logging
 import pdfplumber
 from services.ai_service import AIService
+from services.text_chunker import PAGE_BREAK
 
 logging.basicConfig(level=logging.INFO)
 
 class PDFService:
-    def __init__(self):
-        if settings.GEMINI_API_KEY:
-            self.client = genai.Client(api_key=settings.GEMINI_API_KEY)
-            self.model_name = settings.GEMINI_MODEL
-        else:
-            self.client = None
-            self.model_name = None
-        
-        self.ai_service = AIService()
+    def __init__(self, ai_service: AIService):
+        # Reuse the app-wide AIService (and its shared Gemini client)
+        self.ai_service = ai_service
 
     async def extract_text_from_pdf(self, pdf_path: str) -> str:
         """Extract all text from PDF file using pdfplumber"""
@@ -36,7 +30,8 @@ class PDFService:
                 for page in pdf.pages:
                     page_text = page.extract_text()
                     if page_text:
-                        text_content += page_text + "\n"
+                        # Form feed marks page boundaries for chunked extraction
+                        text_content += page_text + "\n" + PAGE_BREAK
             logging.info("Text extraction completed.")
             return text_content.strip()
         except Exception as e:
@@ -64,6 +59,7 @@ class PDFService:
                     "description": f.get("description", ""),
                     "execution_order": f.get("order", i+1),
                     "dependencies": f.get("deps", []),
+                    "dependencies_inferred": True,
                     "source": "pdf",
                     "category": 1, # Default
                     "category_name": "PDF Extracted"
@@ -118,28 +114,7 @@ class PDFService:
                 raw_features = self._generate_default_features()
 
             # Step 4: Normalize features to match expected schema
-            features = []
-            for i, feature in enumerate(raw_features):
-                # Extract execution_order - handle both string and int formats
-                exec_order = feature.get("order", feature.get("execution_order", i+1))
-                
-                # Convert string execution_order to integer
-                if isinstance(exec_order, str):
-                    # Extract first number from string like "1.1 Audio Ingestion..."
-                    import re
-                    match = re.search(r'^\d+', exec_order)
-                    exec_order = int(match.group()) if match else i+1
-                else:
-                    exec_order = int(exec_order) if exec_order else i+1
-                
-                features.append({
-                    "id": feature.get("id", f"f{i+1}"),
-                    "name": feature.get("name", "Unnamed Feature"),
-                    "description": feature.get("description", ""),
-                    "execution_order": exec_order,
-                    "priority": "medium",
-                    "confidence": 0.8
-                })
+            features = [self._normalize_feature(feature, i) for i, feature in enumerate(raw_features)]
 
             logging.info(f"Feature extraction successful. Found {len(features)} features.")
             return {
@@ -163,6 +138,50 @@ class PDFService:
                 "features": self._generate_default_features()
             }
 
+    async def stream_uploaded_pdf(self, pdf_path: str, project_name: str) -> AsyncIterator[Dict]:
+        """Streaming variant of process_uploaded_pdf: yields normalized features as they arrive"""
+        logging.info(f"Streaming PDF features for project: {project_name}")
+        text = await self.extract_text_from_pdf(pdf_path)
+        if not text:
+            raise Exception("No text extracted from PDF")
+        
+        count = 0
+        async for feature in self.ai_service.stream_workflow_from_text(text):
+            yield self._normalize_feature(feature, count)
+            count += 1
+        
+        if not count:
+            logging.warning("AI returned no features. Using defaults.")
+            for i, feature in enumerate(self._generate_default_features()):
+                yield self._normalize_feature(feature, i)
+    
+    def _normalize_feature(self, feature: Dict, index: int) -> Dict:
+        """Normalize an AI-extracted feature to match the expected schema"""
+        # Extract execution_order - handle both string and int formats
+        exec_order = feature.get("order", feature.get("execution_order", index+1))
+        
+        # Convert string execution_order to integer
+        if isinstance(exec_order, str):
+            # Extract first number from string like "1.1 Audio Ingestion..."
+            match = re.search(r'^\d+', exec_order)
+            exec_order = int(match.group()) if match else index+1
+        else:
+            exec_order = int(exec_order) if exec_order else index+1
+        
+        # Prerequisite features, by ID or name ("deps" is the compact AI key)
+        deps = feature.get("deps", feature.get("dependencies"))
+        
+        return {
+            "id": feature.get("id", f"f{index+1}"),
+            "name": feature.get("name", "Unnamed Feature"),
+            "description": feature.get("description", ""),
+            "execution_order": exec_order,
+            "dependencies": [str(dep) for dep in deps] if isinstance(deps, list) else [],
+            "dependencies_inferred": True,  # Model output: the WBS engine drops references it cannot resolve
+            "priority": "medium",
+            "confidence": 0.8
+        }
+    
     def _extract_features_locally(self, text: str) -> List[Dict]:
         """Simple keyword-based feature extraction (No AI)"""
         text_lower = text.lower()
@@ -209,8 +228,7 @@ class PDFService:
         with pdfplumber.open(pdf_path) as pdf:
             for page in pdf.pages:
                 # layout=True helps preserve columns and section headers
-                text_content += page.extract_text(layout=True) + "\n"
+                text_content += page.extract_text(layout=True) + "\n" + PAGE_BREAK
         
         # Feed the FULL text to Gemini for intelligent parsing
-        ai_service = AIService()
-        return await ai_service.extract_workflow_from_text(text_content)
+        return await self.ai_service.extract_workflow_from_text(text_content)
@@ -0,0 +1,170 @@
+"""
+Rate Limiter - Process-wide adaptive limiter for Gemini traffic
+Token buckets for requests/tokens per minute plus AIMD concurrency control
+"""
+import asyncio
+import random
+import re
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+
+class TokenBucket:
+    """Continuously refilling bucket holding up to one minute of budget"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def take(self, amount: float) -> float:
+        """Wait until amount is available and consume it; returns seconds waited"""
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return waited
+            delay = (amount - self.tokens) / self.rate
+            waited += delay
+            await asyncio.sleep(delay)
+
+
+class AdaptiveRateLimiter:
+    """
+    Shared limiter for every Gemini call in the process.
+    - RPM / TPM token buckets keep traffic under the quota ceiling
+    - Concurrency grows additively on success and halves on 429/503 (AIMD)
+    - Retry-after hints pause all callers, not just the one that was throttled
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_concurrency: int = 8,
+        min_concurrency: int = 1,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0
+    ):
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency_limit = float(max_concurrency)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._active = 0
+        self._condition = asyncio.Condition()
+        self._paused_until = 0.0
+
+        self.requests = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+
+    @staticmethod
+    def estimate_tokens(prompt: str, expected_output_tokens: int = 1024) -> int:
+        """Rough token estimate (~4 characters per token) plus expected output"""
+        return len(prompt) // 4 + expected_output_tokens
+
+    @asynccontextmanager
+    async def acquire(self, tokens: int = 0):
+        """Hold one request slot for the duration of the block"""
+        started = time.monotonic()
+
+        pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            await asyncio.sleep(pause)
+
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._active < int(self.concurrency_limit))
+            self._active += 1
+
+        try:
+            await self.request_bucket.take(1)
+            if tokens:
+                await self.token_bucket.take(tokens)
+            self.requests += 1
+            self.wait_seconds += time.monotonic() - started
+            yield
+        finally:
+            async with self._condition:
+                self._active -= 1
+                self._condition.notify_all()
+
+    def has_capacity(self) -> bool:
+        """True when a new request would get a concurrency slot immediately"""
+        return self._active < int(self.concurrency_limit)
+
+    def on_success(self) -> None:
+        """Additive increase: roughly +1 slot per window of successful calls"""
+        previous = int(self.concurrency_limit)
+        self.concurrency_limit = min(
+            float(self.max_concurrency),
+            self.concurrency_limit + 1.0 / self.concurrency_limit
+        )
+        if int(self.concurrency_limit) > previous:
+            asyncio.ensure_future(self._notify())
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        """Multiplicative decrease, and pause everyone for the server's retry-after hint"""
+        self.throttled += 1
+        self.concurrency_limit = max(float(self.min_concurrency), self.concurrency_limit / 2)
+        if retry_after:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+    async def _notify(self) -> None:
+        async with self._condition:
+            self._condition.notify_all()
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential backoff, never shorter than the retry-after hint"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        return max(delay, retry_after or 0.0)
+
+    def stats(self) -> Dict:
+        return {
+            "requests_per_minute": self.request_bucket.capacity,
+            "tokens_per_minute": self.token_bucket.capacity,
+            "concurrency_limit": int(self.concurrency_limit),
+            "active": self._active,
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "avg_wait_ms": round(self.wait_seconds / self.requests * 1000, 1) if self.requests else 0.0
+        }
+
+
+def is_throttle_error(error: Exception) -> bool:
+    """True for quota/overload errors (429, 503, RESOURCE_EXHAUSTED, UNAVAILABLE)"""
+    code = getattr(error, "code", None)
+    if code in (429, 503):
+        return True
+    error_str = str(error)
+    return any(marker in error_str for marker in ("429", "503", "RESOURCE_EXHAUSTED", "UNAVAILABLE"))
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Extract a retry hint from a Retry-After header or a RetryInfo retryDelay"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers:
+        value = headers.get("retry-after")
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                pass
+
+    match = re.search(r"retryDelay['\"]?\s*[:=]\s*['\"]?(\d+(?:\.\d+)?)s", str(error))
+    if match:
+        return float(match.group(1))
+    return None
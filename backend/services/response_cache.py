@@ -0,0 +1,163 @@
+"""
+Response Cache - Persistent content-addressed cache for Gemini responses
+SQLite-backed store with TTL expiry and LRU eviction, shared across restarts
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+from config import settings
+
+
+def prompt_key(model_name: str, prompt: str) -> str:
+    """Content address for a prompt: sha256 of model name + normalized prompt"""
+    # Collapse whitespace so re-indented f-string prompts hash identically
+    normalized = " ".join(prompt.split())
+    return hashlib.sha256(f"{model_name}\x00{normalized}".encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Disk-backed key/value cache with TTL, LRU eviction and hit/miss counters"""
+
+    def __init__(self, path: str, ttl_seconds: float = 86400, max_entries: int = 5000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # One connection shared by all requests; access is serialized by the lock
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value, or None on miss/expiry"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at, accessed_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, created_at, accessed_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+
+            # LRU bookkeeping at minute granularity keeps hot hits write-free
+            if now - accessed_at > 60:
+                self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        """Store a value and evict least-recently-used entries over the limit"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            self._evict()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+    def _evict(self) -> None:
+        """Drop expired rows, then the oldest-accessed rows beyond max_entries"""
+        if self.ttl_seconds:
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            )
+            self.evictions += max(cursor.rowcount, 0)
+
+        count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,)
+            )
+            self.evictions += max(cursor.rowcount, 0)
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_shared_cache: Optional[ResponseCache] = None
+_shared_memo: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Process-wide Gemini response cache (None when disabled in settings)"""
+    global _shared_cache
+    if not settings.AI_CACHE_ENABLED:
+        return None
+    if _shared_cache is None:
+        _shared_cache = ResponseCache(
+            path=settings.AI_CACHE_PATH,
+            ttl_seconds=settings.AI_CACHE_TTL_SECONDS,
+            max_entries=settings.AI_CACHE_MAX_ENTRIES
+        )
+    return _shared_cache
+
+
+def get_analysis_memo() -> Optional[ResponseCache]:
+    """Process-wide feature analysis memo (None when disabled in settings)"""
+    global _shared_memo
+    if not settings.ANALYSIS_MEMO_ENABLED:
+        return None
+    if _shared_memo is None:
+        _shared_memo = ResponseCache(
+            path=settings.ANALYSIS_MEMO_PATH,
+            ttl_seconds=settings.ANALYSIS_MEMO_TTL_SECONDS,
+            max_entries=settings.ANALYSIS_MEMO_MAX_ENTRIES
+        )
+    return _shared_memo
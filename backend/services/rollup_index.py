@@ -0,0 +1,163 @@
+"""
+Rollup Index - Hierarchical hour totals per node and task type
+Numbers the parent_id hierarchy with an Euler tour (nested sets), derives
+every node's subtree totals from per-type prefix sums in one O(n) build,
+then answers "hours under node X by type" in O(1) and applies a single
+task's hour change by walking its ancestors.
+"""
+from array import array
+from collections import OrderedDict
+from itertools import accumulate
+from typing import Dict, List, Optional
+import threading
+import uuid
+from config import settings
+
+ROOT = 0  # Node 0 is the project itself
+
+
+class RollupIndex:
+    """
+    Nodes are the project root, every task, and every parent_id that is not
+    itself a task (e.g. a feature ID). Tasks may nest to any depth via
+    parent_id; tasks without one hang off the root.
+    """
+
+    def __init__(self, tasks: List[Dict]):
+        self.node_ids: List[Optional[str]] = [None]
+        self.index: Dict[str, int] = {}
+        for task in tasks:
+            if task["id"] in self.index:
+                raise ValueError(f"Duplicate task ID: {task['id']}")
+            self.index[task["id"]] = len(self.node_ids)
+            self.node_ids.append(task["id"])
+        task_count = len(tasks)
+
+        # Interned task types; virtual (non-task) nodes carry no type or hours
+        self.types: List[str] = []
+        type_codes: Dict[str, int] = {}
+        self.type_code = array('l', [-1]) * len(self.node_ids)
+        self.hours = array('d', [0.0]) * len(self.node_ids)
+        self.parent = array('l', [ROOT]) * len(self.node_ids)
+        for node, task in enumerate(tasks, 1):
+            task_type = task.get("task_type") or "Dev"
+            code = type_codes.get(task_type)
+            if code is None:
+                code = type_codes[task_type] = len(self.types)
+                self.types.append(task_type)
+            self.type_code[node] = code
+            self.hours[node] = float(task.get("duration_hours") or 0)
+
+            parent_id = task.get("parent_id")
+            if parent_id is not None:
+                parent = self.index.get(parent_id)
+                if parent is None:
+                    parent = self.index[parent_id] = len(self.node_ids)
+                    self.node_ids.append(parent_id)
+                    self.type_code.append(-1)
+                    self.hours.append(0.0)
+                    self.parent.append(ROOT)
+                self.parent[node] = parent
+
+        count = len(self.node_ids)
+        children: List[List[int]] = [[] for _ in range(count)]
+        for node in range(1, count):
+            children[self.parent[node]].append(node)
+        self.children = children
+
+        # Euler tour: node's subtree occupies tour positions [enter, leave)
+        self.enter = array('l', [-1]) * count
+        self.leave = array('l', [0]) * count
+        tour = []
+        stack = [ROOT]
+        while stack:
+            node = stack.pop()
+            if node >= 0:
+                self.enter[node] = len(tour)
+                tour.append(node)
+                stack.append(~node)
+                stack.extend(reversed(children[node]))
+            else:
+                self.leave[~node] = len(tour)
+        if len(tour) != count:
+            stuck = [self.node_ids[n] for n in range(count) if self.enter[n] < 0][:10]
+            raise ValueError(f"parent_id cycle among tasks: {', '.join(map(str, stuck))}")
+
+        # Prefix sums by type over the tour give every subtree total at once
+        width = len(self.types)
+        self.width = width
+        self.totals = array('d', [0.0]) * (count * width)
+        for code in range(width):
+            prefix = list(accumulate(
+                (self.hours[n] if self.type_code[n] == code else 0.0 for n in tour), initial=0.0
+            ))
+            for node in range(count):
+                self.totals[node * width + code] = prefix[self.leave[node]] - prefix[self.enter[node]]
+        is_task = list(accumulate((1 if 0 < n <= task_count else 0 for n in tour), initial=0))
+        self.task_counts = array('l', (is_task[self.leave[n]] - is_task[self.enter[n]] for n in range(count)))
+
+    def _node(self, node_id: Optional[str]) -> int:
+        if node_id is None:
+            return ROOT
+        node = self.index.get(node_id)
+        if node is None:
+            raise KeyError(node_id)
+        return node
+
+    def contains(self, ancestor_id: Optional[str], node_id: str) -> bool:
+        """Whether node_id lies in ancestor_id's subtree (nested-set interval test)"""
+        ancestor, node = self._node(ancestor_id), self._node(node_id)
+        return self.enter[ancestor] <= self.enter[node] < self.leave[ancestor]
+
+    def rollup(self, node_id: Optional[str] = None) -> Dict:
+        """Hours under a node (None = whole project) by task type"""
+        node = self._node(node_id)
+        values = self.totals[node * self.width:(node + 1) * self.width]
+        return {
+            "node_id": node_id,
+            "hours_by_type": {t: round(v, 2) for t, v in zip(self.types, values) if abs(v) > 1e-9},
+            "total_hours": round(sum(values), 2),
+            "task_count": self.task_counts[node]
+        }
+
+    def child_rollups(self, node_id: Optional[str] = None) -> List[Dict]:
+        """Rollups of a node's direct children (for the root: features and top-level tasks)"""
+        return [self.rollup(self.node_ids[child]) for child in self.children[self._node(node_id)]]
+
+    def set_hours(self, task_id: str, hours: float) -> None:
+        """Change one task's hours; O(depth) update of its ancestors' totals"""
+        node = self._node(task_id)
+        code = self.type_code[node]
+        if code < 0:
+            raise KeyError(task_id)  # Virtual parent, not a task
+        delta = hours - self.hours[node]
+        self.hours[node] = hours
+        while True:
+            self.totals[node * self.width + code] += delta
+            if node == ROOT:
+                break
+            node = self.parent[node]
+
+
+class RollupStore:
+    """Bounded in-memory LRU of built indexes, addressed by a generated ID"""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or settings.ROLLUP_INDEX_MAX_ENTRIES
+        self._indexes: "OrderedDict[str, RollupIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, index: RollupIndex) -> str:
+        index_id = uuid.uuid4().hex
+        with self._lock:
+            self._indexes[index_id] = index
+            while len(self._indexes) > self.max_entries:
+                self._indexes.popitem(last=False)
+        return index_id
+
+    def get(self, index_id: str) -> Optional[RollupIndex]:
+        with self._lock:
+            index = self._indexes.get(index_id)
+            if index is not None:
+                self._indexes.move_to_end(index_id)
+            return index
@@ -0,0 +1,298 @@
+"""
+Scheduler - Critical Path Method (CPM) and resource-constrained scheduling for WBS tasks
+CPM computes earliest/latest start and finish, slack and the critical path in O(V + E);
+list scheduling assigns tasks to a finite team by critical-path priority.
+"""
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+# Schedule arithmetic runs on integer hundredths of an hour
+SCALE = 100
+
+
+def kahn_order(predecessors: List[List[int]]) -> Tuple[List[int], List[List[int]], List[int]]:
+    """
+    Kahn's algorithm over per-task predecessor indices. Returns the dependency
+    order, the successor lists and the leftover in-degrees: tasks on or behind a
+    cycle never reach zero and are missing from the order.
+    """
+    successors: List[List[int]] = [[] for _ in predecessors]
+    in_degree = [len(preds) for preds in predecessors]
+    for i, preds in enumerate(predecessors):
+        for j in preds:
+            successors[j].append(i)
+
+    # The list doubles as the work queue
+    order = [i for i, degree in enumerate(in_degree) if degree == 0]
+    for i in order:
+        for j in successors[i]:
+            in_degree[j] -= 1
+            if not in_degree[j]:
+                order.append(j)
+    return order, successors, in_degree
+
+
+class CPMScheduler:
+    """Forward/backward pass over a Kahn topological order of the task graph"""
+
+    def topological_order(self, tasks: List[Dict]) -> Tuple[List[int], List[List[int]], Dict[str, int]]:
+        """
+        Task indices in dependency order, plus the successor lists and ID index.
+        Raises ValueError on duplicate IDs, unknown dependencies or cycles.
+        """
+        index = {task["id"]: i for i, task in enumerate(tasks)}
+        if len(index) != len(tasks):
+            raise ValueError("Duplicate task IDs in WBS")
+
+        try:
+            predecessors = [[index[dep] for dep in task.get("dependencies") or ()] for task in tasks]
+        except KeyError as e:
+            missing = e.args[0]
+            owner = next(t["id"] for t in tasks if missing in (t.get("dependencies") or ()))
+            raise ValueError(f"Task {owner} depends on unknown task {missing}")
+
+        order, successors, in_degree = kahn_order(predecessors)
+        if len(order) != len(tasks):
+            stuck = [tasks[i]["id"] for i, degree in enumerate(in_degree) if degree > 0][:10]
+            raise ValueError(f"Dependency cycle detected among tasks: {', '.join(stuck)}")
+
+        return order, successors, index
+
+    def schedule(self, tasks: List[Dict]) -> Dict:
+        """
+        Schedule tasks as early as their dependencies allow (unlimited resources).
+        Returns per-task ES/EF/LS/LF/slack, the project duration and the critical path.
+        """
+        order, successors, index = self.topological_order(tasks)
+        count = len(tasks)
+        # Integer hundredths of an hour keep the passes exact (no float drift in slack)
+        durations = [round((task.get("duration_hours") or 0) * SCALE) for task in tasks]
+
+        # Forward pass: a task starts when its last predecessor finishes
+        earliest_start = [0] * count
+        earliest_finish = [0] * count
+        for i in order:
+            finish = earliest_start[i] + durations[i]
+            earliest_finish[i] = finish
+            for j in successors[i]:
+                if finish > earliest_start[j]:
+                    earliest_start[j] = finish
+
+        project_duration = max(earliest_finish, default=0)
+
+        # Backward pass: a task must finish before its first successor has to start
+        latest_finish = [project_duration] * count
+        latest_start = [0] * count
+        for i in reversed(order):
+            finish = project_duration
+            for j in successors[i]:
+                if latest_start[j] < finish:
+                    finish = latest_start[j]
+            latest_finish[i] = finish
+            latest_start[i] = finish - durations[i]
+
+        slack = [ls - es for ls, es in zip(latest_start, earliest_start)]
+
+        # Walk back from the task that finishes last along zero-slack predecessors
+        critical_path = []
+        if count:
+            current = max(range(count), key=lambda i: (earliest_finish[i], slack[i] == 0))
+            while current is not None:
+                critical_path.append(tasks[current]["id"])
+                previous = None
+                for dep in tasks[current].get("dependencies") or ():
+                    j = index[dep]
+                    if slack[j] == 0 and earliest_finish[j] == earliest_start[current]:
+                        previous = j
+                        break
+                current = previous
+            critical_path.reverse()
+
+        scheduled = [
+            {
+                "id": task["id"],
+                "earliest_start": es / SCALE,
+                "earliest_finish": ef / SCALE,
+                "latest_start": ls / SCALE,
+                "latest_finish": lf / SCALE,
+                "slack": sl / SCALE,
+                "critical": sl == 0
+            }
+            for task, es, ef, ls, lf, sl in zip(
+                tasks, earliest_start, earliest_finish, latest_start, latest_finish, slack
+            )
+        ]
+
+        return {
+            "tasks": scheduled,
+            "project_duration": project_duration / SCALE,
+            "total_work_hours": sum(durations) / SCALE,
+            "critical_path": critical_path
+        }
+
+
+# Which team role performs each WBS task type (developers write their own unit tests)
+TASK_ROLES = {
+    "Dev": "Dev",
+    "Unit Testing": "Dev",
+    "QA Testing": "QA",
+    "UI/UX": "UI/UX",
+    "DB": "DB",
+    "R&D": "R&D"
+}
+ROLES = ["Dev", "QA", "UI/UX", "DB", "R&D"]
+GENERALIST = "Any"
+
+
+class ResourceScheduler:
+    """
+    Resource-constrained list scheduling.
+    Whenever a person is free, the ready task with the longest remaining path to the end
+    of the project (its CPM priority) is started. Specialists take tasks of their role;
+    generalists take whatever is most urgent. O((V + E) log V).
+    """
+
+    def __init__(self, cpm: CPMScheduler = None):
+        self.cpm = cpm or CPMScheduler()
+
+    def build_team(self, team_size: Optional[int], role_capacity: Optional[Dict[str, int]]) -> List[Tuple[str, str]]:
+        """(name, role) per person: role_capacity specialists plus generalists up to team_size"""
+        role_capacity = role_capacity or {}
+        unknown = set(role_capacity) - set(ROLES)
+        if unknown:
+            raise ValueError(f"Unknown roles: {', '.join(sorted(unknown))} (expected {', '.join(ROLES)})")
+
+        team = []
+        for role in ROLES:
+            for n in range(1, role_capacity.get(role, 0) + 1):
+                team.append((f"{role} {n}", role))
+
+        if team_size is None:
+            generalists = 0 if team else 1
+        elif team_size < len(team):
+            raise ValueError(f"team_size {team_size} is smaller than the {len(team)} people in role_capacity")
+        else:
+            generalists = team_size - len(team)
+        for n in range(1, generalists + 1):
+            team.append((f"Member {n}", GENERALIST))
+        return team
+
+    def schedule(
+        self,
+        tasks: List[Dict],
+        team_size: Optional[int] = None,
+        role_capacity: Optional[Dict[str, int]] = None
+    ) -> Dict:
+        """Assign every task to a person and start time; returns timelines and makespan"""
+        team = self.build_team(team_size, role_capacity)
+        order, successors, index = self.cpm.topological_order(tasks)
+        count = len(tasks)
+        durations = [round((task.get("duration_hours") or 0) * SCALE) for task in tasks]
+        roles = [TASK_ROLES.get(task.get("task_type"), "Dev") for task in tasks]
+
+        staffed = {role for _, role in team}
+        if GENERALIST not in staffed:
+            missing = sorted(set(roles) - staffed)
+            if missing:
+                raise ValueError(f"No team capacity for roles: {', '.join(missing)}")
+
+        # Priority: longest path from the start of the task to the end of the project
+        priority = [0] * count
+        for i in reversed(order):
+            longest = 0
+            for j in successors[i]:
+                if priority[j] > longest:
+                    longest = priority[j]
+            priority[i] = durations[i] + longest
+
+        in_degree = [len(task.get("dependencies") or ()) for task in tasks]
+        ready: Dict[str, List[Tuple[int, int]]] = {role: [] for role in ROLES}
+        for i in range(count):
+            if not in_degree[i]:
+                ready[roles[i]].append((-priority[i], i))
+        for heap in ready.values():
+            heapq.heapify(heap)
+
+        idle: Dict[str, List[int]] = {role: [] for role in ROLES + [GENERALIST]}
+        for person, (_, role) in enumerate(team):
+            idle[role].append(person)
+        for people in idle.values():
+            people.reverse()  # pop() hands out "Dev 1" before "Dev 2"
+
+        start = [0] * count
+        assignee = [0] * count
+        running: List[Tuple[int, int]] = []  # (finish, task)
+        now = 0
+        done = 0
+
+        while done < count:
+            # Specialists first: each role's most urgent ready task
+            for role in ROLES:
+                heap = ready[role]
+                people = idle[role]
+                while heap and people:
+                    _, i = heapq.heappop(heap)
+                    self._start(i, people.pop(), now, durations, start, assignee, running)
+
+            # Generalists take the most urgent ready task of any role
+            generalists = idle[GENERALIST]
+            while generalists:
+                heads = [(heap[0], role) for role, heap in ready.items() if heap]
+                if not heads:
+                    break
+                _, role = min(heads)
+                _, i = heapq.heappop(ready[role])
+                self._start(i, generalists.pop(), now, durations, start, assignee, running)
+
+            # Advance to the next completion and release its successors
+            now = running[0][0]
+            while running and running[0][0] == now:
+                _, i = heapq.heappop(running)
+                done += 1
+                person = assignee[i]
+                idle[team[person][1]].append(person)
+                for j in successors[i]:
+                    in_degree[j] -= 1
+                    if not in_degree[j]:
+                        heapq.heappush(ready[roles[j]], (-priority[j], j))
+
+        makespan = max((start[i] + durations[i] for i in range(count)), default=0)
+
+        timelines = [
+            {"person": name, "role": role, "tasks": [], "busy_hours": 0.0, "utilization": 0.0}
+            for name, role in team
+        ]
+        busy = [0] * len(team)
+        for i in sorted(range(count), key=start.__getitem__):
+            timelines[assignee[i]]["tasks"].append({
+                "id": tasks[i]["id"],
+                "start": start[i] / SCALE,
+                "finish": (start[i] + durations[i]) / SCALE
+            })
+            busy[assignee[i]] += durations[i]
+        for person, timeline in enumerate(timelines):
+            timeline["busy_hours"] = busy[person] / SCALE
+            timeline["utilization"] = round(busy[person] / makespan, 3) if makespan else 0.0
+
+        return {
+            "tasks": [
+                {
+                    "id": task["id"],
+                    "assignee": team[assignee[i]][0],
+                    "start": start[i] / SCALE,
+                    "finish": (start[i] + durations[i]) / SCALE
+                }
+                for i, task in enumerate(tasks)
+            ],
+            "timelines": timelines,
+            "team_size": len(team),
+            "makespan": makespan / SCALE,
+            "critical_path_length": max(priority, default=0) / SCALE,
+            "total_work_hours": sum(durations) / SCALE
+        }
+
+    @staticmethod
+    def _start(i, person, now, durations, start, assignee, running) -> None:
+        start[i] = now
+        assignee[i] = person
+        heapq.heappush(running, (now + durations[i], i))
@@ -0,0 +1,125 @@
+"""
+Task Table - Compact columnar storage for generated WBS tasks
+Tasks live in parallel arrays (interned type/template codes, integer
+dependency offsets); IDs, names and descriptions are only materialized
+when the WBS is serialized.
+"""
+from array import array
+from typing import Dict, Iterator, List, Sequence
+import json
+
+# Interned task types (index = type code)
+TASK_TYPES = ["R&D", "UI/UX", "DB", "Dev", "Unit Testing", "QA Testing"]
+TYPE_CODES = {task_type: code for code, task_type in enumerate(TASK_TYPES)}
+
+_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+class TaskTemplate:
+    """Name/description pattern for one kind of task: prefix + feature name + suffix"""
+    __slots__ = ("key", "name_prefix", "name_suffix", "desc_prefix", "desc_suffix", "type_code", "level")
+
+    def __init__(self, key: str, name: str, description: str, task_type: str, level: int):
+        self.key = key  # Stable ID suffix, unique per feature
+        self.name_prefix, self.name_suffix = name.split("{feature}")
+        self.desc_prefix, self.desc_suffix = description.split("{feature}")
+        self.type_code = TYPE_CODES[task_type]
+        self.level = level
+
+
+class TaskTable:
+    """
+    Parallel-array task store. Task i has:
+    - feature[i]: index into the feature id/name lists
+    - template[i]: index into the shared template list (type, level, text patterns)
+    - hours[i]
+    - dependencies: targets[offsets[i]:offsets[i + 1]] (task indices)
+    Task IDs are "T{base + i + 1}", or "{feature_id}-{template key}" with stable_ids,
+    so a task keeps its ID when other features are added, removed or changed.
+    A shard of a larger WBS sets base and gives the tasks that depend on other
+    shards their dependency IDs directly in `external`.
+    """
+    __slots__ = ("templates", "stable_ids", "base", "external", "feature_ids", "feature_names", "feature",
+                 "template", "hours", "offsets", "targets")
+
+    def __init__(self, templates: Sequence[TaskTemplate], stable_ids: bool = False, base: int = 0):
+        self.templates = templates
+        self.stable_ids = stable_ids
+        self.base = base
+        self.external: Dict[int, List[str]] = {}
+        self.feature_ids: List[str] = []
+        self.feature_names: List[str] = []
+        self.feature = array('l')
+        self.template = array('h')
+        self.hours = array('d')
+        self.offsets = array('l', [0])
+        self.targets = array('l')
+
+    def __len__(self) -> int:
+        return len(self.hours)
+
+    def add_feature(self, feature_id: str, feature_name: str) -> int:
+        self.feature_ids.append(feature_id)
+        self.feature_names.append(feature_name)
+        return len(self.feature_ids) - 1
+
+    def add(self, feature: int, template: int, hours: float, dependencies: Sequence[int] = ()) -> int:
+        """Append a task and return its index"""
+        self.feature.append(feature)
+        self.template.append(template)
+        self.hours.append(hours)
+        self.targets.extend(dependencies)
+        self.offsets.append(len(self.targets))
+        return len(self.hours) - 1
+
+    def task_id(self, index: int) -> str:
+        if self.stable_ids:
+            return f"{self.feature_ids[self.feature[index]]}-{self.templates[self.template[index]].key}"
+        return f"T{self.base + index + 1}"
+
+    def total_hours(self) -> float:
+        return sum(self.hours)
+
+    def iter_dicts(self) -> Iterator[Dict]:
+        """Materialize tasks as WBSTask-shaped dicts, one at a time"""
+        templates = self.templates
+        feature_ids = self.feature_ids
+        feature_names = self.feature_names
+        offsets = self.offsets
+        targets = self.targets
+        external = self.external
+        task_id = self.task_id
+        for i, (f, t, hours) in enumerate(zip(self.feature, self.template, self.hours)):
+            template = templates[t]
+            name = feature_names[f]
+            yield {
+                "id": task_id(i),
+                "name": template.name_prefix + name + template.name_suffix,
+                "description": template.desc_prefix + name + template.desc_suffix,
+                "duration_hours": hours,
+                "dependencies": external.get(i) or [task_id(j) for j in targets[offsets[i]:offsets[i + 1]]],
+                "level": template.level,
+                "parent_id": feature_ids[f],
+                "task_type": TASK_TYPES[template.type_code]
+            }
+
+    def to_dicts(self) -> List[Dict]:
+        return list(self.iter_dicts())
+
+    def tasks_json(self) -> str:
+        """The tasks as comma-separated JSON objects (the body of a JSON array)"""
+        encode = _ENCODER.encode
+        return ",".join(encode(task) for task in self.iter_dicts())
+
+    def to_json(self, project_name: str) -> str:
+        """WBSResponse-shaped JSON, encoded straight from the table"""
+        return self.wrap_json(project_name, self.tasks_json(), len(self), self.total_hours())
+
+    @staticmethod
+    def wrap_json(project_name: str, tasks_json: str, total_tasks: int, total_hours: float) -> str:
+        return (
+            '{"project_name":' + _ENCODER.encode(project_name)
+            + ',"tasks":[' + tasks_json
+            + '],"total_tasks":' + str(total_tasks)
+            + ',"total_hours":' + _ENCODER.encode(round(total_hours, 1)) + "}"
+        )
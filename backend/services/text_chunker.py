@@ -0,0 +1,90 @@
+"""
+Text Chunker - Split long specification text on page and section boundaries
+Used for map-reduce feature extraction over long PDFs
+"""
+import re
+from typing import List
+
+PAGE_BREAK = "\f"
+
+# Numbered headings ("2.1 Audio Ingestion"), markdown headings, or short ALL-CAPS lines
+_HEADING_RE = re.compile(r"^\s*(?:\d+(?:\.\d+)*\.?\s+\S|#{1,6}\s+\S|[A-Z][A-Z0-9 &/\-]{3,60}:?\s*$)")
+
+
+def split_into_chunks(text: str, max_chars: int = 12000) -> List[str]:
+    """
+    Split text into chunks of at most max_chars, preferring page breaks,
+    then section headings, then paragraphs, and only then hard line breaks.
+    """
+    units = []
+    for page in text.split(PAGE_BREAK):
+        page = page.strip()
+        if not page:
+            continue
+        if len(page) <= max_chars:
+            units.append(page)
+        else:
+            units.extend(_split_oversized(page, max_chars))
+
+    # Greedily pack consecutive units so most chunks are close to max_chars
+    chunks = []
+    current = []
+    current_len = 0
+    for unit in units:
+        if current and current_len + len(unit) + 1 > max_chars:
+            chunks.append("\n".join(current))
+            current = []
+            current_len = 0
+        current.append(unit)
+        current_len += len(unit) + 1
+
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def _split_oversized(page: str, max_chars: int) -> List[str]:
+    """Break one oversized page into sections, paragraphs, then lines"""
+    sections = _split_on(page.split("\n"), lambda line: bool(_HEADING_RE.match(line)))
+
+    pieces = []
+    for section in sections:
+        if len(section) <= max_chars:
+            pieces.append(section)
+            continue
+        for paragraph in re.split(r"\n\s*\n", section):
+            if len(paragraph) <= max_chars:
+                pieces.append(paragraph)
+                continue
+            pieces.extend(_hard_split(paragraph, max_chars))
+    return [piece.strip() for piece in pieces if piece.strip()]
+
+
+def _split_on(lines: List[str], is_boundary) -> List[str]:
+    sections = []
+    current = []
+    for line in lines:
+        if is_boundary(line) and current:
+            sections.append("\n".join(current))
+            current = []
+        current.append(line)
+    if current:
+        sections.append("\n".join(current))
+    return sections
+
+
+def _hard_split(text: str, max_chars: int) -> List[str]:
+    """Last resort: pack whole lines, cutting only lines longer than max_chars"""
+    pieces = []
+    current = ""
+    for line in text.split("\n"):
+        while len(line) > max_chars:
+            pieces.append(line[:max_chars])
+            line = line[max_chars:]
+        if current and len(current) + len(line) + 1 > max_chars:
+            pieces.append(current)
+            current = ""
+        current = f"{current}\n{line}" if current else line
+    if current:
+        pieces.append(current)
+    return pieces
@@ -2,8 +2,85 @@
 WBS Engine - Intelligent Work Breakdown Structure Generation
 Uses conditional task generation with mandatory quality gates
 """
-from typing import List, Dict
+from typing import List, Dict, Optional
+import heapq
+import re
 import uuid
+from services.scheduler import kahn_order
+from services.task_table import TaskTable, TaskTemplate
+
+# validate_wbs: cap on task IDs listed per issue (counts stay exact)
+MAX_ISSUE_TASK_IDS = 50
+
+# Quality gates every feature must include
+GATE_UNIT_TEST = 1
+GATE_QA = 2
+QUALITY_GATES = {"Unit Testing": GATE_UNIT_TEST, "QA Testing": GATE_QA}
+
+# Analysis used for features that arrive without one
+DEFAULT_ANALYSIS = {
+    'needs_rnd': False,
+    'needs_ui': True,
+    'needs_db': False,
+    'dev_hours': 8.0,
+    'rnd_hours': 0.0,
+    'ui_hours': 0.0,
+    'db_hours': 0.0,
+    'unit_test_hours': 1.6,
+    'qa_hours': 2.0,
+    'dev_complexity': 'medium'
+}
+
+# Task kinds generated per feature; "{feature}" is filled in when the WBS is serialized
+TASK_TEMPLATES = [
+    TaskTemplate("RND", "R&D: Research & Design - {feature}",
+                 "Research technical approach, evaluate options, and design architecture for {feature}", "R&D", 1),
+    TaskTemplate("UI", "UI/UX Design - {feature}",
+                 "Design user interface, mockups, and user experience flow for {feature}", "UI/UX", 1),
+    TaskTemplate("DB", "DB Schema Design - {feature}",
+                 "Design database schema, models, and data relationships for {feature}", "DB", 1),
+    TaskTemplate("UT", "Unit Testing - {feature}",
+                 "Write and execute unit tests for {feature} (20% dev time)", "Unit Testing", 2),
+    TaskTemplate("QA", "QA Testing - {feature}",
+                 "Manual QA validation and quality assurance for {feature}", "QA Testing", 2),
+]
+RND_TEMPLATE, UI_TEMPLATE, DB_TEMPLATE, UNIT_TEST_TEMPLATE, QA_TEMPLATE = range(5)
+
+
+def normalize_feature_name(name) -> str:
+    """Case- and punctuation-insensitive form of a feature name, for dependency references"""
+    return re.sub(r'[^a-z0-9]+', ' ', str(name).lower()).strip()
+
+
+def _dev_templates(steps):
+    """Register dev task templates and return their indices"""
+    indices = []
+    for step, (task_name, task_desc) in enumerate(steps, 1):
+        TASK_TEMPLATES.append(
+            TaskTemplate(f"DEV{step}", f"{task_name} - {{feature}}", f"{task_desc} for {{feature}}", "Dev", 2)
+        )
+        indices.append(len(TASK_TEMPLATES) - 1)
+    return indices
+
+
+SIMPLE_DEV_TEMPLATES = _dev_templates([
+    ("Implementation", "Implement core functionality"),
+    ("Testing & Polish", "Test and polish implementation")
+])
+MEDIUM_DEV_TEMPLATES = _dev_templates([
+    ("Core Implementation", "Implement core functionality"),
+    ("UI/Backend Integration", "Build and integrate UI/backend components"),
+    ("Integration Testing", "Integrate with system and test"),
+    ("Bug Fixes & Polish", "Fix bugs and polish implementation")
+])
+COMPLEX_DEV_TEMPLATES = _dev_templates([
+    ("Core Architecture", "Build foundational architecture"),
+    ("Core Implementation", "Implement core functionality"),
+    ("UI Development", "Build user interface components"),
+    ("Backend Integration", "Integrate backend services"),
+    ("System Integration", "Integrate with existing system"),
+    ("Bug Fixes & Optimization", "Fix bugs and optimize performance")
+])
 
 
 class WBSEngine:
@@ -11,7 +88,7 @@ class WBSEngine:
         # Legacy support (no longer used)
         self.rule_82 = {"dev_hours": 8, "rnd_hours": 2}
         
-    async def generate_wbs(self, project_name: str, features: List[Dict]) -> Dict:
+    async def generate_wbs(self, project_name: str, features: List[Dict], stable_ids: bool = False) -> Dict:
         """
         Generate WBS from features using intelligent conditional task breakdown.
         
@@ -22,283 +99,340 @@ class WBSEngine:
         - Optimized development time (4-12 hours based on complexity)
         - MANDATORY Unit Testing (20% of dev time)
         - MANDATORY QA Testing (2 hours fixed)
+        
+        If any feature declares `dependencies` (IDs or names of other features),
+        features form a DAG: each starts after its prerequisites' QA tasks and
+        independent features run as parallel branches. Otherwise every feature
+        is chained after the previous one (legacy behaviour).
+        
+        With stable_ids, task IDs are "{feature_id}-{kind}" (e.g. "F3-DEV2")
+        instead of positional "T{n}", so they survive edits to other features.
         """
-        tasks = []
-        task_id_counter = 1
+        table = self.build_task_table(features, stable_ids)
+        
+        return {
+            "project_name": project_name,
+            "tasks": table.to_dicts(),
+            "total_tasks": len(table),
+            "total_hours": round(table.total_hours(), 1)
+        }
+    
+    def build_task_table(self, features: List[Dict], stable_ids: bool = False) -> TaskTable:
+        """Generate the WBS into a columnar TaskTable (see generate_wbs for the rules)"""
+        table = TaskTable(TASK_TEMPLATES, stable_ids)
+        sorted_features, feature_prereqs = self.plan_features(features)
+        
+        # Track the last task of each feature for dependencies between features
+        previous_feature_last_task = None
+        feature_last_tasks = []
         
-        # Helper to ensure dependencies are clean strings (NO None values)
-        def clean_deps(deps):
-            """Remove None values from dependencies list"""
-            if not deps:
-                return []
-            return [d for d in deps if d and isinstance(d, str)]
+        for idx, feature in enumerate(sorted_features, 1):
+            if feature_prereqs is not None:
+                current_deps = [feature_last_tasks[p] for p in feature_prereqs[idx - 1]]
+            else:
+                current_deps = [previous_feature_last_task] if previous_feature_last_task is not None else []
+            qa_task = self.add_feature_tasks(table, feature, idx, current_deps)
+            
+            # Store last task of this feature for the next feature's dependency
+            previous_feature_last_task = qa_task
+            feature_last_tasks.append(qa_task)
         
+        return table
+    
+    def plan_features(self, features: List) -> tuple:
+        """
+        Features in generation order, plus each one's prerequisite positions
+        (None when features simply chain in execution_order).
+        """
         # Sort features by execution_order (handle None values)
         sorted_features = sorted(
             features, 
             key=lambda f: (f.get('execution_order') or 999) if hasattr(f, 'get') else (getattr(f, 'execution_order', None) or 999)
         )
         
-        # Track the last task ID from previous feature for sequential dependencies
-        previous_feature_last_task = None
+        # Feature DAG: topological order plus each feature's prerequisite positions
+        feature_graph = self._resolve_feature_graph(sorted_features)
+        if feature_graph is None:
+            return sorted_features, None
+        return feature_graph
+    
+    @staticmethod
+    def feature_fields(feature, idx: int) -> tuple:
+        """(id, name, analysis dict) of the idx-th feature (1-based), with default analysis"""
+        # Extract feature data (handle both dict and object)
+        feature_name = feature.name if hasattr(feature, 'name') else feature.get('name')
+        feature_id = feature.id if hasattr(feature, 'id') else feature.get('id', f"F{idx}")
         
-        for idx, feature in enumerate(sorted_features, 1):
-            # Extract feature data (handle both dict and object)
-            feature_name = feature.name if hasattr(feature, 'name') else feature.get('name')
-            feature_id = feature.id if hasattr(feature, 'id') else feature.get('id', f"F{idx}")
-            feature_order = feature.execution_order if hasattr(feature, 'execution_order') else feature.get('execution_order', idx)
-            
-            # Get feature analysis (from FeatureAnalysisService)
-            analysis = feature.analysis if hasattr(feature, 'analysis') else feature.get('analysis', {})
-            
-            # If no analysis exists, use default values
-            if not analysis:
-                analysis = {
-                    'needs_rnd': False,
-                    'needs_ui': True,
-                    'needs_db': False,
-                    'dev_hours': 8.0,
-                    'rnd_hours': 0.0,
-                    'ui_hours': 0.0,
-                    'db_hours': 0.0,
-                    'unit_test_hours': 1.6,
-                    'qa_hours': 2.0,
-                    'dev_complexity': 'medium'
-                }
-            else:
-                # Convert to dict if it's an object
-                if hasattr(analysis, 'dict'):
-                    analysis = analysis.dict()
-            
-            # Start building tasks for this feature
-            feature_tasks = []
-            initial_deps = clean_deps([previous_feature_last_task]) if previous_feature_last_task else []
-            current_deps = initial_deps.copy()
-            
-            # CONDITIONAL: R&D Phase
-            if analysis.get('needs_rnd', False):
-                rnd_hours = analysis.get('rnd_hours', 2.0)
-                rnd_task_id = f"T{task_id_counter}"
-                
-                tasks.append({
-                    "id": rnd_task_id,
-                    "name": f"R&D: Research & Design - {feature_name}",
-                    "description": f"Research technical approach, evaluate options, and design architecture for {feature_name}",
-                    "duration_hours": rnd_hours,
-                    "dependencies": clean_deps(current_deps),
-                    "level": 1,
-                    "parent_id": feature_id,
-                    "task_type": "R&D"
-                })
-                current_deps = [rnd_task_id]
-                task_id_counter += 1
-            
-            # CONDITIONAL: UI/UX Design Phase
-            if analysis.get('needs_ui', False):
-                ui_hours = analysis.get('ui_hours', 2.0)
-                ui_task_id = f"T{task_id_counter}"
-                
-                tasks.append({
-                    "id": ui_task_id,
-                    "name": f"UI/UX Design - {feature_name}",
-                    "description": f"Design user interface, mockups, and user experience flow for {feature_name}",
-                    "duration_hours": ui_hours,
-                    "dependencies": clean_deps(current_deps),
-                    "level": 1,
-                    "parent_id": feature_id,
-                    "task_type": "UI/UX"
-                })
-                current_deps = [ui_task_id]
-                task_id_counter += 1
-            
-            # CONDITIONAL: Database Schema Design Phase
-            if analysis.get('needs_db', False):
-                db_hours = analysis.get('db_hours', 2.0)
-                db_task_id = f"T{task_id_counter}"
-                
-                tasks.append({
-                    "id": db_task_id,
-                    "name": f"DB Schema Design - {feature_name}",
-                    "description": f"Design database schema, models, and data relationships for {feature_name}",
-                    "duration_hours": db_hours,
-                    "dependencies": clean_deps(current_deps),
-                    "level": 1,
-                    "parent_id": feature_id,
-                    "task_type": "DB"
-                })
-                current_deps = [db_task_id]
-                task_id_counter += 1
-            
-            # ALWAYS: Development Tasks
-            dev_hours = analysis.get('dev_hours', 8.0)
-            dev_complexity = analysis.get('dev_complexity', 'medium')
-            
-            # Generate development tasks based on total dev hours
-            dev_tasks = self._generate_dev_tasks(
-                feature_name=feature_name,
-                feature_id=feature_id,
-                total_dev_hours=dev_hours,
-                complexity=dev_complexity,
-                initial_deps=current_deps,
-                task_id_start=task_id_counter
-            )
-            
-            tasks.extend(dev_tasks)
-            
-            # Track last dev task ID
-            last_dev_task = dev_tasks[-1]['id']
-            task_id_counter += len(dev_tasks)
-            
-            # MANDATORY: Unit Testing (20% of dev time)
-            unit_test_hours = analysis.get('unit_test_hours', round(dev_hours * 0.2, 1))
-            unit_test_task_id = f"T{task_id_counter}"
-            
-            tasks.append({
-                "id": unit_test_task_id,
-                "name": f"Unit Testing - {feature_name}",
-                "description": f"Write and execute unit tests for {feature_name} (20% dev time)",
-                "duration_hours": unit_test_hours,
-                "dependencies": clean_deps([last_dev_task]),
-                "level": 2,
-                "parent_id": feature_id,
-                "task_type": "Unit Testing"
-            })
-            task_id_counter += 1
-            
-            # MANDATORY: QA Testing (Fixed 2 hours)
-            qa_hours = analysis.get('qa_hours', 2.0)
-            qa_task_id = f"T{task_id_counter}"
-            
-            tasks.append({
-                "id": qa_task_id,
-                "name": f"QA Testing - {feature_name}",
-                "description": f"Manual QA validation and quality assurance for {feature_name}",
-                "duration_hours": qa_hours,
-                "dependencies": clean_deps([unit_test_task_id]),
-                "level": 2,
-                "parent_id": feature_id,
-                "task_type": "QA Testing"
-            })
-            
-            # Store last task of this feature for next feature's dependency
-            previous_feature_last_task = qa_task_id
-            task_id_counter += 1
+        # Get feature analysis (from FeatureAnalysisService)
+        analysis = feature.analysis if hasattr(feature, 'analysis') else feature.get('analysis', {})
         
-        total_hours = sum(task["duration_hours"] for task in tasks)
+        # If no analysis exists, use default values
+        if not analysis:
+            analysis = DEFAULT_ANALYSIS
+        elif hasattr(analysis, 'dict'):
+            # Convert to dict if it's an object
+            analysis = analysis.dict()
         
-        return {
-            "project_name": project_name,
-            "tasks": tasks,
-            "total_tasks": len(tasks),
-            "total_hours": round(total_hours, 1)
-        }
+        return feature_id, feature_name, analysis
+    
+    def feature_task_count(self, feature, idx: int) -> int:
+        """Number of tasks add_feature_tasks will generate for a feature"""
+        analysis = self.feature_fields(feature, idx)[2]
+        phases = sum(bool(analysis.get(key, False)) for key in ('needs_rnd', 'needs_ui', 'needs_db'))
+        return phases + len(self._dev_templates_for(analysis.get('dev_hours', 8.0))) + 2
+    
+    def add_feature_tasks(self, table: TaskTable, feature, idx: int, current_deps: List[int]) -> int:
+        """
+        Append one feature's task subtree; current_deps become the dependencies
+        of its first task. Returns the feature's last (QA) task.
+        """
+        feature_id, feature_name, analysis = self.feature_fields(feature, idx)
+        f = table.add_feature(feature_id, feature_name)
+        
+        # CONDITIONAL: R&D, UI/UX and DB Schema Design phases, in that order
+        if analysis.get('needs_rnd', False):
+            current_deps = [table.add(f, RND_TEMPLATE, analysis.get('rnd_hours', 2.0), current_deps)]
+        if analysis.get('needs_ui', False):
+            current_deps = [table.add(f, UI_TEMPLATE, analysis.get('ui_hours', 2.0), current_deps)]
+        if analysis.get('needs_db', False):
+            current_deps = [table.add(f, DB_TEMPLATE, analysis.get('db_hours', 2.0), current_deps)]
+        
+        # ALWAYS: Development Tasks (count based on total dev hours)
+        dev_hours = analysis.get('dev_hours', 8.0)
+        last_dev_task = self._add_dev_tasks(table, f, dev_hours, current_deps)
+        
+        # MANDATORY: Unit Testing (20% of dev time)
+        unit_test_hours = analysis.get('unit_test_hours', round(dev_hours * 0.2, 1))
+        unit_test_task = table.add(f, UNIT_TEST_TEMPLATE, unit_test_hours, [last_dev_task])
+        
+        # MANDATORY: QA Testing (Fixed 2 hours)
+        return table.add(f, QA_TEMPLATE, analysis.get('qa_hours', 2.0), [unit_test_task])
     
-    def _generate_dev_tasks(
-        self, 
-        feature_name: str, 
-        feature_id: str,
-        total_dev_hours: float,
-        complexity: str,
-        initial_deps: List[str],
-        task_id_start: int
-    ) -> List[Dict]:
-        """Generate development tasks based on total hours and complexity"""
-        
-        # Determine how many tasks to create based on hours
+    def _resolve_feature_graph(self, sorted_features: List) -> Optional[tuple]:
+        """
+        Validate feature-level dependencies and order features topologically.
+        Returns None when no feature declares dependencies (legacy linear chain),
+        else (features in topological order, prerequisite positions per feature).
+        Ties between ready features are broken by execution_order.
+        Raises ValueError on duplicate IDs, dangling references or cycles;
+        dependencies extracted by AI (dependencies_inferred) are a hint, so their
+        dangling or self references are dropped with a warning instead.
+        """
+        def field(feature, name, default=None):
+            return getattr(feature, name, default) if not hasattr(feature, 'get') else feature.get(name, default)
+        
+        declared = [field(f, 'dependencies') or [] for f in sorted_features]
+        if not any(declared):
+            return None
+        
+        # References may use feature IDs or (case/punctuation-insensitive) names
+        ids = {}
+        names = {}
+        for pos, feature in enumerate(sorted_features):
+            feature_id = field(feature, 'id') or f"F{pos + 1}"
+            if feature_id in ids:
+                raise ValueError(f"Duplicate feature id: {feature_id}")
+            ids[feature_id] = pos
+            names.setdefault(normalize_feature_name(field(feature, 'name', '')), pos)
+        
+        prereqs = []
+        for pos, deps in enumerate(declared):
+            feature_name = field(sorted_features[pos], 'name')
+            inferred = field(sorted_features[pos], 'dependencies_inferred', False)
+            resolved = []
+            for dep in deps:
+                target = ids.get(dep, names.get(normalize_feature_name(dep)))
+                if target is None or target == pos:
+                    problem = f"unknown feature '{dep}'" if target is None else "itself"
+                    if not inferred:
+                        raise ValueError(f"Feature '{feature_name}' depends on {problem}")
+                    print(f"⚠️  Ignoring AI-extracted dependency of '{feature_name}' on {problem}")
+                    continue
+                if target not in resolved:
+                    resolved.append(target)
+            prereqs.append(resolved)
+        
+        # Kahn's algorithm; the heap yields ready features in execution_order (sorted position)
+        successors = [[] for _ in sorted_features]
+        in_degree = [len(p) for p in prereqs]
+        for pos, resolved in enumerate(prereqs):
+            for target in resolved:
+                successors[target].append(pos)
+        
+        ready = [pos for pos, degree in enumerate(in_degree) if degree == 0]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            pos = heapq.heappop(ready)
+            order.append(pos)
+            for nxt in successors[pos]:
+                in_degree[nxt] -= 1
+                if in_degree[nxt] == 0:
+                    heapq.heappush(ready, nxt)
+        
+        if len(order) != len(sorted_features):
+            cyclic = [str(field(sorted_features[pos], 'name')) for pos, degree in enumerate(in_degree) if degree > 0]
+            raise ValueError(f"Feature dependency cycle among: {', '.join(cyclic[:10])}")
+        
+        new_position = {pos: rank for rank, pos in enumerate(order)}
+        return (
+            [sorted_features[pos] for pos in order],
+            [[new_position[target] for target in prereqs[pos]] for pos in order]
+        )
+    
+    @staticmethod
+    def _dev_templates_for(total_dev_hours: float) -> List[int]:
+        # Determine how many tasks to create based on hours (simple: 2, medium: 4, complex: 6)
         if total_dev_hours <= 4:
-            # Simple: 2 tasks
-            num_tasks = 2
-            task_names = [
-                ("Implementation", "Implement core functionality"),
-                ("Testing & Polish", "Test and polish implementation")
-            ]
-        elif total_dev_hours <= 8:
-            # Medium: 4 tasks
-            num_tasks = 4
-            task_names = [
-                ("Core Implementation", "Implement core functionality"),
-                ("UI/Backend Integration", "Build and integrate UI/backend components"),
-                ("Integration Testing", "Integrate with system and test"),
-                ("Bug Fixes & Polish", "Fix bugs and polish implementation")
-            ]
-        else:
-            # Complex: 6 tasks
-            num_tasks = 6
-            task_names = [
-                ("Core Architecture", "Build foundational architecture"),
-                ("Core Implementation", "Implement core functionality"),
-                ("UI Development", "Build user interface components"),
-                ("Backend Integration", "Integrate backend services"),
-                ("System Integration", "Integrate with existing system"),
-                ("Bug Fixes & Optimization", "Fix bugs and optimize performance")
-            ]
-        
-        hours_per_task = round(total_dev_hours / num_tasks, 1)
-        dev_tasks = []
-        previous_task = initial_deps[0] if initial_deps else None
-        
-        for i, (task_name, task_desc) in enumerate(task_names, 1):
-            task_id = f"T{task_id_start + i - 1}"
+            return SIMPLE_DEV_TEMPLATES
+        if total_dev_hours <= 8:
+            return MEDIUM_DEV_TEMPLATES
+        return COMPLEX_DEV_TEMPLATES
+    
+    def _add_dev_tasks(self, table: TaskTable, feature: int, total_dev_hours: float, initial_deps: List[int]) -> int:
+        """Add the development task chain for a feature; returns the last dev task"""
+        templates = self._dev_templates_for(total_dev_hours)
+        hours_per_task = round(total_dev_hours / len(templates), 1)
+        previous_tasks = initial_deps
+        for template in templates:
+            previous_tasks = [table.add(feature, template, hours_per_task, previous_tasks)]
+        
+        return previous_tasks[0]
+    
+    def validate_wbs(self, tasks: List[Dict], feature_ids: Optional[List[str]] = None) -> Dict:
+        """
+        Validate WBS structure, dependency graph and quality gates.
+        
+        One pass over the tasks builds the ID index and per-type hour totals;
+        dependencies are then resolved to task indices and cycle detection
+        reuses the scheduler's Kahn traversal. Each issue lists at most
+        MAX_ISSUE_TASK_IDS task IDs, so memory stays O(V + E) however broken
+        the input is.
+        When feature_ids is given, every parent_id must be a feature or task ID.
+        """
+        issues = {}
+        
+        def report(code, message, task_id=None, detail=None, ids_key="task_ids"):
+            issue = issues.get(code)
+            if issue is None:
+                issue = issues[code] = {"code": code, "message": message, "count": 0, ids_key: []}
+            issue["count"] += 1
+            if task_id is not None and len(issue[ids_key]) < MAX_ISSUE_TASK_IDS:
+                issue[ids_key].append(task_id)
+                if detail is not None:
+                    issue.setdefault("details", []).append(detail)
+        
+        # Pass 1: ID index, hour totals and quality gates per feature
+        index = {}
+        hours_by_type = {}
+        total_hours = 0.0
+        gates = {}  # parent_id -> bitmask of GATE_UNIT_TEST | GATE_QA
+        
+        for i, task in enumerate(tasks):
+            task_id = task.get("id")
+            if task_id in index:
+                report("duplicate_id", "Task IDs must be unique", task_id)
+            else:
+                index[task_id] = i
             
-            # Clean dependencies to prevent None values
-            clean_previous = [previous_task] if previous_task and isinstance(previous_task, str) else []
+            hours = task.get("duration_hours", 0) or 0
+            task_type = task.get("task_type")
+            total_hours += hours
+            hours_by_type[task_type] = hours_by_type.get(task_type, 0.0) + hours
+            if hours < 0:
+                report("negative_duration", "Task durations must not be negative", task_id)
             
-            dev_tasks.append({
-                "id": task_id,
-                "name": f"{task_name} - {feature_name}",
-                "description": f"{task_desc} for {feature_name}",
-                "duration_hours": hours_per_task,
-                "dependencies": clean_previous,
-                "level": 2,
-                "parent_id": feature_id,
-                "task_type": "Dev"
-            })
-            previous_task = task_id
-        
-        return dev_tasks
-    
-    def validate_wbs(self, tasks: List[Dict]) -> Dict:
-        """Validate WBS structure and quality gates"""
-        total_hours = sum(task.get("duration_hours", 0) for task in tasks)
-        dev_hours = sum(task.get("duration_hours", 0) for task in tasks if task.get("task_type") == "Dev")
-        rnd_hours = sum(task.get("duration_hours", 0) for task in tasks if task.get("task_type") == "R&D")
-        ui_hours = sum(task.get("duration_hours", 0) for task in tasks if task.get("task_type") == "UI/UX")
-        db_hours = sum(task.get("duration_hours", 0) for task in tasks if task.get("task_type") == "DB")
-        unit_test_hours = sum(task.get("duration_hours", 0) for task in tasks if task.get("task_type") == "Unit Testing")
-        qa_hours = sum(task.get("duration_hours", 0) for task in tasks if task.get("task_type") == "QA Testing")
+            parent_id = task.get("parent_id")
+            if parent_id:
+                gates[parent_id] = gates.get(parent_id, 0) | QUALITY_GATES.get(task_type, 0)
         
-        issues = []
+        count = len(tasks)
         
-        # Validate mandatory quality gates
-        unit_test_tasks = [t for t in tasks if t.get("task_type") == "Unit Testing"]
-        qa_test_tasks = [t for t in tasks if t.get("task_type") == "QA Testing"]
+        # Pass 2: resolve dependency IDs to task indices (dangling ones are reported and skipped)
+        predecessors = []
+        for task in tasks:
+            resolved = []
+            for dep in task.get("dependencies") or ():
+                j = index.get(dep)
+                if j is None:
+                    task_id = task.get("id")
+                    report("missing_dependency", "Dependencies must reference existing task IDs",
+                           task_id, {"task_id": task_id, "dependency": dep})
+                else:
+                    resolved.append(j)
+            predecessors.append(resolved)
         
-        # Count unique features (by parent_id)
-        feature_ids = set(task.get("parent_id") for task in tasks if task.get("parent_id"))
-        num_features = len(feature_ids)
+        # Kahn's algorithm: tasks never ordered sit on or behind a cycle
+        order, successors, in_degree = kahn_order(predecessors)
         
-        if len(unit_test_tasks) < num_features:
-            issues.append(f"Missing unit testing tasks: expected {num_features}, found {len(unit_test_tasks)}")
+        if len(order) < count:
+            # Peel blocked tasks with no blocked successors: what remains lies on cycles
+            remaining = [0] * count
+            for i in range(count):
+                if in_degree[i] > 0:
+                    for j in successors[i]:
+                        if in_degree[j] > 0:
+                            remaining[i] += 1
+            peel = [i for i in range(count) if in_degree[i] > 0 and remaining[i] == 0]
+            blocked = set()
+            while peel:
+                i = peel.pop()
+                blocked.add(i)
+                for j in predecessors[i]:
+                    if in_degree[j] > 0:
+                        remaining[j] -= 1
+                        if remaining[j] == 0:
+                            peel.append(j)
+            for i in range(count):
+                if in_degree[i] > 0:
+                    if i in blocked:
+                        report("unreachable", "Task can never start: it depends on a dependency cycle", tasks[i].get("id"))
+                    else:
+                        report("cycle", "Task is part of a dependency cycle", tasks[i].get("id"))
         
-        if len(qa_test_tasks) < num_features:
-            issues.append(f"Missing QA testing tasks: expected {num_features}, found {len(qa_test_tasks)}")
+        # Quality gates and parent resolution per feature
+        known_features = set(feature_ids) if feature_ids is not None else None
+        for parent_id, gate_mask in gates.items():
+            if parent_id in index:
+                continue  # Sub-task of another task, not a feature
+            if known_features is not None and parent_id not in known_features:
+                report("unresolved_parent", "parent_id must reference a feature or task", parent_id, ids_key="feature_ids")
+                continue
+            if not gate_mask & GATE_UNIT_TEST:
+                report("missing_unit_testing", "Feature has no Unit Testing task", parent_id, ids_key="feature_ids")
+            if not gate_mask & GATE_QA:
+                report("missing_qa_testing", "Feature has no QA Testing task", parent_id, ids_key="feature_ids")
         
         # Validate unit testing is approximately 20% of dev time
+        dev_hours = hours_by_type.get("Dev", 0.0)
+        unit_test_hours = hours_by_type.get("Unit Testing", 0.0)
         if dev_hours > 0 and unit_test_hours > 0:
             test_ratio = unit_test_hours / dev_hours
             if test_ratio < 0.15 or test_ratio > 0.25:
-                issues.append(f"Unit test ratio ({test_ratio:.1%}) should be ~20% of dev time")
+                report("unit_test_ratio", f"Unit test ratio ({test_ratio:.1%}) should be ~20% of dev time")
         
+        issue_details = list(issues.values())
         return {
-            "valid": len(issues) == 0,
-            "issues": issues,
+            "valid": len(issue_details) == 0,
+            "issues": [self._issue_summary(issue) for issue in issue_details],
+            "issue_details": issue_details,
             "total_hours": round(total_hours, 1),
             "dev_hours": round(dev_hours, 1),
-            "rnd_hours": round(rnd_hours, 1),
-            "ui_hours": round(ui_hours, 1),
-            "db_hours": round(db_hours, 1),
+            "rnd_hours": round(hours_by_type.get("R&D", 0.0), 1),
+            "ui_hours": round(hours_by_type.get("UI/UX", 0.0), 1),
+            "db_hours": round(hours_by_type.get("DB", 0.0), 1),
             "unit_test_hours": round(unit_test_hours, 1),
-            "qa_hours": round(qa_hours, 1),
-            "total_tasks": len(tasks),
-            "num_features": num_features
+            "qa_hours": round(hours_by_type.get("QA Testing", 0.0), 1),
+            "hours_by_type": {str(t): round(h, 1) for t, h in hours_by_type.items()},
+            "total_tasks": count,
+            "num_features": sum(1 for parent_id in gates if parent_id not in index)
         }
+    
+    @staticmethod
+    def _issue_summary(issue: Dict) -> str:
+        """One-line message for an aggregated issue, e.g. 'Task is part of a dependency cycle (2: T4, T5)'"""
+        ids = issue.get("task_ids") or issue.get("feature_ids") or []
+        if not ids:
+            return issue["message"]
+        listed = ", ".join(map(str, ids[:5]))
+        return f"{issue['message']} ({issue['count']}: {listed}{', ...' if issue['count'] > 5 else ''})"